@@ -0,0 +1,24 @@
+"""
+Shared building blocks for the PLG county choropleth (generate.py and scripts/).
+
+Submodules load on first attribute access (PEP 562), so `import plgmap` is
+free and `plgmap.figures` pulls in Plotly only when a figure is built.
+"""
+
+import importlib
+
+SUBMODULES = (
+    'cartesian', 'classify', 'dag', 'defaults', 'events', 'export', 'figures', 'fuzzy', 'geoclient', 'geocode',
+    'geostore', 'hexgrid', 'hll', 'ingest', 'interactive', 'live', 'metrics', 'outlines', 'projection', 'rendercache',
+    'spatial', 'states', 'tiles', 'topk',
+)
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES))
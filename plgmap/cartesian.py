@@ -0,0 +1,211 @@
+"""
+County and state geometry pre-projected to integer Albers USA screen coordinates.
+
+Projection runs once per geometry store, not once per figure. Every vertex of a
+GeometryStore is projected with the composite Albers USA layout
+(plgmap/projection.py: lower 48 plus Alaska and Hawaii insets), flipped to
+screen orientation (y down) and quantized onto an integer grid of
+QUANTIZATION units along the longer side. The result is cached as
+albers_usa.npz inside the store directory, next to adjacency_snapped.npz:
+
+    xy              int32 (N, 2)  screen coordinates, same vertex order as store.coords
+    drawn           bool  (F,)    features drawn in the layout (Puerto Rico is not)
+    border_xy       int32 (M, 2)  state-border polylines ...
+    border_offsets  int64 (B + 1) ... polyline i = border_xy[border_offsets[i]:border_offsets[i + 1]]
+    size            int64 (2,)    grid width, height
+
+State borders come from the county rings themselves, so no second source file
+is needed. A county edge is a state border when no county of the same state
+shares it: either the other side belongs to another state, or there is no other
+side (coast or national border). Each shared border is kept once. Runs of
+consecutive border edges along a ring become polylines.
+
+Drawing from these arrays needs no projection math. svg_document() turns
+them into a standalone SVG, and the path strings are cached per store.
+"""
+
+import os
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from plgmap.projection import albers_usa, usa_part
+
+PROJECTED_FILE = 'albers_usa.npz'
+QUANTIZATION = 10_000
+_path_cache = {}   # store path -> {fips: SVG path data}
+
+
+def _ring_features(store):
+    """Feature index of every ring in store.ring_offsets."""
+    polygon_feature = np.repeat(np.arange(len(store)), np.diff(store.feature_offsets))
+    return np.repeat(polygon_feature, np.diff(store.part_offsets))
+
+
+def project_store(store, quantization=QUANTIZATION):
+    """Projected, quantized vertices and state borders for store (see module docstring)."""
+    coords = np.asarray(store.coords)
+    ring_feature = _ring_features(store)
+    vertex_feature = np.repeat(ring_feature, np.diff(store.ring_offsets))
+    parts = [usa_part(fid[:2]) for fid in store.ids]
+    drawn = np.array([p is not None for p in parts], dtype=bool)
+
+    x = np.full(len(coords), np.nan)
+    y = np.full(len(coords), np.nan)
+    vertex_part = np.array(parts, dtype=object)[vertex_feature] if len(coords) else np.array([], dtype=object)
+    for part in ('lower48', 'alaska', 'hawaii'):
+        mask = vertex_part == part
+        if mask.any():
+            x[mask], y[mask] = albers_usa(coords[mask, 0], coords[mask, 1], part)
+
+    visible = drawn[vertex_feature]
+    x0, x1 = np.nanmin(x[visible]), np.nanmax(x[visible])
+    y0, y1 = np.nanmin(y[visible]), np.nanmax(y[visible])
+    k = (quantization - 1) / max(x1 - x0, y1 - y0)
+    xy = np.zeros((len(coords), 2), dtype=np.int32)
+    xy[visible, 0] = np.round((x[visible] - x0) * k)
+    xy[visible, 1] = np.round((y1 - y[visible]) * k)     # screen y points down
+    size = np.array([int(round((x1 - x0) * k)) + 1, int(round((y1 - y0) * k)) + 1])
+
+    border_xy, border_offsets = state_borders(store, xy, ring_feature, drawn)
+    return {'xy': xy, 'drawn': drawn, 'border_xy': border_xy, 'border_offsets': border_offsets, 'size': size}
+
+
+def state_borders(store, xy, ring_feature, drawn):
+    """(border_xy, border_offsets): state-border polylines traced along county rings."""
+    ring_offsets = np.asarray(store.ring_offsets)
+    ring_lengths = np.diff(ring_offsets)
+    # Edge i runs from vertex i to i + 1; the last vertex of each ring starts no edge
+    is_edge = np.ones(len(xy), dtype=bool)
+    is_edge[ring_offsets[1:] - 1] = False
+    start = np.flatnonzero(is_edge)
+    edge_ring = np.repeat(np.arange(len(ring_lengths)), np.maximum(ring_lengths - 1, 0))
+    edge_state = np.array([int(store.ids[f][:2]) for f in ring_feature])[edge_ring]
+
+    a = xy[start].astype(np.int64)
+    b = xy[start + 1].astype(np.int64)
+    pa = (a[:, 0] << 32) | a[:, 1]
+    pb = (b[:, 0] << 32) | b[:, 1]
+    key = np.stack([np.minimum(pa, pb), np.maximum(pa, pb)], axis=1)
+    _, first, inverse, counts = np.unique(key, axis=0, return_index=True, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    smin = np.full(len(counts), np.iinfo(np.int64).max)
+    smax = np.full(len(counts), -1)
+    np.minimum.at(smin, inverse, edge_state)
+    np.maximum.at(smax, inverse, edge_state)
+
+    is_first = np.zeros(len(start), dtype=bool)
+    is_first[first] = True
+    keep = (is_first & ((counts[inverse] == 1) | (smin[inverse] != smax[inverse]))
+            & (pa != pb) & drawn[ring_feature[edge_ring]])
+
+    # Maximal runs of kept, consecutive edges within one ring become polylines
+    lines, offsets = [], [0]
+    kept = np.flatnonzero(keep)
+    if len(kept):
+        breaks = np.flatnonzero((np.diff(kept) != 1) | (np.diff(edge_ring[kept]) != 0)) + 1
+        for run in np.split(kept, breaks):
+            vertices = np.append(start[run], start[run[-1]] + 1)
+            lines.append(xy[vertices])
+            offsets.append(offsets[-1] + len(vertices))
+    border_xy = np.concatenate(lines) if lines else np.zeros((0, 2), dtype=np.int32)
+    return border_xy, np.asarray(offsets, dtype=np.int64)
+
+
+def load_projected(store):
+    """Projected geometry for store, cached inside the store directory."""
+    path = os.path.join(store.path, PROJECTED_FILE)
+    if os.path.exists(path):
+        with np.load(path) as f:
+            return {name: f[name] for name in f.files}
+    projected = project_store(store)
+    np.savez(path, **projected)
+    return projected
+
+
+def _path(points):
+    """SVG path data for one ring or polyline, dropping points that quantized onto their predecessor."""
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    pts = points[keep]
+    return 'M' + 'L'.join(f'{px} {py}' for px, py in pts.tolist())
+
+
+def county_paths(store, projected=None):
+    """{fips: SVG path data} for every drawn county (rings closed with Z)."""
+    if store.path not in _path_cache:
+        projected = projected if projected is not None else load_projected(store)
+        xy, rings, parts, features = projected['xy'], store.ring_offsets, store.part_offsets, store.feature_offsets
+        paths = {}
+        for i, fid in enumerate(store.ids):
+            if not projected['drawn'][i]:
+                continue
+            paths[fid] = ''.join(
+                _path(xy[rings[r]:rings[r + 1]]) + 'Z'
+                for p in range(features[i], features[i + 1])
+                for r in range(parts[p], parts[p + 1])
+            )
+        _path_cache[store.path] = paths
+    return _path_cache[store.path]
+
+
+def border_path(projected):
+    xy, offsets = projected['border_xy'], projected['border_offsets']
+    return ''.join(_path(xy[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1))
+
+
+def bounds(store, projected, fips_ids):
+    """(x0, y0, x1, y1) grid bounds of the given counties."""
+    index = {fid: i for i, fid in enumerate(store.ids)}
+    rings, parts, features = store.ring_offsets, store.part_offsets, store.feature_offsets
+    spans = [(rings[parts[features[i]]], rings[parts[features[i + 1]]])
+             for i in (index[f] for f in fips_ids if f in index)]
+    pts = np.concatenate([projected['xy'][a:b] for a, b in spans])
+    return (*pts.min(axis=0).tolist(), *pts.max(axis=0).tolist())
+
+
+def svg_document(store, fills, width=1200, title=None, legend=None, only=None,
+                 background='#0a0e17', empty_fill='#0f1520', stroke='#1e2a3a', border_stroke='#3b4a5e'):
+    """
+    Standalone SVG choropleth from pre-projected geometry.
+    fills: {fips: CSS color}; counties without a fill are drawn in empty_fill.
+    only: iterable of FIPS ids to draw and frame (e.g. one state's counties); state borders
+    are drawn only for the full national view.
+    legend: optional [(color, label), ...] drawn as swatches under the map.
+    """
+    projected = load_projected(store)
+    paths = county_paths(store, projected)
+    ids = [f for f in (only if only is not None else paths) if f in paths]
+    if only is not None:
+        x0, y0, x1, y1 = bounds(store, projected, ids)
+    else:
+        x0, y0, (x1, y1) = 0, 0, projected['size'].tolist()
+    pad = max(x1 - x0, y1 - y0) * 0.02
+    vb_w, vb_h = x1 - x0 + 2 * pad, y1 - y0 + 2 * pad
+    title_h = 0.08 * vb_w if title else 0
+    legend_h = 0.06 * vb_w if legend else 0
+    height = int(round(width * (vb_h + title_h + legend_h) / vb_w))
+    stroke_w = vb_w / width * 0.4
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+           f'viewBox="{x0 - pad:.0f} {y0 - pad - title_h:.0f} {vb_w:.0f} {vb_h + title_h + legend_h:.0f}">',
+           f'<rect x="{x0 - pad:.0f}" y="{y0 - pad - title_h:.0f}" width="100%" height="100%" fill="{background}"/>']
+    if title:
+        out.append(f'<text x="{x0 - pad + vb_w / 2:.0f}" y="{y0 - pad - title_h * 0.35:.0f}" text-anchor="middle" '
+                   f'font-family="sans-serif" font-size="{title_h * 0.4:.0f}" fill="#e2e8f0">{escape(title)}</text>')
+    out.append(f'<g stroke="{stroke}" stroke-width="{stroke_w:.1f}" stroke-linejoin="round">')
+    out.extend(f'<path d="{paths[f]}" fill="{fills.get(f, empty_fill)}"/>' for f in ids)
+    out.append('</g>')
+    if only is None:
+        out.append(f'<path d="{border_path(projected)}" fill="none" stroke="{border_stroke}" '
+                   f'stroke-width="{stroke_w * 2.5:.1f}" stroke-linejoin="round"/>')
+    if legend:
+        sw = vb_w / (len(legend) + 1)
+        y = y1 + pad + legend_h * 0.15
+        for i, (color, label) in enumerate(legend):
+            x = x0 - pad + sw * (i + 0.5)
+            out.append(f'<rect x="{x:.0f}" y="{y:.0f}" width="{sw * 0.9:.0f}" height="{legend_h * 0.3:.0f}" fill="{color}"/>')
+            out.append(f'<text x="{x + sw * 0.45:.0f}" y="{y + legend_h * 0.7:.0f}" text-anchor="middle" '
+                       f'font-family="sans-serif" font-size="{legend_h * 0.28:.0f}" fill="#e2e8f0">{escape(label)}</text>')
+    out.append('</svg>')
+    return '\n'.join(out)
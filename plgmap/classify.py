@@ -0,0 +1,118 @@
+"""
+Classification breaks for classed choropleths (quantile and Jenks natural breaks).
+
+Breaks are returned as k + 1 ascending edges [min, upper_1, ..., upper_k]; a
+value v belongs to the first class whose upper edge is >= v (see classify()).
+
+Jenks is solved exactly as a weighted 1-D k-means dynamic program over the
+distinct values, with counts as weights, so heavy ties cost nothing.
+Within-class sums of squares come from prefix sums in O(1). Each DP layer is
+filled with the divide-and-conquer optimization: the optimal split point is
+monotone in the class end. That gives O(k · m log m) for m distinct values,
+instead of the naive O(k · n²).
+"""
+
+import numpy as np
+
+from plgmap.defaults import BREAK_METHODS
+
+N_CLASSES = 5
+
+
+def _distinct(values):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    return np.unique(values, return_counts=True)
+
+
+def quantile_breaks(values, k=N_CLASSES):
+    """Edges at the k-quantiles (actual data values); ties can yield fewer than k classes."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return []
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, k + 1), method='inverted_cdf'))
+    if len(edges) == 1:
+        edges = np.repeat(edges, 2)
+    return edges.tolist()
+
+
+def jenks_breaks(values, k=N_CLASSES):
+    """Jenks natural breaks (exact, minimizes total within-class sum of squares)."""
+    uniq, counts = _distinct(values)
+    m = len(uniq)
+    if m == 0:
+        return []
+    if m == 1:
+        return [float(uniq[0])] * 2
+    if m <= k:
+        return [float(uniq[0])] + uniq.tolist()
+
+    w = counts.astype(np.float64)
+    cw = np.concatenate([[0.0], np.cumsum(w)])
+    cwx = np.concatenate([[0.0], np.cumsum(w * uniq)])
+    cwx2 = np.concatenate([[0.0], np.cumsum(w * uniq * uniq)])
+
+    def ssq(i, j):
+        """Within-class sum of squares of distinct values [i, j) (vectorized over i)."""
+        sw = cw[j] - cw[i]
+        swx = cwx[j] - cwx[i]
+        return (cwx2[j] - cwx2[i]) - swx * swx / sw
+
+    # cost[j]: best cost of splitting the first j distinct values into c classes
+    cost = ssq(np.zeros(m, dtype=np.int64), np.arange(1, m + 1))
+    cost = np.concatenate([[np.inf], cost])
+    split = np.zeros((k + 1, m + 1), dtype=np.int64)
+
+    for c in range(2, k + 1):
+        new_cost = np.full(m + 1, np.inf)
+        # (lo, hi, opt_lo, opt_hi): fill new_cost[lo..hi]; their optimal splits lie in [opt_lo, opt_hi]
+        stack = [(c, m, c - 1, m - 1)]
+        while stack:
+            lo, hi, opt_lo, opt_hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            cand = np.arange(max(opt_lo, c - 1), min(mid - 1, opt_hi) + 1)
+            totals = cost[cand] + ssq(cand, mid)
+            best_idx = int(np.argmin(totals))
+            best = int(cand[best_idx])
+            new_cost[mid] = totals[best_idx]
+            split[c, mid] = best
+            stack.append((lo, mid - 1, opt_lo, best))
+            stack.append((mid + 1, hi, best, opt_hi))
+        cost = new_cost
+
+    # Backtrack class boundaries
+    bounds = [m]
+    j = m
+    for c in range(k, 1, -1):
+        j = int(split[c, j])
+        bounds.append(j)
+    bounds.reverse()
+    return [float(uniq[0])] + [float(uniq[b - 1]) for b in bounds]
+
+
+BREAKS = dict(zip(BREAK_METHODS, (quantile_breaks, jenks_breaks)))
+
+
+def compute_breaks(values, k=N_CLASSES):
+    """{'quantile': edges, 'jenks': edges} for one set of values."""
+    return {method: fn(values, k) for method, fn in BREAKS.items()}
+
+
+def classify(values, edges):
+    """0-based class index for each value (first class whose upper edge >= value)."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.searchsorted(np.asarray(edges[1:-1], dtype=np.float64), values, side='left')
+
+
+def class_labels(edges):
+    """Human-readable ranges for integer-valued metrics, e.g. ['0–2', '3–10', ...]."""
+    labels = []
+    for i in range(1, len(edges)):
+        lo = edges[0] if i == 1 else edges[i - 1] + 1
+        hi = edges[i]
+        lo, hi = int(np.ceil(lo)), int(hi)
+        labels.append(f'{lo:,}' if lo >= hi else f'{lo:,}–{hi:,}')
+    return labels
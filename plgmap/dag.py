@@ -0,0 +1,162 @@
+"""
+Dependency-graph scheduler for pipeline stages.
+
+Stages declare the stages they depend on; each receives its dependencies'
+results as positional arguments, in order. A stage starts as soon as its last
+dependency finishes, on a thread pool (I/O, pandas), a process pool
+(CPU-bound work such as PNG rendering) or inline on the calling thread. End-to-end
+wall time is therefore bounded by the longest dependency chain rather than the
+sum of all stages. After a run, critical_path() reports that chain from the
+measured stage durations.
+
+Stage results are memoized per Pipeline. A stage with a cache_key also has its
+result pickled to cache_dir, so later runs with the same key skip the stage.
+The pipeline's version (e.g. a stamp of the source files) is part of every key,
+so a code change invalidates all cached results at once.
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+EXECUTORS = ('thread', 'process', 'main')
+
+
+class Stage:
+    def __init__(self, name, fn, deps=(), executor='thread', cache_key=None):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r} for stage {name!r} (expected one of {EXECUTORS})")
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.executor = executor
+        self.cache_key = cache_key
+
+
+class Pipeline:
+    """A DAG of stages; run() executes them concurrently in dependency order."""
+
+    def __init__(self, cache_dir=None, max_workers=None, version=None):
+        self.stages = {}
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_workers = max_workers
+        self.results = {}
+        self.timings = {}   # name -> (start, end) in seconds since run() began; cached stages take 0
+        self.cached = set()
+        self.wall_time = 0.0
+
+    def add(self, name, fn, deps=(), executor='thread', cache_key=None):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage {name!r}")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name!r} depends on undeclared stage(s): {', '.join(missing)}")
+        self.stages[name] = Stage(name, fn, deps, executor, cache_key)
+        return name
+
+    # -- disk cache --------------------------------------------------------
+    def _cache_path(self, stage):
+        if not (self.cache_dir and stage.cache_key is not None):
+            return None
+        digest = hashlib.sha256(repr((stage.name, stage.cache_key, self.version)).encode()).hexdigest()[:16]
+        safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in stage.name)
+        return os.path.join(self.cache_dir, f'{safe}-{digest}.pkl')
+
+    def _load_cached(self, stage):
+        path = self._cache_path(stage)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    return True, pickle.load(f)
+            except Exception:
+                pass
+        return False, None
+
+    def _store_cached(self, stage, result):
+        path = self._cache_path(stage)
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+
+    # -- execution ---------------------------------------------------------
+    def run(self):
+        """Run every stage not yet computed; returns {stage name: result}."""
+        pending = {n: s for n, s in self.stages.items() if n not in self.results}
+        t0 = time.perf_counter()
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        processes = None
+        running = {}   # future -> (stage name, start time)
+        try:
+            while pending or running:
+                ready = [s for s in pending.values() if all(d in self.results for d in s.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    hit, result = self._load_cached(stage)
+                    now = time.perf_counter() - t0
+                    if hit:
+                        self.results[stage.name] = result
+                        self.cached.add(stage.name)
+                        self.timings[stage.name] = (now, now)
+                        continue
+                    args = [self.results[d] for d in stage.deps]
+                    if stage.executor == 'main':
+                        self.results[stage.name] = result = stage.fn(*args)
+                        self.timings[stage.name] = (now, time.perf_counter() - t0)
+                        self._store_cached(stage, result)
+                        continue
+                    if stage.executor == 'process':
+                        processes = processes or ProcessPoolExecutor(max_workers=self.max_workers)
+                        future = processes.submit(stage.fn, *args)
+                    else:
+                        future = threads.submit(stage.fn, *args)
+                    running[future] = (stage.name, now)
+                if ready and not running:
+                    continue   # cached/inline stages may have unblocked more work
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, start = running.pop(future)
+                    result = future.result()
+                    self.results[name] = result
+                    self.timings[name] = (start, time.perf_counter() - t0)
+                    self._store_cached(self.stages[name], result)
+        finally:
+            for future in running:
+                future.cancel()
+            threads.shutdown(wait=True)
+            if processes:
+                processes.shutdown(wait=True)
+        self.wall_time = time.perf_counter() - t0
+        return self.results
+
+    def critical_path(self):
+        """(stage names, seconds): the dependency chain with the largest total measured duration."""
+        best = {}   # name -> (chain duration, chain)
+        # Stages can only depend on earlier declarations, so insertion order is topological
+        for name in self.stages:
+            stage = self.stages[name]
+            start, end = self.timings.get(name, (0.0, 0.0))
+            prev = max((best[d] for d in stage.deps), default=(0.0, []), key=lambda b: b[0])
+            best[name] = (prev[0] + (end - start), prev[1] + [name])
+        if not best:
+            return [], 0.0
+        total, chain = max(best.values(), key=lambda b: b[0])
+        return chain, total
+
+    def report(self):
+        """Human-readable critical path and wall time."""
+        chain, total = self.critical_path()
+        steps = ' → '.join(
+            f"{n} ({'cached' if n in self.cached else f'{self.timings[n][1] - self.timings[n][0]:.2f}s'})"
+            for n in chain
+        )
+        serial = sum(end - start for start, end in self.timings.values())
+        return (f"Critical path: {steps} = {total:.2f}s\n"
+                f"  Wall time {self.wall_time:.2f}s (stages sum to {serial:.2f}s)")
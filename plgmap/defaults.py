@@ -0,0 +1,9 @@
+"""
+Option choices and defaults shared by the CLI and the modules that implement
+them. Kept free of numpy and pandas so generate.py can build its argument
+parser without loading the numeric stack.
+"""
+
+BREAK_METHODS = ('quantile', 'jenks')   # keys of classify.BREAKS
+FUZZY_THRESHOLD = 0.85
+FUZZY_MARGIN = 0.1         # best must beat the runner-up by this much, else the match is ambiguous
@@ -0,0 +1,164 @@
+"""
+Bounded-memory aggregation of user-level event rows.
+
+Each input row is one event by one user (clinician) in a city. Unique users
+are tracked with HyperLogLog sketches per county and per city (plgmap/hll.py),
+so distinct counts stay accurate at every rollup level: county, state (union
+of county sketches) and nation. Top EHRs per county and state are Space-Saving
+summaries (plgmap/topk.py) with a fixed number of counters per key, so long-tail
+EHR strings cannot grow memory. Event totals, county names and city lists are
+small per-key tallies. The whole state can be saved and loaded, so
+new event files are folded in incrementally. Folded files are recorded by
+content digest, so feeding the same export twice does not double its counts.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+
+from plgmap.hll import DEFAULT_PRECISION, SketchSet, hash_values
+from plgmap.topk import TopKSet
+
+# Accepted user/clinician id columns (first match wins)
+USER_COLUMNS = ('User ID', 'user_id', 'User Id', 'Clinician ID', 'clinician_id', 'User', 'user')
+STATE_FILES = ('county_users.npz', 'city_users.npz', 'aggregates.json')
+
+
+def find_user_column(columns):
+    return next((c for c in USER_COLUMNS if c in columns), None)
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents (the key under which a folded input is recorded)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EventAggregator:
+    """County/city/state rollups of event rows with HLL distinct-user counts."""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.county_users = SketchSet(precision)   # key: 5-digit FIPS
+        self.city_users = SketchSet(precision)     # key: "Region|City"
+        self.county_events = Counter()
+        self.city_events = Counter()
+        self.county_info = {}                      # fips -> [county_name, Region, state_abbr]
+        self.county_cities = {}                    # fips -> sorted city names
+        self.county_ehrs = TopKSet()               # fips -> Space-Saving over EHR names
+        self.state_ehrs_topk = TopKSet()           # Region -> Space-Saving over EHR names
+        self.sources = {}                          # content digest -> {path, size} of every folded file
+
+    def add_chunk(self, df, user_col):
+        """
+        Fold a prepared chunk into the rollups. df needs fips, county_name, Region,
+        state_abbr, City, events and ehr_raw columns plus the user id column.
+        """
+        if df.empty:
+            return
+        hashes = hash_values(df[user_col])
+        city_key = df['Region'] + '|' + df['City'].astype(str)
+        self.county_users.add(df['fips'].to_numpy(), hashes)
+        self.city_users.add(city_key.to_numpy(), hashes)
+
+        self.county_events.update(df.groupby('fips')['events'].sum().astype(int).to_dict())
+        self.city_events.update(df.groupby(city_key)['events'].sum().astype(int).to_dict())
+        first = df.drop_duplicates('fips')
+        for fips, name, region, abbr in zip(first['fips'], first['county_name'], first['Region'], first['state_abbr']):
+            self.county_info.setdefault(fips, [name, region, abbr])
+        for fips, cities in df.groupby('fips')['City'].unique().items():
+            self.county_cities[fips] = sorted(set(self.county_cities.get(fips, [])) | {str(c) for c in cities})
+
+        ehr = df.dropna(subset=['ehr_raw'])
+        if not ehr.empty:
+            self.county_ehrs.update_grouped(ehr.groupby(['fips', 'ehr_raw'])['events'].sum().astype(int).to_dict())
+            self.state_ehrs_topk.update_grouped(ehr.groupby(['Region', 'ehr_raw'])['events'].sum().astype(int).to_dict())
+
+    # -- persistence -------------------------------------------------------
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.county_users.save(os.path.join(directory, 'county_users.npz'))
+        self.city_users.save(os.path.join(directory, 'city_users.npz'))
+        with open(os.path.join(directory, 'aggregates.json'), 'w') as f:
+            json.dump({
+                'county_events': self.county_events,
+                'city_events': self.city_events,
+                'county_info': self.county_info,
+                'county_cities': self.county_cities,
+                'county_ehrs': self.county_ehrs.to_dict(),
+                'state_ehrs': self.state_ehrs_topk.to_dict(),
+                'sources': self.sources,
+            }, f)
+
+    @classmethod
+    def load(cls, directory, precision=DEFAULT_PRECISION):
+        """Load persisted state, or start empty if directory has none."""
+        agg = cls(precision)
+        if not all(os.path.exists(os.path.join(directory, name)) for name in STATE_FILES):
+            return agg
+        agg.county_users = SketchSet.load(os.path.join(directory, 'county_users.npz'))
+        agg.city_users = SketchSet.load(os.path.join(directory, 'city_users.npz'))
+        with open(os.path.join(directory, 'aggregates.json')) as f:
+            saved = json.load(f)
+        agg.county_events = Counter(saved['county_events'])
+        agg.city_events = Counter(saved['city_events'])
+        agg.county_info = saved['county_info']
+        agg.county_cities = saved['county_cities']
+        agg.county_ehrs = TopKSet.from_dict(saved['county_ehrs'])
+        agg.state_ehrs_topk = TopKSet.from_dict(saved['state_ehrs'])
+        agg.sources = saved.get('sources', {})
+        return agg
+
+    # -- rollups -----------------------------------------------------------
+    def county_frame(self):
+        """
+        One row per county: fips, county_name, Region, state_abbr, uniques, events,
+        num_cities, ehr_list and ehr_err (largest Space-Saving error among the listed EHRs).
+        """
+        uniques = self.county_users.estimate()
+        rows = []
+        for fips, info in sorted(self.county_info.items()):
+            top = self.county_ehrs.top(fips)
+            rows.append({
+                'fips': fips, 'county_name': info[0] or f"County {fips[2:]}", 'Region': info[1],
+                'state_abbr': info[2], 'uniques': int(round(uniques.get(fips, 0))),
+                'events': int(self.county_events.get(fips, 0)),
+                'num_cities': len(self.county_cities.get(fips, [])),
+                'ehr_list': [name for name, _, _ in top], 'ehr_err': max((err for _, _, err in top), default=0),
+            })
+        return pd.DataFrame(rows, columns=['fips', 'county_name', 'Region', 'state_abbr', 'uniques',
+                                           'events', 'num_cities', 'ehr_list', 'ehr_err'])
+
+    def city_frame(self):
+        """One row per city: Region, City, clinicians (distinct users), visits."""
+        uniques = self.city_users.estimate()
+        rows = []
+        for key, visits in self.city_events.items():
+            region, city = key.split('|', 1)
+            rows.append({'Region': region, 'City': city,
+                         'clinicians': int(round(uniques.get(key, 0))), 'visits': int(visits)})
+        return pd.DataFrame(rows, columns=['Region', 'City', 'clinicians', 'visits'])
+
+    def state_clinicians(self):
+        """{Region: distinct users}, from the union of the state's county sketches."""
+        by_state = {}
+        for fips, info in self.county_info.items():
+            by_state.setdefault(info[1], []).append(fips)
+        return {state: int(round(self.county_users.union_estimate(fips_list)))
+                for state, fips_list in by_state.items()}
+
+    def national_clinicians(self):
+        return int(round(self.county_users.union_estimate()))
+
+    def state_ehrs(self):
+        """{Region: [{'ehr', 'events', 'err'}]}: top EHRs with upper-bound event counts and their error."""
+        return {
+            state: [{'ehr': name, 'events': int(count), 'err': int(err)}
+                    for name, count, err in self.state_ehrs_topk.top(state)]
+            for state in self.state_ehrs_topk.summaries
+        }
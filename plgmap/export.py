@@ -0,0 +1,130 @@
+"""
+Pipeline output stages: the interactive HTML (and its offline bundle), Kaleido
+PNG/PDF renders, SVG maps and raster tile pyramids.
+
+Figure building (Plotly) is imported inside the render functions, so runs that
+only write HTML never load it. Renders usually execute in worker processes; the
+GeometryStore re-opens its memory map there.
+
+With a cache_dir, render_static and render_svg skip figures whose inputs are
+unchanged since an earlier run (plgmap/rendercache.py) and return a RenderResult
+saying whether the file was rendered, copied from the cache or left as is.
+"""
+
+import os
+
+from plgmap import rendercache
+from plgmap.ingest import GEOJSON_URL
+from plgmap.interactive import build_interactive_html
+
+
+def export_html(county_df, geojson, fname, export=None):
+    """Write the interactive HTML when requested, or as the fallback when GeoJSON is unavailable."""
+    if export in ('png', 'pdf', 'svg', 'bundle', 'all') and geojson is None:
+        print("\n  ⚠ Static image and bundle export require the GeoJSON file locally.")
+        print(f"    Download it first:  curl -o geojson-counties-fips.json {GEOJSON_URL}")
+        print("    Then re-run the script. Falling back to HTML export...\n")
+    if export not in (None, 'html', 'all') and geojson is not None:
+        return None
+    html = build_interactive_html(county_df, geojson)
+    with open(fname, 'w') as f:
+        f.write(html)
+    print(f"  Exported: {fname}")
+    return fname
+
+
+def export_bundle(county_df, geojson, fname):
+    """Write the single-file offline HTML (embedded compressed geometry and local Plotly)."""
+    if geojson is None:
+        return None
+    html = build_interactive_html(county_df, geojson, bundle=True)
+    with open(fname, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"  Exported: {fname} ({os.path.getsize(fname) / 1e6:.1f} MB, no network requests)")
+    return fname
+
+
+def _cached(county_df, geojson, fname, cache_dir, options):
+    """(cache key, RenderResult on a hit); the key is None without a cache_dir."""
+    if not cache_dir:
+        return None, None
+    key = rendercache.render_key(county_df, geojson, fname, **options)
+    status = rendercache.restore(cache_dir, key, fname)
+    if status:
+        print(f"  Cached: {fname} ({status})")
+        return key, rendercache.RenderResult(fname, status)
+    return key, None
+
+
+def _rendered(fname, cache_dir, key):
+    if key:
+        rendercache.save(cache_dir, key, fname)
+    print(f"  Exported: {fname}")
+    return rendercache.RenderResult(fname, 'rendered')
+
+
+def render_static(county_df, geojson, fname, metric=None, state_filter=None, use_log=True,
+                  classed=None, width=1600, cache_dir=None):
+    """
+    Build one static figure (combined, or a single metric) and write it to fname.
+    """
+    if geojson is None:
+        return None
+    key, hit = _cached(county_df, geojson, fname, cache_dir,
+                       dict(metric=metric, state_filter=state_filter, use_log=use_log, classed=classed, width=width))
+    if hit:
+        return hit
+    from plgmap.figures import build_figure, build_single_figure
+
+    if metric:
+        fig = build_single_figure(county_df, geojson, metric=metric, state_filter=state_filter,
+                                  use_log=use_log, classed=classed)
+    else:
+        fig = build_figure(county_df, geojson, state_filter=state_filter, use_log=use_log, classed=classed)
+    if not fig:
+        return None
+    fig.write_image(fname, width=width, height=700, scale=2)
+    return _rendered(fname, cache_dir, key)
+
+
+def render_svg(county_df, geojson, fname, metric, state_filter=None, use_log=True, classed=None, cache_dir=None):
+    """Write one single-metric SVG map drawn from pre-projected geometry."""
+    if geojson is None:
+        return None
+    key, hit = _cached(county_df, geojson, fname, cache_dir,
+                       dict(metric=metric, state_filter=state_filter, use_log=use_log, classed=classed))
+    if hit:
+        return hit
+    from plgmap.figures import build_svg_map
+
+    svg = build_svg_map(county_df, geojson, metric=metric, state_filter=state_filter,
+                        use_log=use_log, classed=classed)
+    if not svg:
+        return None
+    with open(fname, 'w') as f:
+        f.write(svg)
+    return _rendered(fname, cache_dir, key)
+
+
+def render_hex(points, fname, size_km, state_filter=None, use_log=True):
+    """Build the hexagon-bin figure and write it to fname (worker process)."""
+    from plgmap.figures import build_hex_figure
+
+    fig = build_hex_figure(points, size_km, state_filter=state_filter, use_log=use_log)
+    if not fig:
+        return None
+    fig.write_image(fname, width=1600, height=700, scale=2)
+    print(f"  Exported: {fname}")
+    return fname
+
+
+def write_tiles(county_df, geojson, out_dir, zooms, max_workers=None):
+    """Render the XYZ raster tile pyramid (plgmap/tiles.py) for every metric and scale."""
+    if geojson is None:
+        print("  ⚠ Raster tiles need the county GeoJSON locally; skipped.")
+        return None
+    from plgmap import tiles
+
+    written = tiles.build_tiles(county_df, geojson, out_dir, zooms=zooms, max_workers=max_workers)
+    print(f"  Wrote {written} raster tiles (zoom {zooms[0]}–{zooms[1]}) to {out_dir}")
+    return out_dir
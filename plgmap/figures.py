@@ -0,0 +1,454 @@
+"""
+Static choropleth figures: Plotly figures for Kaleido export, and SVG maps drawn
+from pre-projected geometry (plgmap/cartesian.py).
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import sample_colorscale
+from plotly.subplots import make_subplots
+
+from plgmap import cartesian, classify, hexgrid, metrics
+from plgmap.states import STATE_ABBREVS, STATE_CENTERS
+
+# Shared look of every static map: dark page, blue uniques, purple events
+BLUE_SCALE = [
+    [0, '#0d1b2a'], [0.15, '#0e3b5e'], [0.35, '#146b8e'],
+    [0.55, '#1a9ec2'], [0.75, '#38bdf8'], [1, '#bae6fd']
+]
+PURPLE_SCALE = [
+    [0, '#0d0a1a'], [0.15, '#261454'], [0.35, '#4a2592'],
+    [0.55, '#7044d4'], [0.75, '#a78bfa'], [1, '#ddd6fe']
+]
+LOG_TICKS = [0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000]
+MARKER_LINE = dict(width=0.3, color='#1e2a3a')
+HOVERLABEL = dict(bgcolor='#121825', bordercolor='#1e2a3a', font=dict(size=12, color='#e2e8f0'))
+GEO_STYLE = dict(bgcolor='rgba(0,0,0,0)', lakecolor='#0a0e17', landcolor='#0f1520',
+                 showlakes=True, showland=True, subunitcolor='#1e2a3a')
+PAGE_STYLE = dict(paper_bgcolor='#0a0e17', plot_bgcolor='#0a0e17', font=dict(color='#e2e8f0'),
+                  margin=dict(t=90, b=20, l=20, r=20))
+
+
+def log_ticks(max_val):
+    """Colorbar tickvals/ticktext for a log1p scale: round counts up to 1.2 × max_val."""
+    ticks = [v for v in LOG_TICKS if v <= max_val * 1.2]
+    return dict(tickvals=[np.log1p(v) for v in ticks],
+                ticktext=[f'{v:,}' if v < 1000 else f'{v // 1000}k' for v in ticks])
+
+
+def map_title(heading, subtitle):
+    """Centered map title with a grey subtitle line."""
+    return dict(
+        text=f'{heading}<br><span style="font-size:13px;color:#8492a6">{subtitle}</span>',
+        font=dict(size=20, color='#e2e8f0'),
+        x=0.5, xanchor='center',
+    )
+
+
+# ---------------------------------------------------------------------------
+# STEP 5: Build choropleth figure
+# ---------------------------------------------------------------------------
+def classed_scale(values, method, colorscale):
+    """
+    Quantile/Jenks classing for one choropleth trace (see plgmap/classify.py).
+    Returns (z, trace_kwargs, colorbar_kwargs): class indices, a stepped colorscale
+    with zmin/zmax, and one colorbar tick per class labelled with its value range.
+    """
+    edges = classify.BREAKS[method](values)
+    n = len(edges) - 1
+    colors = sample_colorscale(colorscale, [i / max(n - 1, 1) for i in range(n)])
+    stepped = []
+    for i, color in enumerate(colors):
+        stepped += [[i / n, color], [(i + 1) / n, color]]
+    z = classify.classify(values, edges)
+    trace_kwargs = dict(colorscale=stepped, zmin=-0.5, zmax=n - 0.5)
+    colorbar_kwargs = dict(tickvals=list(range(n)), ticktext=classify.class_labels(edges))
+    return z, trace_kwargs, colorbar_kwargs
+
+
+def build_figure(county_df, geojson, state_filter=None, use_log=True, classed=None):
+    """
+    Build a side-by-side choropleth with Uniques (left) and Events (right).
+    Optionally filter to a single state. geojson is the GeometryStore from load_geojson().
+    classed: None for a continuous log/linear scale, or 'quantile' / 'jenks' for
+    classed colors with breaks computed over the mapped counties.
+    """
+    data = county_df.copy()
+    title_suffix = ""
+    geo_scope = "usa"
+
+    if state_filter:
+        abbr = STATE_ABBREVS.get(state_filter, state_filter)
+        # Accept either full name or abbreviation
+        if len(state_filter) == 2:
+            abbr = state_filter.upper()
+            state_filter = {v: k for k, v in STATE_ABBREVS.items()}.get(abbr, state_filter)
+        data = data[data['state_abbr'] == abbr]
+        title_suffix = f" — {state_filter}"
+
+        if len(data) == 0:
+            print(f"  ⚠ No data for state: {state_filter}")
+            return None
+
+        # Filter geometry to only this state's FIPS (first 2 digits = state FIPS)
+        state_fips_prefix = data['fips'].iloc[0][:2]
+        filtered_geojson = geojson.to_geojson(state_fips_prefix)
+    else:
+        filtered_geojson = geojson.to_geojson()
+
+    # Hover text
+    data['hover'] = (
+        data['county_name'] + ', ' + data['Region']
+        + '<br>Uniques: ' + data['A. Uniques of First Scribe Created'].astype(str)
+        + '<br>Total Events: ' + data['B. Total Events of Scribe Created'].apply(lambda x: f'{x:,}')
+        + '<br>Cities: ' + data['num_cities'].astype(str)
+        + metrics.hover_lines(data)
+    )
+
+    # Color values
+    scale_kwargs = {'u': dict(colorscale=BLUE_SCALE), 'e': dict(colorscale=PURPLE_SCALE)}
+    class_ticks = {}
+    if classed:
+        data['z_uniques'], scale_kwargs['u'], class_ticks['u'] = classed_scale(
+            data['A. Uniques of First Scribe Created'], classed, BLUE_SCALE)
+        data['z_events'], scale_kwargs['e'], class_ticks['e'] = classed_scale(
+            data['B. Total Events of Scribe Created'], classed, PURPLE_SCALE)
+    elif use_log:
+        data['z_uniques'] = np.log1p(data['A. Uniques of First Scribe Created'])
+        data['z_events'] = np.log1p(data['B. Total Events of Scribe Created'])
+    else:
+        data['z_uniques'] = data['A. Uniques of First Scribe Created']
+        data['z_events'] = data['B. Total Events of Scribe Created']
+
+    # --- Build subplots ---
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=[
+            '<b>Unique First Scribes Created</b>',
+            '<b>Total Scribe Events</b>'
+        ],
+        specs=[[{"type": "choropleth"}, {"type": "choropleth"}]],
+        horizontal_spacing=0.03,
+    )
+
+    def make_colorbar(metric, position):
+        vals = data[f'A. Uniques of First Scribe Created' if metric == 'u' else 'B. Total Events of Scribe Created']
+        label = 'Uniques' if metric == 'u' else 'Events'
+        cb = dict(
+            title=dict(text=label, font=dict(size=12)),
+            len=0.55, thickness=14, x=position,
+            tickfont=dict(size=10),
+        )
+        if classed:
+            cb.update(class_ticks[metric])
+        elif use_log:
+            cb.update(log_ticks(vals.max()))
+        return cb
+
+    # Uniques map (left)
+    fig.add_trace(go.Choropleth(
+        geojson=filtered_geojson,
+        locations=data['fips'],
+        z=data['z_uniques'],
+        text=data['hover'],
+        hoverinfo='text',
+        colorbar=make_colorbar('u', 0.44),
+        **scale_kwargs['u'],
+        marker_line=MARKER_LINE,
+        hoverlabel=HOVERLABEL,
+    ), row=1, col=1)
+
+    # Events map (right)
+    fig.add_trace(go.Choropleth(
+        geojson=filtered_geojson,
+        locations=data['fips'],
+        z=data['z_events'],
+        text=data['hover'],
+        hoverinfo='text',
+        colorbar=make_colorbar('e', 1.01),
+        **scale_kwargs['e'],
+        marker_line=MARKER_LINE,
+        hoverlabel=HOVERLABEL,
+    ), row=1, col=2)
+
+    # Geo settings
+    geo_common = dict(GEO_STYLE)
+
+    if state_filter and abbr in STATE_CENTERS:
+        lat, lon = STATE_CENTERS[abbr]
+        geo_common.update(
+            projection=dict(type='albers usa'),
+            center=dict(lat=lat, lon=lon),
+        )
+        fig.update_geos(scope='usa', fitbounds='locations', visible=False, **geo_common)
+    else:
+        fig.update_geos(scope='usa', projection_type='albers usa', **geo_common)
+
+    # Layout
+    scale_label = f"{classed.title()} Classes" if classed else "Log Scale" if use_log else "Linear Scale"
+    fig.update_layout(
+        title=map_title(f'PLG Scribe Engagement by County{title_suffix}',
+                        f'Feb 14 2025 → Feb 9 2026 · {len(data)} counties · {scale_label}'),
+        **PAGE_STYLE,
+        height=600,
+        width=1400,
+    )
+
+    # Style subtitle font
+    for ann in fig.layout.annotations:
+        ann.font = dict(size=14, color='#8492a6')
+
+    return fig
+
+
+def build_single_figure(county_df, geojson, metric='events', state_filter=None, use_log=True, classed=None):
+    """
+    Build a single-metric choropleth (for individual exports).
+    metric: 'uniques', 'events', 'hotspot_uniques' or 'hotspot_events'
+    classed: None, 'quantile' or 'jenks' (see build_figure)
+    """
+    if metric.startswith('hotspot_'):
+        return build_hotspot_figure(county_df, geojson, metric=metric[len('hotspot_'):],
+                                    state_filter=state_filter)
+    data = county_df.copy()
+    title_suffix = ""
+    abbr = None
+
+    if state_filter:
+        abbr = STATE_ABBREVS.get(state_filter, state_filter)
+        if len(state_filter) == 2:
+            abbr = state_filter.upper()
+            state_filter = {v: k for k, v in STATE_ABBREVS.items()}.get(abbr, state_filter)
+        data = data[data['state_abbr'] == abbr]
+        title_suffix = f" — {state_filter}"
+        if len(data) == 0:
+            return None
+
+        state_fips_prefix = data['fips'].iloc[0][:2]
+        filtered_geojson = geojson.to_geojson(state_fips_prefix)
+    else:
+        filtered_geojson = geojson.to_geojson()
+
+    is_uniques = metric == 'uniques'
+    col = 'A. Uniques of First Scribe Created' if is_uniques else 'B. Total Events of Scribe Created'
+    label = 'Unique First Scribes Created' if is_uniques else 'Total Scribe Events'
+
+    data['hover'] = (
+        data['county_name'] + ', ' + data['Region']
+        + f'<br>{label}: ' + data[col].apply(lambda x: f'{x:,}')
+        + '<br>Cities: ' + data['num_cities'].astype(str)
+        + metrics.hover_lines(data)
+    )
+
+    colorscale = BLUE_SCALE if is_uniques else PURPLE_SCALE
+
+    scale_kwargs = dict(colorscale=colorscale)
+    if classed:
+        z_vals, scale_kwargs, class_ticks = classed_scale(data[col], classed, colorscale)
+    else:
+        z_vals = np.log1p(data[col]) if use_log else data[col]
+
+    # Colorbar ticks
+    cb = dict(title=dict(text=label, font=dict(size=13)), len=0.65, thickness=16, tickfont=dict(size=11))
+    if classed:
+        cb.update(class_ticks)
+    elif use_log:
+        cb.update(log_ticks(data[col].max()))
+
+    fig = go.Figure(go.Choropleth(
+        geojson=filtered_geojson,
+        locations=data['fips'],
+        z=z_vals,
+        text=data['hover'],
+        hoverinfo='text',
+        colorbar=cb,
+        **scale_kwargs,
+        marker_line=MARKER_LINE,
+        hoverlabel=HOVERLABEL,
+    ))
+
+    geo_opts = dict(scope='usa', **GEO_STYLE)
+    if state_filter and abbr in STATE_CENTERS:
+        geo_opts.update(fitbounds='locations', visible=False)
+    else:
+        geo_opts['projection_type'] = 'albers usa'
+
+    scale_label = f"{classed.title()} Classes" if classed else "Log Scale" if use_log else "Linear Scale"
+    fig.update_layout(
+        title=map_title(f'{label}{title_suffix}',
+                        f'Feb 14 2025 → Feb 9 2026 · {len(data)} counties · {scale_label}'),
+        geo=geo_opts,
+        **PAGE_STYLE,
+        height=600,
+        width=900,
+    )
+    return fig
+
+
+def build_hotspot_figure(county_df, geojson, metric='uniques', state_filter=None):
+    """
+    Getis-Ord Gi* hot-spot map for one metric ('uniques' or 'events').
+    Statistics are computed over the national county adjacency graph (counties
+    without usage count as 0), so a state view shows its slice of national clusters.
+    """
+    from plgmap import spatial
+
+    is_uniques = metric == 'uniques'
+    col = 'A. Uniques of First Scribe Created' if is_uniques else 'B. Total Events of Scribe Created'
+    label = 'Unique First Scribes Created' if is_uniques else 'Total Scribe Events'
+    title_suffix = ""
+    abbr = None
+
+    stats = spatial.hotspot_frame(geojson, {metric: county_df.set_index('fips')[col]}).reset_index()
+    names = dict(zip(county_df['fips'], county_df['county_name'] + ', ' + county_df['Region']))
+    values = dict(zip(county_df['fips'], county_df[col]))
+
+    if state_filter:
+        abbr = STATE_ABBREVS.get(state_filter, state_filter)
+        if len(state_filter) == 2:
+            abbr = state_filter.upper()
+            state_filter = {v: k for k, v in STATE_ABBREVS.items()}.get(abbr, state_filter)
+        state_rows = county_df[county_df['state_abbr'] == abbr]
+        title_suffix = f" — {state_filter}"
+        if len(state_rows) == 0:
+            return None
+        state_fips_prefix = state_rows['fips'].iloc[0][:2]
+        stats = stats[stats['fips'].str[:2] == state_fips_prefix]
+        filtered_geojson = geojson.to_geojson(state_fips_prefix)
+    else:
+        filtered_geojson = geojson.to_geojson()
+
+    gi = stats[f'gi_{metric}']
+    significance = np.where(gi >= spatial.SIGNIFICANCE_Z, 'Hot spot (95%)',
+                            np.where(gi <= -spatial.SIGNIFICANCE_Z, 'Cold spot (95%)', 'Not significant'))
+    hover = [
+        f"{names.get(f, f'County {f[2:]}')}<br>{label}: {values.get(f, 0):,}"
+        f"<br>Gi* z-score: {g:.2f}<br>Local Moran's I: {m:.2f}<br>{sig}"
+        for f, g, m, sig in zip(stats['fips'], gi, stats[f'moran_{metric}'], significance)
+    ]
+
+    fig = go.Figure(go.Choropleth(
+        geojson=filtered_geojson,
+        locations=stats['fips'],
+        z=gi,
+        zmid=0, zmin=-3, zmax=3,
+        text=hover,
+        hoverinfo='text',
+        colorscale=[[0, '#38bdf8'], [0.35, '#146b8e'], [0.5, '#0f1520'],
+                    [0.65, '#7044d4'], [1, '#ddd6fe']],
+        colorbar=dict(title=dict(text='Gi* z-score', font=dict(size=13)), len=0.65, thickness=16,
+                      tickfont=dict(size=11), tickvals=[-3, -1.96, 0, 1.96, 3],
+                      ticktext=['≤ -3', '-1.96', '0', '1.96', '≥ 3']),
+        marker_line=MARKER_LINE,
+        hoverlabel=HOVERLABEL,
+    ))
+
+    geo_opts = dict(scope='usa', **GEO_STYLE)
+    if state_filter and abbr in STATE_CENTERS:
+        geo_opts.update(fitbounds='locations', visible=False)
+    else:
+        geo_opts['projection_type'] = 'albers usa'
+
+    n_hot = int((gi >= spatial.SIGNIFICANCE_Z).sum())
+    fig.update_layout(
+        title=map_title(f'{label} Hot Spots{title_suffix}',
+                        f'Getis-Ord Gi* · {n_hot} significant hot-spot counties (95%)'),
+        geo=geo_opts,
+        **PAGE_STYLE,
+        height=600,
+        width=900,
+    )
+    return fig
+
+
+def build_svg_map(county_df, geojson, metric='events', state_filter=None, use_log=True, classed=None):
+    """
+    Single-metric choropleth as an SVG string, drawn from the store's pre-projected
+    Albers USA geometry (plgmap/cartesian.py): no per-render projection and no Kaleido.
+    Same colors as build_single_figure; the legend shows classes or five sampled values.
+    """
+    data = county_df
+    only = None
+    title_suffix = ""
+    if state_filter:
+        abbr = state_filter.upper() if len(state_filter) == 2 else STATE_ABBREVS.get(state_filter, state_filter)
+        data = data[data['state_abbr'] == abbr]
+        if len(data) == 0:
+            return None
+        start, stop = geojson.state_range(data['fips'].iloc[0][:2])
+        only = geojson.ids[start:stop]
+        title_suffix = f" — {state_filter}"
+
+    is_uniques = metric == 'uniques'
+    col = 'A. Uniques of First Scribe Created' if is_uniques else 'B. Total Events of Scribe Created'
+    label = 'Unique First Scribes Created' if is_uniques else 'Total Scribe Events'
+    colorscale = BLUE_SCALE if is_uniques else PURPLE_SCALE
+
+    values = data[col].to_numpy(dtype=float)
+    if classed:
+        edges = classify.BREAKS[classed](values)
+        n = len(edges) - 1
+        class_colors = sample_colorscale(colorscale, [i / max(n - 1, 1) for i in range(n)])
+        colors = [class_colors[i] for i in classify.classify(values, edges)]
+        legend = list(zip(class_colors, classify.class_labels(edges)))
+    else:
+        scaled = np.log1p(values) if use_log else values
+        lo, hi = float(scaled.min()), float(scaled.max())
+        t = (scaled - lo) / (hi - lo) if hi > lo else np.zeros_like(scaled)
+        colors = sample_colorscale(colorscale, t.tolist())
+        stops = np.linspace(lo, hi, 5)
+        raw = np.expm1(stops) if use_log else stops
+        legend = list(zip(sample_colorscale(colorscale, np.linspace(0, 1, 5).tolist()),
+                          [f'{int(round(v)):,}' for v in raw]))
+
+    scale_label = f"{classed.title()} Classes" if classed else "Log Scale" if use_log else "Linear Scale"
+    title = f"{label}{title_suffix} · {len(data)} counties · {scale_label}"
+    return cartesian.svg_document(geojson, dict(zip(data['fips'], colors)), title=title, legend=legend, only=only)
+
+
+def build_hex_figure(points, size_km, state_filter=None, use_log=True):
+    """Side-by-side uniques/events choropleth of hexagon bins (fixed geometry, any data size)."""
+    if state_filter:
+        abbr = state_filter.upper() if len(state_filter) == 2 else STATE_ABBREVS.get(state_filter, state_filter)
+        points = points[points['state_abbr'] == abbr]
+        if len(points) == 0:
+            print(f"  ⚠ No data for state: {state_filter}")
+            return None
+    cells = hexgrid.bin_points(points['lon'], points['lat'], {'u': points['u'], 'e': points['e']}, size_km)
+    gj = hexgrid.to_geojson(cells, size_km)
+    ids = hexgrid.cell_ids(cells)
+    hover = [f"{n} cities<br>Uniques: {u:,}<br>Total Events: {e:,}"
+             for n, u, e in zip(cells['n'], cells['u'], cells['e'])]
+
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=['<b>Unique First Scribes Created</b>', '<b>Total Scribe Events</b>'],
+        specs=[[{"type": "choropleth"}, {"type": "choropleth"}]],
+        horizontal_spacing=0.03,
+    )
+    for col, (metric, scale, x) in enumerate([('u', BLUE_SCALE, 0.44), ('e', PURPLE_SCALE, 1.01)], start=1):
+        z = np.log1p(cells[metric]) if use_log else cells[metric]
+        cb = dict(title=dict(text='Uniques' if metric == 'u' else 'Events', font=dict(size=12)),
+                  len=0.55, thickness=14, x=x, tickfont=dict(size=10))
+        if use_log:
+            cb.update(log_ticks(cells[metric].max()))
+        fig.add_trace(go.Choropleth(
+            geojson=gj, locations=ids, z=z, text=hover, hoverinfo='text',
+            colorscale=scale, colorbar=cb, marker_line=MARKER_LINE, hoverlabel=HOVERLABEL,
+        ), row=1, col=col)
+    geo = dict(scope='usa', projection_type='albers usa', **GEO_STYLE)
+    if state_filter:
+        geo.update(fitbounds='locations', visible=False)
+    fig.update_geos(**geo)
+    scale_label = "Log Scale" if use_log else "Linear Scale"
+    title_suffix = f" — {state_filter}" if state_filter else ''
+    fig.update_layout(
+        title=map_title(f'PLG Scribe Engagement — {size_km} km hexagons{title_suffix}',
+                        f'Feb 14 2025 → Feb 9 2026 · {len(cells["n"])} hexagons · {scale_label}'),
+        **PAGE_STYLE,
+        height=600,
+        width=1400,
+    )
+    for ann in fig.layout.annotations:
+        ann.font = dict(size=14, color='#8492a6')
+    return fig
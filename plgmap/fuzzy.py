@@ -0,0 +1,131 @@
+"""
+Batched trigram matching of place names (e.g. unresolved city names).
+
+Each candidate name is normalized (case, punctuation, common abbreviations
+such as St → Saint and Ft → Fort, "Mc Donald" → "McDonald", and filler words such
+as Township) and split into character trigrams. A sparse
+binary name × trigram matrix serves as the inverted index. All queries for one
+state are matched in a single sparse product Q · Cᵀ, which yields the shared
+trigram count of every (query, candidate) pair that shares at least one
+trigram. The pair score is the Dice coefficient
+2·shared / (|query| + |candidate|). Cost scales with the number of shared
+trigrams, not with unmatched × candidates.
+
+Names that agree once spaces are dropped ("La Place" / "Laplace", "Des Moines" /
+"DesMoines") score 1.0. Anything else must clear a high threshold and beat the
+runner-up clearly. A near-miss such as Goldsboro → Gouldsboro is left unmatched,
+and its best candidate is reported for review instead of being assigned.
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+from plgmap.defaults import FUZZY_MARGIN as DEFAULT_MARGIN, FUZZY_THRESHOLD as DEFAULT_THRESHOLD
+ABBREVIATIONS = {
+    'ST': 'SAINT', 'STE': 'SAINTE', 'FT': 'FORT', 'MT': 'MOUNT', 'PT': 'POINT',
+    'N': 'NORTH', 'S': 'SOUTH', 'E': 'EAST', 'W': 'WEST', 'HTS': 'HEIGHTS', 'SPGS': 'SPRINGS',
+}
+FILLER_WORDS = {'TOWNSHIP', 'TWP', 'THE'}
+
+# name is the accepted candidate (None when rejected); candidate is the best one either way
+Match = namedtuple('Match', 'query name score runner_up candidate')
+
+
+def normalize(name):
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    text = re.sub(r"['’‘`]", '', text.upper())
+    text = re.sub(r'^CITY OF ', '', re.sub(r'[^A-Z0-9 ]+', ' ', text).strip())
+    text = re.sub(r'\bMC ', 'MC', text)
+    return ' '.join(ABBREVIATIONS.get(w, w) for w in text.split() if w not in FILLER_WORDS)
+
+
+def trigrams(name):
+    padded = f'  {normalize(name)} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def compact(name):
+    return normalize(name).replace(' ', '')
+
+
+class TrigramIndex:
+    """Inverted trigram index over a fixed list of candidate names."""
+
+    def __init__(self, names):
+        from scipy import sparse   # imported on first use, so loading the module does not pull in scipy
+
+        self.names = list(names)
+        self.vocab = {}
+        self.compact = {}   # space-free normalized name -> first candidate with it
+        rows, cols = [], []
+        for i, name in enumerate(self.names):
+            self.compact.setdefault(compact(name), i)
+            for gram in trigrams(name):
+                rows.append(i)
+                cols.append(self.vocab.setdefault(gram, len(self.vocab)))
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(self.names), len(self.vocab)))
+        self.sizes = np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    def match(self, queries, threshold=DEFAULT_THRESHOLD, margin=DEFAULT_MARGIN):
+        """
+        Best candidate per query as Match(query, name, score, runner_up score, candidate).
+        name is None when the best score is below threshold or within margin of the
+        runner-up; a candidate equal to the query apart from spacing scores 1.0.
+        """
+        from scipy import sparse
+
+        queries = list(queries)
+        if not queries or not self.names:
+            return [Match(q, None, 0.0, 0.0, None) for q in queries]
+        rows, cols, q_sizes = [], [], np.zeros(len(queries))
+        for i, q in enumerate(queries):
+            grams = trigrams(q)
+            q_sizes[i] = len(grams)   # unknown trigrams still count towards the query's size
+            for gram in grams:
+                j = self.vocab.get(gram)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+        q_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(queries), len(self.vocab)))
+        shared = (q_matrix @ self.matrix.T).tocoo()
+        results = [Match(q, None, 0.0, 0.0, None) for q in queries]
+        if shared.nnz == 0:
+            return results
+        scores = 2.0 * shared.data / (q_sizes[shared.row] + self.sizes[shared.col])
+        exact = np.array([self.compact.get(compact(q), -1) for q in queries])
+        scores[exact[shared.row] == shared.col] = 1.0
+
+        # Per query: best and runner-up score (sort by query, then score descending)
+        order = np.lexsort((-scores, shared.row))
+        q_rows, cands, scores = shared.row[order], shared.col[order], scores[order]
+        first = np.flatnonzero(np.r_[True, q_rows[1:] != q_rows[:-1]])
+        for k, start in enumerate(first):
+            end = first[k + 1] if k + 1 < len(first) else len(q_rows)
+            best = float(scores[start])
+            runner_up = float(scores[start + 1]) if end - start > 1 else 0.0
+            accept = best == 1.0 or (best >= threshold and best - runner_up >= margin)
+            candidate = self.names[cands[start]]
+            results[q_rows[start]] = Match(queries[q_rows[start]], candidate if accept else None, best, runner_up,
+                                           candidate)
+        return results
+
+
+def match_by_group(queries, candidates, threshold=DEFAULT_THRESHOLD, margin=DEFAULT_MARGIN):
+    """
+    Match (group, name) queries against {group: [candidate names]} (e.g. per state),
+    one batched sparse product per group. Returns Matches in query order.
+    """
+    by_group = {}
+    for i, (group, name) in enumerate(queries):
+        by_group.setdefault(group, []).append(i)
+    results = [None] * len(queries)
+    for group, idx in by_group.items():
+        index = TrigramIndex(candidates.get(group, []))
+        for i, m in zip(idx, index.match([queries[i][1] for i in idx], threshold, margin)):
+            results[i] = m
+    return results
@@ -0,0 +1,259 @@
+"""
+Batch geocoding of city/state pairs against a Geocodio-compatible API.
+
+Replaces the manual "export, geocode, re-import" round trip that produced the
+geocoded CSV schema (State FIPS, County FIPS, Geocodio County). Only pairs
+missing from the local cache (data/geocode_cache.json) are sent. They go in
+batches of up to batch_size queries, one POST per batch:
+
+    POST {base_url}/geocode?fields=census[&api_key=...]   body: ["Akron, AL", ...]
+    → {"results": [{"query": "Akron, AL", "response": {"results": [
+          {"location": {"lat": .., "lng": ..}, "address_components": {"county": "Hale County"},
+           "fields": {"census": {"2024": {"county_fips": "01065", ...}}}}]}}, ...]}
+
+Batches run as asyncio tasks over a fixed pool of keep-alive http.client
+connections. The pool size is the concurrency limit; blocking socket I/O runs in
+worker threads via asyncio.to_thread. Connection errors, 429 and 5xx responses
+are retried with exponential backoff and jitter, honouring Retry-After. A batch
+that still fails is reported and left uncached, so the next run asks again.
+Places the API cannot resolve are cached as null, so they are not re-sent.
+
+scripts/mock_geocoder.py serves the same API locally (answers from the zipcodes
+package, with optional latency and injected failures) so the flow runs offline.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import time
+from urllib.parse import urlencode, urlsplit
+
+import pandas as pd
+
+from plgmap.ingest import REPO_ROOT, is_geocoded_csv
+from plgmap.states import STATE_ABBREVS
+
+GEOCODE_CACHE = os.path.join(REPO_ROOT, 'data', 'geocode_cache.json')
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeocodeError(Exception):
+    pass
+
+
+class GeocodeCache:
+    """{"City, ST": {"fips", "county", "lat", "lon"} or None} persisted as one JSON file."""
+
+    def __init__(self, path=GEOCODE_CACHE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+        self.dirty = False
+
+    def __contains__(self, query):
+        return query in self.entries
+
+    def get(self, query):
+        return self.entries.get(query)
+
+    def update(self, results):
+        self.entries.update(results)
+        self.dirty = self.dirty or bool(results)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f, indent=0, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def parse_result(item):
+    """Cache entry for one batch result item, or None when the place was not resolved to a county."""
+    results = (item.get('response') or {}).get('results') or []
+    if not results:
+        return None
+    best = results[0]
+    census = (best.get('fields') or {}).get('census') or {}
+    latest = census[max(census)] if census else {}
+    fips = latest.get('county_fips')
+    if not fips:
+        return None
+    location = best.get('location') or {}
+    return {'fips': str(fips).zfill(5), 'county': (best.get('address_components') or {}).get('county') or '',
+            'lat': location.get('lat'), 'lon': location.get('lng')}
+
+
+class ConnectionPool:
+    """A fixed set of keep-alive HTTP(S) connections to one host; size bounds concurrent requests."""
+
+    def __init__(self, base_url, size=DEFAULT_CONCURRENCY, timeout=30):
+        url = urlsplit(base_url)
+        self.https = url.scheme == 'https'
+        self.host, self.port = url.hostname, url.port
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait(None)   # connections are opened lazily
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _send(self, conn, method, path, body, headers):
+        conn = conn or self._connect()
+        try:
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+            return conn, response.status, dict(response.getheaders()), response.read()
+        except Exception:
+            conn.close()
+            raise
+
+    async def request(self, method, path, body=None, headers=None):
+        """(status, headers, body); waits for a free connection first."""
+        conn = await self.idle.get()
+        try:
+            conn, status, resp_headers, data = await asyncio.to_thread(self._send, conn, method, path, body,
+                                                                       headers or {})
+        except BaseException:
+            # The connection may be mid-request (or already closed by _send): close it and
+            # hand the slot back empty, so the next request opens a fresh one.
+            if conn is not None:
+                conn.close()
+            self.idle.put_nowait(None)
+            raise
+        if resp_headers.get('Connection', '').lower() == 'close':
+            conn.close()
+            conn = None
+        self.idle.put_nowait(conn)
+        return status, resp_headers, data
+
+    async def close(self):
+        while not self.idle.empty():
+            conn = self.idle.get_nowait()
+            if conn is not None:
+                conn.close()
+
+
+class BatchGeocoder:
+    """Geocode "City, ST" queries in concurrent batches with retries (see module docstring)."""
+
+    def __init__(self, base_url, api_key=None, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                 retries=DEFAULT_RETRIES, backoff=0.5, timeout=30):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = {'batches': 0, 'requests': 0, 'retries': 0, 'failed_batches': 0}
+
+    def _path(self):
+        params = {'fields': 'census'}
+        if self.api_key:
+            params['api_key'] = self.api_key
+        return '/geocode?' + urlencode(params)
+
+    async def _batch(self, pool, queries):
+        body = json.dumps(queries).encode()
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        for attempt in range(self.retries + 1):
+            self.stats['requests'] += 1
+            delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+            try:
+                status, headers_in, data = await pool.request('POST', self._path(), body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if status == 200:
+                    items = json.loads(data).get('results') or []
+                    if len(items) != len(queries):
+                        raise GeocodeError(f"expected {len(queries)} results, got {len(items)}")
+                    return {q: parse_result(item) for q, item in zip(queries, items)}
+                if status not in RETRY_STATUSES:
+                    raise GeocodeError(f"HTTP {status}: {data[:200].decode(errors='replace')}")
+                error = f"HTTP {status}"
+                retry_after = headers_in.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            if attempt < self.retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+        raise GeocodeError(f"gave up after {self.retries + 1} attempts ({error})")
+
+    async def _run(self, queries):
+        pool = ConnectionPool(self.base_url, self.concurrency, self.timeout)
+        batches = [queries[i:i + self.batch_size] for i in range(0, len(queries), self.batch_size)]
+        self.stats['batches'] += len(batches)
+        try:
+            outcomes = await asyncio.gather(*(self._batch(pool, b) for b in batches), return_exceptions=True)
+        finally:
+            await pool.close()
+        results = {}
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                self.stats['failed_batches'] += 1
+                print(f"  ⚠ Geocoding batch of {len(batch)} failed ({outcome}); will retry next run")
+            else:
+                results.update(outcome)
+        return results
+
+    def geocode(self, queries):
+        """{query: cache entry or None} for every query that was answered."""
+        return asyncio.run(self._run(list(queries))) if queries else {}
+
+
+def place_query(city, state_abbr):
+    return f"{str(city).strip()}, {state_abbr}"
+
+
+def geocode_csv(csv_path, out_path, base_url, api_key=None, cache_path=GEOCODE_CACHE, **geocoder_opts):
+    """
+    Geocode an un-geocoded PLG CSV into out_path (adding State FIPS, County FIPS,
+    Geocodio County and Geocodio Latitude/Longitude) and return out_path.
+    Already geocoded CSVs are returned unchanged.
+    """
+    if is_geocoded_csv(csv_path):
+        return csv_path
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    abbr = df['Region'].map(STATE_ABBREVS)
+    queries = [place_query(c, a) if pd.notna(a) else None for c, a in zip(df['City'], abbr)]
+
+    cache = GeocodeCache(cache_path)
+    missing = sorted({q for q in queries if q is not None and q not in cache})
+    print(f"Geocoding {len(missing)} new places via {base_url} "
+          f"({len(set(queries) - {None}) - len(missing)} cached)...")
+    start = time.perf_counter()
+    geocoder = BatchGeocoder(base_url, api_key, **geocoder_opts)
+    cache.update(geocoder.geocode(missing))
+    cache.save()
+    if missing:
+        s = geocoder.stats
+        print(f"  {s['batches']} batches, {s['requests']} requests ({s['retries']} retries, "
+              f"{s['failed_batches']} failed) in {time.perf_counter() - start:.1f}s")
+
+    entries = [cache.get(q) if q is not None else None for q in queries]
+    fips = [e['fips'] if e else None for e in entries]
+    df['State FIPS'] = [f[:2] if f else None for f in fips]
+    df['County FIPS'] = [f[2:] if f else None for f in fips]
+    df['Geocodio County'] = [e['county'] if e else None for e in entries]
+    df['Geocodio Latitude'] = [e['lat'] if e else None for e in entries]
+    df['Geocodio Longitude'] = [e['lon'] if e else None for e in entries]
+    resolved = sum(f is not None for f in fips)
+    print(f"  Geocoded {resolved}/{len(df)} rows ({resolved / max(len(df), 1) * 100:.1f}%) → {out_path}")
+    df.to_csv(out_path, index=False)
+    return out_path
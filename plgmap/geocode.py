@@ -0,0 +1,340 @@
+"""
+City geocoding with the zipcodes package: cities → counties, and cities/ZIPs → points.
+
+Names that don't match the ZIP table exactly get one batched trigram pass per
+state (plgmap/fuzzy.py). Located points feed the ZIP drill-down tiles and the
+hexagon bins.
+
+By default each city goes wholly to the county holding most of its ZIPs. With
+apportionment, a city that spans several counties is split across them instead.
+The ZIP table becomes one sparse city × county weight matrix W. Weights are ZIP
+counts, or ZIP populations when a population table is supplied, and each row
+sums to 1. Every metric is then distributed by one product, W.T @ x.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+
+import addfips
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import zipcodes
+
+from plgmap import fuzzy, hexgrid
+from plgmap.ingest import REPO_ROOT
+from plgmap.states import STATE_ABBREVS
+
+ZIP_TILE_DIR = os.path.join(REPO_ROOT, "data", "zip_tiles")
+HEXBIN_PATH = os.path.join(REPO_ROOT, "data", "hexbins.json")
+ZIP_POPULATION_PATH = os.path.join(REPO_ROOT, "data", "zip_population.csv")
+APPORTION_WEIGHTS = ('zips', 'population')
+COUNTY_SUFFIXES = (' County', ' Parish', ' Borough', ' Census Area', ' Municipality', ' Municipio', ' city')
+
+
+# ---------------------------------------------------------------------------
+# STEP 2: Map cities → counties using the zipcodes package
+# ---------------------------------------------------------------------------
+def city_county_index():
+    """{state abbr: {city name: Counter(county → ZIP count)}} over primary and acceptable ZIP city names."""
+    index = {}
+    for z in zipcodes.list_all():
+        if not z.get('county'):
+            continue
+        for name in [z['city']] + list(z.get('acceptable_cities') or []):
+            index.setdefault(z['state'], {}).setdefault(name, Counter())[z['county']] += 1
+    return index
+
+
+def fuzzy_match_counties(df, unmatched, report_path=None, threshold=fuzzy.DEFAULT_THRESHOLD):
+    """
+    Resolve unmatched cities with one batched trigram pass per state (plgmap/fuzzy.py)
+    against every ZIP-table city name, then take that name's most common county.
+    Prints the inexact matches and the rejected near-misses; report_path gets every
+    unmatched city with its best candidate as CSV.
+    """
+    index = city_county_index()
+    queries = list(zip(df.loc[unmatched, 'state_abbr'], df.loc[unmatched, 'City'].astype(str)))
+    matches = fuzzy.match_by_group(queries, {state: list(names) for state, names in index.items()}, threshold)
+    report = pd.DataFrame({
+        'state': [q[0] for q in queries],
+        'city': [q[1] for q in queries],
+        'matched': [m.name for m in matches],
+        'candidate': [m.candidate for m in matches],
+        'score': [round(m.score, 3) for m in matches],
+        'runner_up': [round(m.runner_up, 3) for m in matches],
+    }, index=unmatched)
+    report['county'] = [
+        index[st][name].most_common(1)[0][0] if isinstance(name, str) else None
+        for st, name in zip(report['state'], report['matched'])
+    ]
+    resolved = report[report['county'].notna()]
+    df.loc[resolved.index, 'county_name'] = resolved['county']
+    print(f"  Fuzzy-matched {len(resolved)}/{len(report)} unmatched cities "
+          f"(trigram Dice ≥ {threshold})")
+    for r in resolved[resolved['score'] < 1].sort_values('score').itertuples():
+        print(f"    {r.city}, {r.state} → {r.matched} ({r.score:.2f}, next {r.runner_up:.2f})")
+    rejected = report[report['county'].isna() & (report['score'] >= 0.5)]
+    if len(rejected):
+        print(f"  Left unmatched ({len(rejected)} near misses, see the match report):")
+        for r in rejected.sort_values('score', ascending=False).itertuples():
+            print(f"    {r.city}, {r.state} ≈ {r.candidate} ({r.score:.2f}, next {r.runner_up:.2f})")
+    if report_path:
+        report.sort_values(['matched', 'score'], na_position='first').to_csv(report_path, index=False)
+        print(f"  Match report: {report_path}")
+    return df
+
+
+def map_cities_to_counties(df, match_report=None, fuzzy_threshold=fuzzy.DEFAULT_THRESHOLD):
+    print("Mapping cities to counties...")
+    def get_county(city, state_abbr):
+        try:
+            results = zipcodes.filter_by(city=city, state=state_abbr)
+            if results:
+                counties = [r['county'] for r in results if r.get('county')]
+                if counties:
+                    return Counter(counties).most_common(1)[0][0]
+        except Exception:
+            pass
+        return None
+
+    df['county_name'] = df.apply(
+        lambda r: get_county(r['City'], r['state_abbr']), axis=1
+    )
+    matched = df['county_name'].notna().sum()
+    print(f"  Matched {matched}/{len(df)} cities ({matched/len(df)*100:.1f}%)")
+    unmatched = df.index[df['county_name'].isna()]
+    if len(unmatched) and fuzzy_threshold:
+        df = fuzzy_match_counties(df, unmatched, match_report, fuzzy_threshold)
+        matched = df['county_name'].notna().sum()
+        print(f"  Matched {matched}/{len(df)} cities after fuzzy matching ({matched/len(df)*100:.1f}%)")
+
+    # Get FIPS codes
+    af = addfips.AddFIPS()
+    df['fips'] = df.apply(lambda r: county_fips(af, r['county_name'], r['Region']), axis=1)
+    fips_ok = df['fips'].notna().sum()
+    print(f"  FIPS resolved for {fips_ok}/{len(df)} cities ({fips_ok/len(df)*100:.1f}%)")
+    return df
+
+
+def county_fips(af, county_name, state):
+    """
+    5-digit FIPS of a ZIP-table county name ("Hale County") in state (name or abbreviation), or None.
+    The full name is tried first: "Baltimore County" and "Baltimore city" are different
+    counties (likewise Richmond, Franklin, Roanoke, St. Louis). The bare name is only a
+    fallback for names addfips does not know.
+    """
+    if pd.isna(county_name):
+        return None
+    names = [county_name.strip()]
+    for suffix in COUNTY_SUFFIXES:
+        if names[0].endswith(suffix):
+            names.append(names[0][:-len(suffix)].strip())
+            break
+    for name in names:
+        try:
+            fips = af.get_county_fips(name, state=state)
+        except Exception:
+            fips = None
+        if fips:
+            return fips
+    return None
+
+
+# ---------------------------------------------------------------------------
+# STEP 3 (alternative): Apportion multi-county cities by their ZIPs
+# ---------------------------------------------------------------------------
+def load_zip_population(path=ZIP_POPULATION_PATH):
+    """ZIP population Series indexed by 5-digit ZIP (CSV columns zip, population), or None if path is missing."""
+    if not path or not os.path.isfile(path):
+        return None
+    pop = pd.read_csv(path, dtype={'zip': str})
+    pop.columns = pop.columns.str.strip().str.lower()
+    pop['zip'] = pop['zip'].str.extract(r'(\d{1,5})', expand=False).str.zfill(5)
+    pop['population'] = pd.to_numeric(pop['population'], errors='coerce')
+    return pop.dropna(subset=['zip', 'population']).groupby('zip')['population'].sum()
+
+
+def zip_counties(zip_population=None):
+    """ZIP table rows that have a county: zip, state, city, county, fips, population (NaN when not supplied)."""
+    zt = pd.DataFrame(zipcodes.list_all(), columns=['zip_code', 'state', 'city', 'county'])
+    zt = zt[zt['county'].notna() & (zt['county'] != '')].rename(columns={'zip_code': 'zip'})
+    af = addfips.AddFIPS()
+    pairs = zt[['county', 'state']].drop_duplicates()
+    fips = {(c, st): county_fips(af, c, st) for c, st in zip(pairs['county'], pairs['state'])}
+    zt['fips'] = [fips[k] for k in zip(zt['county'], zt['state'])]
+    zt['population'] = zt['zip'].map(zip_population) if zip_population is not None else np.nan
+    return zt.dropna(subset=['fips']).reset_index(drop=True)
+
+
+def apportionment_matrix(df, weight='zips', zip_population=None):
+    """
+    Row-normalized sparse W (len(df) × counties) and its columns as a frame
+    (fips, county_name, state_abbr), sorted by FIPS.
+    Row i spreads city i over the counties of the ZIPs whose primary city name
+    matches it exactly, in proportion to ZIP count or ZIP population. Cities whose
+    ZIPs have no population fall back to ZIP counts. Cities missing from the ZIP
+    table (fuzzy matches) put all their weight on their resolved df['fips'].
+    Unresolved cities are zero rows.
+    """
+    zt = zip_counties(zip_population if weight == 'population' else None)
+    rows = pd.DataFrame({'row': np.arange(len(df)), 'state': df['state_abbr'].to_numpy(),
+                         'city': df['City'].astype(str).to_numpy()})
+    hits = rows.merge(zt, on=['state', 'city'])
+    exact = np.zeros(len(df), dtype=bool)
+    exact[hits['row'].to_numpy()] = True
+    fallback = np.flatnonzero(~exact & df['fips'].notna().to_numpy())
+
+    counties = pd.concat([
+        hits[['fips', 'county', 'state']].set_axis(['fips', 'county_name', 'state_abbr'], axis=1),
+        df.iloc[fallback][['fips', 'county_name', 'state_abbr']],
+    ]).drop_duplicates('fips').sort_values('fips').reset_index(drop=True)
+    columns = counties['fips'].to_numpy(dtype=str)
+    shape = (len(df), len(columns))
+
+    def matrix(r, fips, w):
+        return sp.csr_matrix((w, (r, np.searchsorted(columns, fips))), shape=shape)   # duplicates are summed
+
+    def normalized(m):
+        totals = np.asarray(m.sum(axis=1)).ravel()
+        return sp.diags(np.divide(1.0, totals, out=np.zeros(len(totals)), where=totals > 0)) @ m
+
+    by_zips = matrix(hits['row'], hits['fips'].to_numpy(dtype=str), np.ones(len(hits)))
+    by_zips = by_zips + matrix(fallback, df['fips'].to_numpy()[fallback].astype(str), np.ones(len(fallback)))
+    W = normalized(by_zips)
+    if weight == 'population':
+        by_pop = normalized(matrix(hits['row'], hits['fips'].to_numpy(dtype=str), hits['population'].fillna(0)))
+        has_pop = np.asarray(by_pop.sum(axis=1)).ravel() > 0
+        W = sp.diags(has_pop.astype(float)) @ by_pop + sp.diags((~has_pop).astype(float)) @ W
+    return W.tocsr(), counties
+
+
+def round_by_group(values, groups):
+    """
+    Integers summing, per group, to the rounded group total of values (largest remainder).
+    Apportioned counts stay whole numbers and state totals stay exact.
+    """
+    floor = np.floor(values)
+    frac = pd.Series(values - floor)
+    g = pd.Series(groups)
+    short = (pd.Series(values).groupby(g).transform('sum').round() - pd.Series(floor).groupby(g).transform('sum'))
+    rank = frac.groupby(g).rank(method='first', ascending=False)
+    return (floor + (rank <= short).to_numpy()).astype(np.int64)
+
+
+def apportion_by_county(df, weight='zips', zip_population=None):
+    """
+    County aggregates with the same columns as ingest.aggregate_by_county(), each
+    city split across its counties by apportionment_matrix(). Clinicians and events
+    take one sparse product per metric. Results are rounded to integers per state
+    with round_by_group(). num_cities counts every city a county receives a share of.
+    """
+    if weight == 'population' and zip_population is None:
+        print("  ⚠ No ZIP population table; apportioning by ZIP count")
+        weight = 'zips'
+    W, county_df = apportionment_matrix(df, weight, zip_population)
+    county_df['Region'] = county_df['state_abbr'].map({abbr: name for name, abbr in STATE_ABBREVS.items()})
+    states = county_df['fips'].str[:2].to_numpy()
+    for col in ('A. Uniques of First Scribe Created', 'B. Total Events of Scribe Created'):
+        county_df[col] = round_by_group(W.T @ df[col].to_numpy(dtype=np.float64), states)
+    county_df['num_cities'] = np.asarray((W > 0).sum(axis=0)).ravel()
+    county_df = county_df[['fips', 'county_name', 'Region', 'state_abbr', 'A. Uniques of First Scribe Created',
+                           'B. Total Events of Scribe Created', 'num_cities']]
+
+    split = int((np.diff(W.indptr) > 1).sum())
+    print(f"  Apportioned {int((np.diff(W.indptr) > 0).sum())} cities across {len(county_df)} counties "
+          f"by {'ZIP population' if weight == 'population' else 'ZIP count'} ({split} span several counties)")
+    return county_df
+
+
+# ---------------------------------------------------------------------------
+# STEP 7: City points → ZIP drill-down tiles and hexagon bins
+# ---------------------------------------------------------------------------
+ZIP_COLUMNS = ('Zip', 'ZIP', 'Zip Code', 'ZIP Code', 'Postal Code', 'Geocodio Postal Code', 'zip')
+ZIP_TILE_FIELDS = ['zip', 'city', 'lat', 'lon', 'u', 'e', 'nz']
+
+
+def locate_cities(df):
+    """
+    City- (or ZIP-) level rows with coordinates: state_abbr, city, zips, lat, lon, u, e,
+    from the CSV as loaded by ingest.load_data() (the pipeline's csv_rows stage).
+    Rows are grouped per ZIP when the CSV has a ZIP column and per city otherwise.
+    Geocoded Latitude/Longitude columns are used when present; otherwise a row
+    sits at its ZIP centroid (or the mean of its city's ZIP centroids). Rows that
+    cannot be placed are dropped.
+    """
+    df = df.copy()
+    zip_col = next((c for c in ZIP_COLUMNS if c in df.columns), None)
+    has_coords = 'Latitude' in df.columns and 'Longitude' in df.columns
+
+    # One pass over the zipcodes database: ZIP → centroid, (state, CITY) → ZIPs
+    centroid, by_city = {}, {}
+    for z in zipcodes.list_all():
+        try:
+            lat, lon = float(z['lat']), float(z['long'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        centroid[z['zip_code']] = (lat, lon)
+        by_city.setdefault((z['state'], str(z.get('city', '')).upper()), []).append(z['zip_code'])
+
+    uniques_col, events_col = 'A. Uniques of First Scribe Created', 'B. Total Events of Scribe Created'
+    aggs = dict(u=(uniques_col, 'sum'), e=(events_col, 'sum'))
+    if has_coords:
+        df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
+        df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
+        aggs.update(lat=('Latitude', 'mean'), lon=('Longitude', 'mean'))
+    if zip_col:
+        df['zip'] = df[zip_col].astype(str).str.extract(r'(\d{5})', expand=False)
+        df = df.dropna(subset=['zip'])
+        grouped = df.groupby(['state_abbr', 'zip']).agg(city=('City', 'first'), **aggs).reset_index()
+        grouped['zips'] = grouped['zip'].map(lambda z: [z])
+    else:
+        grouped = df.groupby(['state_abbr', 'City']).agg(**aggs).reset_index().rename(columns={'City': 'city'})
+        grouped['zips'] = [by_city.get((a, str(c).upper()), []) for a, c in zip(grouped['state_abbr'], grouped['city'])]
+
+    if not has_coords:
+        coords = []
+        for zips in grouped['zips']:
+            pts = [centroid[z] for z in zips if z in centroid]
+            coords.append((sum(p[0] for p in pts) / len(pts), sum(p[1] for p in pts) / len(pts)) if pts else (np.nan, np.nan))
+        grouped['lat'] = [c[0] for c in coords]
+        grouped['lon'] = [c[1] for c in coords]
+    placed = grouped.dropna(subset=['lat', 'lon']).reset_index(drop=True)
+    print(f"  Located {len(placed)}/{len(grouped)} {'ZIPs' if zip_col else 'cities'}")
+    return placed
+
+
+def build_zip_tiles(points, out_dir=ZIP_TILE_DIR):
+    """
+    Write one tile per state, {out_dir}/{abbr}.json, with the sub-county points from
+    locate_cities() (nz = number of ZIPs a city spans). Tiles are only fetched when
+    a state is drilled into, so the national view loads nothing extra. Tiles of
+    states no longer in the data are removed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tiles = {}
+    for r in points.itertuples(index=False):
+        tiles.setdefault(r.state_abbr, []).append(
+            [r.zips[0] if len(r.zips) == 1 else '', str(r.city), round(r.lat, 4), round(r.lon, 4),
+             int(r.u), int(r.e), len(r.zips)])
+    for abbr, rows in tiles.items():
+        with open(os.path.join(out_dir, f'{abbr}.json'), 'w') as f:
+            json.dump({'state': abbr, 'fields': ZIP_TILE_FIELDS, 'rows': rows}, f, separators=(',', ':'))
+    stale = [n for n in os.listdir(out_dir) if re.fullmatch(r'[A-Z]{2}\.json', n) and n[:2] not in tiles]
+    for name in stale:
+        os.remove(os.path.join(out_dir, name))
+    print(f"  Wrote {len(tiles)} ZIP drill-down tiles to {out_dir}"
+          + (f" (removed {len(stale)} stale)" if stale else ""))
+    return out_dir
+
+
+def write_hexbins(points, out_path=HEXBIN_PATH):
+    """Multi-resolution hexagon bins of the located points for index.html's hex layer."""
+    bins = hexgrid.build_hexbins(points['lon'], points['lat'], points['u'], points['e'])
+    with open(out_path, 'w') as f:
+        json.dump(bins, f, separators=(',', ':'))
+    sizes = ', '.join(f"{km} km: {len(cells)}" for km, cells in bins['resolutions'].items())
+    print(f"  Wrote hexagon bins ({sizes} cells) to {out_path}")
+    return out_path
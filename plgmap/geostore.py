@@ -0,0 +1,180 @@
+"""
+Compiled, memory-mapped county geometry.
+
+The county GeoJSON is compiled once into a directory of flat NumPy arrays:
+
+    coords.npy           float64 (N, 2)  lon/lat of every vertex
+    ring_offsets.npy     int64   (R + 1) ring i    = coords[ring_offsets[i]:ring_offsets[i + 1]]
+    part_offsets.npy     int64   (P + 1) polygon j = rings[part_offsets[j]:part_offsets[j + 1]]
+    feature_offsets.npy  int64   (F + 1) feature k = polygons[feature_offsets[k]:feature_offsets[k + 1]]
+    meta.json            ids, geometry types, properties, state -> feature range index
+
+Features are sorted by FIPS id, so every state is one contiguous feature range
+and filtering to a state is a slice rather than a scan over all features.
+Opening a store is an mmap of the arrays plus a small JSON read.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+STORE_VERSION = 1
+ARRAYS = ('coords', 'ring_offsets', 'part_offsets', 'feature_offsets')
+
+
+def _source_stamp(source_path):
+    st = os.stat(source_path)
+    return {'size': st.st_size, 'mtime': int(st.st_mtime)}
+
+
+def compile_geojson(geojson, store_path, source_path=None):
+    """Compile a GeoJSON FeatureCollection (Polygon/MultiPolygon) into a store directory."""
+    features = sorted(geojson['features'], key=lambda f: str(f.get('id', '')).zfill(5))
+
+    coords, ring_offsets, part_offsets, feature_offsets = [], [0], [0], [0]
+    ids, types, properties = [], [], []
+    n_coords = 0
+    for feat in features:
+        geom = feat.get('geometry') or {}
+        gtype = geom.get('type')
+        if gtype == 'Polygon':
+            polygons = [geom['coordinates']]
+        elif gtype == 'MultiPolygon':
+            polygons = geom['coordinates']
+        else:
+            polygons = []
+        for polygon in polygons:
+            for ring in polygon:
+                coords.append(np.asarray(ring, dtype=np.float64).reshape(-1, 2))
+                n_coords += len(ring)
+                ring_offsets.append(n_coords)
+            part_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(part_offsets) - 1)
+        ids.append(str(feat.get('id', '')).zfill(5))
+        types.append(gtype)
+        properties.append(feat.get('properties') or {})
+
+    # State index: 2-digit FIPS prefix -> [first feature, last feature + 1)
+    state_index = {}
+    for i, fid in enumerate(ids):
+        prefix = fid[:2]
+        if prefix in state_index:
+            state_index[prefix][1] = i + 1
+        else:
+            state_index[prefix] = [i, i + 1]
+
+    # Start from an empty directory so derived files (e.g. adjacency_snapped.npz) never outlive their geometry
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path)
+    os.makedirs(store_path)
+    arrays = {
+        'coords': np.concatenate(coords) if coords else np.zeros((0, 2)),
+        'ring_offsets': np.asarray(ring_offsets, dtype=np.int64),
+        'part_offsets': np.asarray(part_offsets, dtype=np.int64),
+        'feature_offsets': np.asarray(feature_offsets, dtype=np.int64),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(store_path, f'{name}.npy'), arr)
+    meta = {
+        'version': STORE_VERSION,
+        'ids': ids,
+        'types': types,
+        'properties': properties,
+        'state_index': state_index,
+        'source': _source_stamp(source_path) if source_path else None,
+    }
+    # meta.json is written last so a half-written store is never considered fresh
+    with open(os.path.join(store_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return GeometryStore(store_path)
+
+
+def is_fresh(store_path, source_path=None):
+    """True if store_path holds a compiled store matching source_path (when it exists)."""
+    meta_path = os.path.join(store_path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get('version') != STORE_VERSION:
+        return False
+    if source_path and os.path.exists(source_path):
+        return meta.get('source') == _source_stamp(source_path)
+    return True
+
+
+class GeometryStore:
+    """Read-only view over a compiled store; arrays are memory-mapped on open."""
+
+    def __init__(self, store_path):
+        self.path = store_path
+        with open(os.path.join(store_path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.ids = meta['ids']
+        self.types = meta['types']
+        self.properties = meta['properties']
+        self.state_index = {k: tuple(v) for k, v in meta['state_index'].items()}
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(store_path, f'{name}.npy'), mmap_mode='r'))
+        self._geojson_cache = {}
+
+    def __reduce__(self):
+        # Pickle by path (e.g. into worker processes) and re-mmap there instead of copying arrays
+        return (GeometryStore, (self.path,))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def state_range(self, state_fips):
+        """(start, stop) feature range for a 2-digit state FIPS; (0, 0) if absent."""
+        return self.state_index.get(str(state_fips).zfill(2), (0, 0))
+
+    def feature(self, i):
+        """Rebuild feature i as a GeoJSON dict."""
+        coords, rings, parts = self.coords, self.ring_offsets, self.part_offsets
+        polygons = []
+        for p in range(self.feature_offsets[i], self.feature_offsets[i + 1]):
+            polygons.append([
+                coords[rings[r]:rings[r + 1]].tolist()
+                for r in range(parts[p], parts[p + 1])
+            ])
+        if self.types[i] == 'Polygon':
+            geometry = {'type': 'Polygon', 'coordinates': polygons[0] if polygons else []}
+        else:
+            geometry = {'type': 'MultiPolygon', 'coordinates': polygons}
+        return {'type': 'Feature', 'id': self.ids[i], 'properties': self.properties[i],
+                'geometry': geometry}
+
+    def to_geojson(self, state_fips=None):
+        """
+        FeatureCollection for one state (2-digit FIPS prefix) or the whole nation.
+        Results are cached per store, so repeated figures reuse the same dict.
+        """
+        key = str(state_fips).zfill(2) if state_fips is not None else None
+        if key not in self._geojson_cache:
+            start, stop = self.state_range(key) if key else (0, len(self.ids))
+            self._geojson_cache[key] = {
+                'type': 'FeatureCollection',
+                'features': [self.feature(i) for i in range(start, stop)],
+            }
+        return self._geojson_cache[key]
+
+
+def open_or_compile(source_path, store_path=None):
+    """
+    Open the compiled store for source_path, (re)compiling it from the GeoJSON
+    when missing or stale. Returns None if neither the store nor the GeoJSON exists.
+    """
+    store_path = store_path or os.path.splitext(source_path)[0] + '.geostore'
+    if is_fresh(store_path, source_path):
+        return GeometryStore(store_path)
+    if not os.path.exists(source_path):
+        return None
+    with open(source_path) as f:
+        geojson = json.load(f)
+    return compile_geojson(geojson, store_path, source_path=source_path)
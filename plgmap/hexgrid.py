@@ -0,0 +1,92 @@
+"""
+Hexagonal binning of point data (city locations) on an equal-area grid.
+
+Points are projected with Albers (plgmap/projection.py) and snapped to
+pointy-top hexagons in axial coordinates (q, r) with vectorized cube rounding.
+A cell is identified by (q, r) alone: its centre is
+x = size · √3 · (q + r/2), y = size · 3/2 · r, where size is the centre-to-corner
+distance. Geometry can therefore be rebuilt from ids anywhere (index.html does
+it client-side), and the layer stays a fixed, small set of hexagons whatever the
+number of input rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from plgmap.projection import ALBERS_USA, albers, albers_inverse
+
+# Cell sizes (centre-to-corner, km), coarse to fine
+RESOLUTIONS_KM = (100, 50, 25)
+SQRT3 = np.sqrt(3.0)
+
+
+def hex_cells(x, y, size):
+    """Axial (q, r) integer cell coordinates of projected points for hexagon size (metres)."""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    fq = (SQRT3 / 3 * x - y / 3) / size
+    fr = (2 / 3 * y) / size
+    fs = -fq - fr
+    q, r, s = np.round(fq), np.round(fr), np.round(fs)
+    dq, dr, ds = np.abs(q - fq), np.abs(r - fr), np.abs(s - fs)
+    # Cube rounding: re-derive the coordinate with the largest rounding error
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    return q.astype(np.int64), r.astype(np.int64)
+
+
+def hex_centers(q, r, size):
+    q, r = np.asarray(q, dtype=np.float64), np.asarray(r, dtype=np.float64)
+    return size * SQRT3 * (q + r / 2), size * 1.5 * r
+
+
+def hex_rings(q, r, size, params=ALBERS_USA):
+    """(k, 7, 2) lon/lat rings for k cells, closed and clockwise (exterior winding for GeoJSON renderers)."""
+    cx, cy = hex_centers(q, r, size)
+    angles = np.radians(-30 - 60 * np.arange(7))      # decreasing angle = clockwise, 7th closes the ring
+    xs = cx[:, None] + size * np.cos(angles)[None, :]
+    ys = cy[:, None] + size * np.sin(angles)[None, :]
+    lon, lat = albers_inverse(xs, ys, params)
+    return np.stack([lon, lat], axis=-1)
+
+
+def bin_points(lon, lat, values, size_km):
+    """
+    Aggregate points into hexagons of size_km. values is {column: array} summed
+    per cell. Returns a DataFrame with q, r, n (point count) and one column per value.
+    """
+    x, y = albers(lon, lat)
+    q, r = hex_cells(x, y, size_km * 1000.0)
+    df = pd.DataFrame({'q': q, 'r': r, 'n': 1, **{k: np.asarray(v) for k, v in values.items()}})
+    return df.groupby(['q', 'r'], sort=True).sum().reset_index()
+
+
+def cell_ids(cells):
+    return (cells['q'].astype(str) + ',' + cells['r'].astype(str)).tolist()
+
+
+def to_geojson(cells, size_km):
+    """FeatureCollection of hexagon polygons with ids "q,r" (matches cell_ids)."""
+    rings = hex_rings(cells['q'].to_numpy(), cells['r'].to_numpy(), size_km * 1000.0)
+    ids = cell_ids(cells)
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'id': fid, 'properties': {},
+             'geometry': {'type': 'Polygon', 'coordinates': [np.round(ring, 5).tolist()]}}
+            for fid, ring in zip(ids, rings)
+        ],
+    }
+
+
+def build_hexbins(lon, lat, uniques, events, resolutions=RESOLUTIONS_KM):
+    """
+    Compact multi-resolution bins for the browser:
+    {'projection': ALBERS_USA, 'resolutions': {km: [[q, r, uniques, events, points], ...]}}.
+    """
+    out = {}
+    for km in resolutions:
+        cells = bin_points(lon, lat, {'u': uniques, 'e': events}, km)
+        out[str(km)] = cells[['q', 'r', 'u', 'e', 'n']].astype(int).values.tolist()
+    return {'projection': ALBERS_USA, 'resolutions': out}
@@ -0,0 +1,202 @@
+"""
+Load a PLG CSV, aggregate it to counties, and load the county geometry.
+
+Geocoded CSVs (State FIPS + County FIPS columns) aggregate directly. Others go
+through plgmap/geocode.py (zipcodes + fuzzy city matching), which is imported
+only for them.
+"""
+
+import json
+import os
+from urllib.request import urlopen
+
+import pandas as pd
+
+from plgmap import fuzzy, geostore, metrics
+from plgmap.states import STATE_ABBREVS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GEOJSON_URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+
+
+# ---------------------------------------------------------------------------
+# STEP 1: Load & clean data
+# ---------------------------------------------------------------------------
+def is_geocoded_frame(df):
+    """Check if a loaded CSV has Geocodio FIPS columns (State FIPS, County FIPS)."""
+    return 'State FIPS' in df.columns and 'County FIPS' in df.columns
+
+
+def is_geocoded_csv(csv_path):
+    """Check if CSV has Geocodio FIPS columns (State FIPS, County FIPS)."""
+    try:
+        df = pd.read_csv(csv_path, nrows=1)
+        df.columns = df.columns.str.strip()
+        return is_geocoded_frame(df)
+    except Exception:
+        return False
+
+
+def load_and_aggregate_geocoded(csv_path):
+    """
+    Load geocoded CSV (with State FIPS + County FIPS) and aggregate to county level.
+    Returns same structure as aggregate_by_county() for compatibility.
+    """
+    return aggregate_geocoded(load_data(csv_path))
+
+
+def aggregate_geocoded(df):
+    """Aggregate a geocoded CSV already loaded by load_data() to county level."""
+    df = df.copy()
+
+    # Build 5-digit FIPS: State FIPS (2) + County FIPS (3)
+    df['State FIPS'] = pd.to_numeric(df['State FIPS'], errors='coerce')
+    df['County FIPS'] = pd.to_numeric(df['County FIPS'], errors='coerce')
+    df = df.dropna(subset=['State FIPS', 'County FIPS'])
+    state_str = df['State FIPS'].astype(int).astype(str).str.zfill(2)
+    county_str = df['County FIPS'].astype(int).astype(str)
+    # County FIPS may be 3+ digits; keep last 3 for 5-digit FIPS
+    county_str = county_str.str[-3:].str.zfill(3)
+    df['fips'] = state_str + county_str
+
+    # County name: use Geocodio County if present, else derive from FIPS later
+    county_name_col = 'Geocodio County' if 'Geocodio County' in df.columns else None
+    if county_name_col:
+        df['county_name'] = df[county_name_col].fillna('').astype(str)
+    else:
+        df['county_name'] = ''
+
+    county_df = (
+        df.groupby(['fips', 'county_name', 'Region', 'state_abbr'])
+        .agg({
+            'A. Uniques of First Scribe Created': 'sum',
+            'B. Total Events of Scribe Created': 'sum',
+            'City': 'count'
+        })
+        .reset_index()
+        .rename(columns={'City': 'num_cities'})
+    )
+    county_df['fips'] = county_df['fips'].astype(str).str.zfill(5)
+    # If county_name is empty (no Geocodio County column), use a placeholder
+    county_df['county_name'] = county_df.apply(
+        lambda r: r['county_name'] if r['county_name'] else f"County {r['fips'][2:]}",
+        axis=1
+    )
+    print(f"  Loaded {len(df)} rows → {len(county_df)} counties (geocoded FIPS)")
+    return county_df
+
+
+def load_data(csv_path):
+    print(f"Loading data from {csv_path}...")
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    df = df[~df['Region'].isin(['undefined', 'Region'])].copy()
+    df['state_abbr'] = df['Region'].map(STATE_ABBREVS)
+    df = df.dropna(subset=['state_abbr'])
+    df['A. Uniques of First Scribe Created'] = pd.to_numeric(
+        df['A. Uniques of First Scribe Created'], errors='coerce'
+    ).fillna(0).astype(int)
+    df['B. Total Events of Scribe Created'] = pd.to_numeric(
+        df['B. Total Events of Scribe Created'], errors='coerce'
+    ).fillna(0).astype(int)
+    print(f"  Loaded {len(df)} rows across {df['Region'].nunique()} states")
+    return df
+
+
+
+
+# ---------------------------------------------------------------------------
+# STEP 3: Aggregate to county level
+# ---------------------------------------------------------------------------
+def aggregate_by_county(df):
+    county_df = (
+        df[df['fips'].notna()]
+        .groupby(['fips', 'county_name', 'Region', 'state_abbr'])
+        .agg({
+            'A. Uniques of First Scribe Created': 'sum',
+            'B. Total Events of Scribe Created': 'sum',
+            'City': 'count'
+        })
+        .reset_index()
+        .rename(columns={'City': 'num_cities'})
+    )
+    county_df['fips'] = county_df['fips'].astype(str).str.zfill(5)
+    print(f"  Aggregated to {len(county_df)} counties")
+    return county_df
+
+
+# ---------------------------------------------------------------------------
+# STEP 4: Load county GeoJSON
+# ---------------------------------------------------------------------------
+def load_geojson():
+    """
+    Load county geometry as a memory-mapped GeometryStore (see plgmap/geostore.py).
+    The store is compiled from the cached GeoJSON on first use (or when the
+    GeoJSON changes); the GeoJSON is downloaded if no local copy exists.
+    Returns None if unavailable (HTML export still works via client-side fetch).
+    """
+    cache_path = os.path.join(REPO_ROOT, 'geojson-counties-fips.json')
+    store_path = os.path.splitext(cache_path)[0] + '.geostore'
+    if geostore.is_fresh(store_path, cache_path):
+        store = geostore.GeometryStore(store_path)
+        print(f"Loading county geometry from store: {store_path}")
+        print(f"  Loaded {len(store)} county boundaries")
+        return store
+    if os.path.exists(cache_path):
+        print(f"Compiling county GeoJSON from cache: {cache_path}")
+        store = geostore.open_or_compile(cache_path, store_path)
+        print(f"  Loaded {len(store)} county boundaries (store: {store_path})")
+        return store
+    try:
+        print("Fetching county GeoJSON from Plotly datasets...")
+        with urlopen(GEOJSON_URL) as response:
+            data = response.read()
+            geojson = json.loads(data)
+        # Cache for next time
+        with open(cache_path, 'wb') as f:
+            f.write(data)
+        store = geostore.compile_geojson(geojson, store_path, source_path=cache_path)
+        print(f"  Loaded {len(store)} county boundaries (cached to {cache_path})")
+        return store
+    except Exception as e:
+        print(f"  ⚠ Could not fetch GeoJSON: {e}")
+        print("    → Interactive HTML will load it client-side in the browser.")
+        print("    → For static PNG/PDF export, first download the file manually:")
+        print(f"      curl -o {cache_path} {GEOJSON_URL}")
+        return None
+
+
+def ingest_csv(csv_path, **kwargs):
+    """Steps 1–3 for a CSV path: load_data() followed by ingest_frame()."""
+    return ingest_frame(load_data(csv_path), **kwargs)
+
+
+def ingest_frame(df, match_report=None, fuzzy_threshold=fuzzy.DEFAULT_THRESHOLD,
+                 population_path=metrics.POPULATION_PATH, apportion=None, zip_population_path=None):
+    """
+    Steps 2–3: aggregate a CSV loaded by load_data() to counties (geocoded FIPS or
+    zipcodes path), then add the derived metric columns of plgmap/metrics.py in one
+    pass. apportion ('zips' or 'population') splits multi-county cities across their
+    counties on the zipcodes path (see plgmap/geocode.py); zip_population_path
+    overrides data/zip_population.csv for 'population'.
+    """
+    if is_geocoded_frame(df):
+        if apportion:
+            print("  ⚠ Apportionment only applies to un-geocoded CSVs; using the geocoded FIPS")
+        county_df = aggregate_geocoded(df)
+    else:
+        from plgmap import geocode
+
+        df = geocode.map_cities_to_counties(df.copy(), match_report, fuzzy_threshold)
+        if apportion:
+            zip_population = None
+            if apportion == 'population':
+                zip_population = geocode.load_zip_population(zip_population_path or geocode.ZIP_POPULATION_PATH)
+            county_df = geocode.apportion_by_county(df, apportion, zip_population)
+        else:
+            county_df = aggregate_by_county(df)
+    population = metrics.load_population(population_path)
+    county_df = metrics.derive(county_df, tables=[population] if population is not None else None)
+    derived = [m.name for m in metrics.derived_columns(county_df)]
+    print(f"  Derived metrics: {', '.join(derived) if derived else 'none'}")
+    return county_df
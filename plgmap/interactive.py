@@ -0,0 +1,425 @@
+"""
+Self-contained interactive HTML export (county data embedded, GeoJSON fetched client-side).
+
+bundle=True builds the offline variant instead. The county geometry is embedded
+as gzip + base64 (inflated in the browser with DecompressionStream), a local
+plotly.min.js is inlined when one is found, and the web-font link is dropped.
+The file then opens with no network requests.
+"""
+
+import base64
+import gzip
+import importlib.util
+import json
+import os
+import re
+
+from plgmap import metrics
+from plgmap.ingest import GEOJSON_URL
+from plgmap.states import STATE_ABBREVS, STATE_CENTERS
+
+
+PLOTLY_JS_VERSION = "2.27.0"   # the page code is written against this release
+PLOTLY_CDN = f"https://cdn.plot.ly/plotly-{PLOTLY_JS_VERSION}.min.js"
+FONTS_URL = ("https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700"
+             "&family=JetBrains+Mono:wght@400;500&display=swap")
+COORD_DIGITS = 5   # ~1 m; the embedded geometry needs no more
+
+
+def plotly_js_version(path):
+    """Version from the "plotly.js vX.Y.Z" banner at the top of a plotly.min.js, or None."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        match = re.search(r'plotly\.js v(\d+\.\d+\.\d+)', f.read(512))
+    return match.group(1) if match else None
+
+
+def local_plotly_js():
+    """
+    Path of a plotly.min.js on disk that matches PLOTLY_JS_VERSION ($PLOTLY_JS,
+    else the copy shipped with the plotly package), or None. Other releases are
+    skipped with a warning; plotly.py bundles whatever plotly.js it was built with.
+    """
+    candidates = [os.environ.get('PLOTLY_JS')]
+    spec = importlib.util.find_spec('plotly')
+    if spec and spec.origin:
+        candidates.append(os.path.join(os.path.dirname(spec.origin), 'package_data', 'plotly.min.js'))
+    for path in candidates:
+        if not path or not os.path.isfile(path):
+            continue
+        version = plotly_js_version(path)
+        if version == PLOTLY_JS_VERSION:
+            return path
+        print(f"  ⚠ Skipping {path}: plotly.js {version or 'of unknown version'}, the page needs {PLOTLY_JS_VERSION}")
+    return None
+
+
+def _round_coords(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, COORD_DIGITS) for c in coords]
+    return [_round_coords(c) for c in coords]
+
+
+def compressed_geometry(store):
+    """
+    gzip + base64 FeatureCollection of every county (compact JSON, rounded
+    coordinates). mtime=0 keeps the output byte-identical across runs.
+    """
+    features = []
+    for feature in store.to_geojson()['features']:
+        geometry = feature['geometry']
+        features.append({'type': 'Feature', 'id': feature['id'],
+                         'geometry': {'type': geometry['type'], 'coordinates': _round_coords(geometry['coordinates'])}})
+    raw = json.dumps({'type': 'FeatureCollection', 'features': features}, separators=(',', ':')).encode()
+    return base64.b64encode(gzip.compress(raw, compresslevel=9, mtime=0)).decode('ascii')
+
+
+def _head_assets(bundle):
+    if not bundle:
+        return f'<script src="{PLOTLY_CDN}"></script>\n    <link href="{FONTS_URL}" rel="stylesheet">'
+    path = local_plotly_js()
+    if path is None:
+        print(f"  ⚠ No local plotly.js {PLOTLY_JS_VERSION} found (point PLOTLY_JS at {PLOTLY_CDN}); "
+              "the bundle loads Plotly from the CDN")
+        return f'<script src="{PLOTLY_CDN}"></script>'
+    with open(path, encoding='utf-8') as f:
+        # An inline script ends at the first "</script", wherever it appears
+        return '<script>' + f.read().replace('</script', '<\\/script') + '</script>'
+
+
+def _geometry_loader(geojson, bundle):
+    if not bundle:
+        return (f"fetch('{GEOJSON_URL}')\n"
+                "    .then(r => r.json())")
+    payload = compressed_geometry(geojson)
+    # Plotly's geo base layers (land, lakes, state lines) come from a topojson file on its CDN.
+    # Offline, an empty topology stands in, and render() draws every county as the land backdrop.
+    return ("window.PlotlyGeoAssets = { topojson: { usa_110m: { type: 'Topology', arcs: [], objects: Object.fromEntries(\n"
+            "    ['land', 'ocean', 'lakes', 'rivers', 'countries', 'subunits', 'coastlines']\n"
+            "        .map(k => [k, { type: 'GeometryCollection', geometries: [] }])) } } };\n"
+            "// County geometry: gzip + base64, inflated in the browser\n"
+            f"const GEOMETRY_GZ = '{payload}';\n"
+            "new Response(new Blob([Uint8Array.from(atob(GEOMETRY_GZ), c => c.charCodeAt(0))]).stream()\n"
+            "        .pipeThrough(new DecompressionStream('gzip'))).json()")
+
+
+# ---------------------------------------------------------------------------
+# STEP 6: Interactive HTML with state dropdown
+# ---------------------------------------------------------------------------
+def build_interactive_html(county_df, geojson, bundle=False):
+    """
+    Build a fully self-contained interactive HTML with a state dropdown filter,
+    metric toggle, and scale toggle. Great for sharing as a deliverable.
+    bundle: embed geometry and Plotly for offline use (geojson is the GeometryStore
+    and must not be None).
+    """
+    data = county_df.copy()
+    data['hover'] = (
+        data['county_name'] + ', ' + data['Region']
+        + '<br>Uniques: ' + data['A. Uniques of First Scribe Created'].astype(str)
+        + '<br>Total Events: ' + data['B. Total Events of Scribe Created'].apply(lambda x: f'{x:,}')
+        + '<br>Cities: ' + data['num_cities'].astype(str)
+        + metrics.hover_lines(data)
+    )
+
+    # Prepare data as JSON
+    records = []
+    for _, r in data.iterrows():
+        records.append({
+            'f': r['fips'],
+            'c': r['county_name'],
+            's': r['Region'],
+            'a': r['state_abbr'],
+            'u': int(r['A. Uniques of First Scribe Created']),
+            'e': int(r['B. Total Events of Scribe Created']),
+            'n': int(r['num_cities']),
+            'h': r['hover'],
+        })
+
+    data_json = json.dumps(records)
+    states_list = json.dumps(sorted(data['Region'].unique().tolist()))
+
+    html = f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>PLG Scribe Engagement - County Choropleth</title>
+    {_head_assets(bundle)}
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        :root {{
+            --bg: #0a0e17; --surface: #121825; --border: #1e2a3a;
+            --text: #e2e8f0; --dim: #8492a6;
+            --blue: #38bdf8; --purple: #a78bfa; --green: #34d399;
+        }}
+        body {{ font-family: 'DM Sans', sans-serif; background: var(--bg); color: var(--text); min-height: 100vh; }}
+
+        .header {{
+            padding: 28px 40px 12px;
+            border-bottom: 1px solid var(--border);
+            background: linear-gradient(180deg, rgba(56,189,248,0.04) 0%, transparent 100%);
+        }}
+        .header h1 {{
+            font-size: 26px; font-weight: 700; letter-spacing: -0.5px;
+            background: linear-gradient(135deg, var(--blue), var(--purple));
+            -webkit-background-clip: text; -webkit-text-fill-color: transparent;
+        }}
+        .header .sub {{
+            font-size: 13px; color: var(--dim); margin-top: 4px;
+            font-family: 'JetBrains Mono', monospace;
+        }}
+
+        .toolbar {{
+            display: flex; align-items: center; gap: 16px; flex-wrap: wrap;
+            padding: 14px 40px; background: var(--surface); border-bottom: 1px solid var(--border);
+        }}
+        .toolbar label {{ font-size: 12px; color: var(--dim); font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px; }}
+
+        select {{
+            background: var(--bg); color: var(--text); border: 1px solid var(--border);
+            border-radius: 6px; padding: 7px 12px; font-size: 13px;
+            font-family: 'DM Sans', sans-serif; cursor: pointer; outline: none;
+        }}
+        select:focus {{ border-color: var(--blue); }}
+
+        .btn-group {{
+            display: flex; border-radius: 6px; overflow: hidden; border: 1px solid var(--border);
+        }}
+        .btn {{
+            padding: 7px 16px; font-size: 12px; font-family: 'DM Sans', sans-serif;
+            font-weight: 600; border: none; background: var(--bg); color: var(--dim);
+            cursor: pointer; transition: all 0.15s;
+        }}
+        .btn:hover:not(.on) {{ color: var(--text); background: rgba(255,255,255,0.04); }}
+        .btn.on {{ background: linear-gradient(135deg, var(--blue), var(--purple)); color: #0a0e17; }}
+
+        .sep {{ width: 1px; height: 28px; background: var(--border); margin: 0 4px; }}
+
+        .export-btn {{
+            margin-left: auto; padding: 7px 18px; font-size: 12px;
+            font-family: 'DM Sans', sans-serif; font-weight: 600;
+            border: 1px solid var(--border); border-radius: 6px;
+            background: var(--bg); color: var(--green); cursor: pointer; transition: all 0.15s;
+        }}
+        .export-btn:hover {{ border-color: var(--green); background: rgba(52,211,153,0.08); }}
+
+        .kpis {{
+            display: flex; gap: 36px; padding: 14px 40px;
+            border-bottom: 1px solid var(--border);
+        }}
+        .kpi-val {{ font-size: 20px; font-weight: 700; font-family: 'JetBrains Mono', monospace; }}
+        .kpi-val.b {{ color: var(--blue); }}
+        .kpi-val.p {{ color: var(--purple); }}
+        .kpi-lbl {{ font-size: 11px; color: var(--dim); text-transform: uppercase; letter-spacing: 0.5px; margin-top: 1px; }}
+
+        #map {{ width: 100%; height: calc(100vh - 210px); min-height: 500px; }}
+
+        #loader {{
+            position: fixed; inset: 0; background: var(--bg);
+            display: flex; flex-direction: column; align-items: center; justify-content: center;
+            z-index: 999; transition: opacity 0.4s;
+        }}
+        #loader.gone {{ opacity: 0; pointer-events: none; }}
+        .spin {{
+            width: 36px; height: 36px; border: 3px solid var(--border);
+            border-top-color: var(--blue); border-radius: 50%;
+            animation: spin 0.7s linear infinite;
+        }}
+        @keyframes spin {{ to {{ transform: rotate(360deg); }} }}
+        .spin-txt {{ margin-top: 14px; font-size: 13px; color: var(--dim); font-family: 'JetBrains Mono', monospace; }}
+    </style>
+</head>
+<body>
+
+<div id="loader"><div class="spin"></div><div class="spin-txt">Loading county boundaries…</div></div>
+
+<div class="header">
+    <h1>PLG Scribe Engagement by County</h1>
+    <div class="sub">Feb 14, 2025 → Feb 9, 2026</div>
+</div>
+
+<div class="toolbar">
+    <label>State</label>
+    <select id="stateSelect"><option value="all">All States</option></select>
+
+    <div class="sep"></div>
+    <label>Metric</label>
+    <div class="btn-group" id="metricBtns">
+        <button class="btn on" data-v="both">Both</button>
+        <button class="btn" data-v="uniques">Uniques</button>
+        <button class="btn" data-v="events">Events</button>
+    </div>
+
+    <div class="sep"></div>
+    <label>Scale</label>
+    <div class="btn-group" id="scaleBtns">
+        <button class="btn on" data-v="log">Log</button>
+        <button class="btn" data-v="linear">Linear</button>
+    </div>
+
+    <button class="export-btn" onclick="exportPNG()">⬇ Export PNG</button>
+</div>
+
+<div class="kpis" id="kpis"></div>
+<div id="map"></div>
+
+<script>
+const ALL_DATA = {data_json};
+const STATES = {states_list};
+
+const STATE_CENTERS = {json.dumps(STATE_CENTERS)};
+const STATE_ABBREVS = {json.dumps(STATE_ABBREVS)};
+const OFFLINE = {json.dumps(bundle)};
+
+let geojson = null;
+let metric = 'both';
+let scale = 'log';
+let stateFilter = 'all';
+
+// Populate state dropdown
+const sel = document.getElementById('stateSelect');
+STATES.forEach(s => {{ const o = document.createElement('option'); o.value = s; o.textContent = s; sel.appendChild(o); }});
+sel.addEventListener('change', () => {{ stateFilter = sel.value; render(); }});
+
+// Button groups
+document.querySelectorAll('#metricBtns .btn').forEach(b => {{
+    b.addEventListener('click', () => {{
+        document.querySelectorAll('#metricBtns .btn').forEach(x => x.classList.remove('on'));
+        b.classList.add('on'); metric = b.dataset.v; render();
+    }});
+}});
+document.querySelectorAll('#scaleBtns .btn').forEach(b => {{
+    b.addEventListener('click', () => {{
+        document.querySelectorAll('#scaleBtns .btn').forEach(x => x.classList.remove('on'));
+        b.classList.add('on'); scale = b.dataset.v; render();
+    }});
+}});
+
+// Load geojson
+{_geometry_loader(geojson, bundle)}
+    .then(gj => {{ geojson = gj; document.getElementById('loader').classList.add('gone'); render(); }})
+    .catch(e => {{ document.querySelector('.spin-txt').textContent = 'Error: ' + e.message; }});
+
+function filteredData() {{
+    if (stateFilter === 'all') return ALL_DATA;
+    return ALL_DATA.filter(d => d.s === stateFilter);
+}}
+
+function filteredGeojson(data) {{
+    if (stateFilter === 'all') return geojson;
+    const prefixes = new Set(data.map(d => d.f.slice(0, 2)));
+    return {{ ...geojson, features: geojson.features.filter(f => prefixes.has(String(f.id).padStart(5,'0').slice(0,2))) }};
+}}
+
+function updateKPIs(data) {{
+    const tu = data.reduce((s,d) => s+d.u, 0);
+    const te = data.reduce((s,d) => s+d.e, 0);
+    const topU = data.reduce((b,d) => d.u > b.u ? d : b, data[0] || {{c:'—',u:0}});
+    const topE = data.reduce((b,d) => d.e > b.e ? d : b, data[0] || {{c:'—',e:0}});
+    document.getElementById('kpis').innerHTML = `
+        <div><div class="kpi-val b">${{tu.toLocaleString()}}</div><div class="kpi-lbl">⟶ Sum of All Uniques</div></div>
+        <div><div class="kpi-val p">${{te.toLocaleString()}}</div><div class="kpi-lbl">⟶ Sum of All Events</div></div>
+        <div><div class="kpi-val" style="color:var(--dim);font-size:16px">${{data.length}}</div><div class="kpi-lbl">Counties · ${{data.reduce((s,d)=>s+d.n,0).toLocaleString()}} cities</div></div>
+        <div><div class="kpi-val b" style="font-size:16px">${{topU.c}}</div><div class="kpi-lbl">#1 County · ${{topU.u.toLocaleString()}} uniques</div></div>
+        <div><div class="kpi-val p" style="font-size:16px">${{topE.c}}</div><div class="kpi-lbl">#1 County · ${{topE.e.toLocaleString()}} events</div></div>
+    `;
+}}
+
+const BLUE = [[0,'#0d1b2a'],[0.15,'#0e3b5e'],[0.35,'#146b8e'],[0.55,'#1a9ec2'],[0.75,'#38bdf8'],[1,'#bae6fd']];
+const PURPLE = [[0,'#0d0a1a'],[0.15,'#261454'],[0.35,'#4a2592'],[0.55,'#7044d4'],[0.75,'#a78bfa'],[1,'#ddd6fe']];
+
+function colorbar(isU, x) {{
+    const data_ = filteredData();
+    const vals = data_.map(d => isU ? d.u : d.e);
+    const mx = Math.max(...vals, 1);
+    const cb = {{ title: {{ text: isU ? 'Uniques' : 'Events', font: {{ size: 12 }} }}, len: 0.55, thickness: 14, x: x, tickfont: {{ size: 10 }} }};
+    if (scale === 'log') {{
+        const ts = [0,1,5,10,50,100,500,1000,5000,10000,50000,100000].filter(v => v <= mx * 1.2);
+        cb.tickvals = ts.map(v => Math.log1p(v));
+        cb.ticktext = ts.map(v => v >= 1000 ? (v/1000)+'k' : v.toLocaleString());
+    }}
+    return cb;
+}}
+
+function render() {{
+    if (!geojson) return;
+    const data = filteredData();
+    if (data.length === 0) {{
+        Plotly.purge('map');
+        document.getElementById('kpis').innerHTML = '<div><div class="kpi-val" style="color:var(--dim)">No data for selected state</div></div>';
+        return;
+    }}
+    updateKPIs(data);
+    const gj = filteredGeojson(data);
+    const zU = data.map(d => scale === 'log' ? Math.log1p(d.u) : d.u);
+    const zE = data.map(d => scale === 'log' ? Math.log1p(d.e) : d.e);
+    const fips = data.map(d => d.f);
+    const hover = data.map(d => d.h);
+    const hl = {{ bgcolor: '#121825', bordercolor: '#1e2a3a', font: {{ size: 12, color: '#e2e8f0' }} }};
+    const ml = {{ width: 0.3, color: '#1e2a3a' }};
+
+    const geoBase = {{
+        bgcolor: 'rgba(0,0,0,0)', lakecolor: '#0a0e17', landcolor: '#0f1520',
+        showlakes: true, showland: true, subunitcolor: '#1e2a3a',
+    }};
+
+    let traces, layout;
+    // Offline bundle: no base-map land layer, so every county of the view is drawn underneath in the land color
+    const backdrop = geoId => ({{ type:'choropleth', geojson:gj, locations:gj.features.map(f => f.id),
+        z:gj.features.map(() => 0), colorscale:[[0,'#0f1520'],[1,'#0f1520']], showscale:false,
+        hoverinfo:'skip', marker:{{line:ml}}, geo:geoId }});
+
+    if (metric === 'both') {{
+        traces = [
+            {{ type:'choropleth', geojson:gj, locations:fips, z:zU, text:hover, hoverinfo:'text',
+              colorscale:BLUE, colorbar:colorbar(true, 0.44), marker:{{line:ml}}, hoverlabel:hl, geo:'geo' }},
+            {{ type:'choropleth', geojson:gj, locations:fips, z:zE, text:hover, hoverinfo:'text',
+              colorscale:PURPLE, colorbar:colorbar(false, 1.01), marker:{{line:ml}}, hoverlabel:hl, geo:'geo2' }}
+        ];
+        const geo = {{ ...geoBase, scope:'usa', domain:{{x:[0, 0.48], y:[0,1]}} }};
+        const geo2 = {{ ...geoBase, scope:'usa', domain:{{x:[0.52, 1], y:[0,1]}} }};
+        if (stateFilter !== 'all') {{
+            geo.fitbounds = 'locations'; geo.visible = false;
+            geo2.fitbounds = 'locations'; geo2.visible = false;
+        }} else {{
+            geo.projection = {{type:'albers usa'}};
+            geo2.projection = {{type:'albers usa'}};
+        }}
+        layout = {{ geo, geo2 }};
+        if (OFFLINE) traces.unshift(backdrop('geo'), backdrop('geo2'));
+    }} else {{
+        const isU = metric === 'uniques';
+        traces = [
+            {{ type:'choropleth', geojson:gj, locations:fips, z:isU?zU:zE, text:hover, hoverinfo:'text',
+              colorscale:isU?BLUE:PURPLE, colorbar:colorbar(isU, 1.01), marker:{{line:ml}}, hoverlabel:hl }}
+        ];
+        const geo = {{ ...geoBase, scope:'usa' }};
+        if (stateFilter !== 'all') {{ geo.fitbounds = 'locations'; geo.visible = false; }}
+        else {{ geo.projection = {{type:'albers usa'}}; }}
+        layout = {{ geo }};
+        if (OFFLINE) traces.unshift(backdrop('geo'));
+    }}
+
+    layout = {{
+        ...layout,
+        paper_bgcolor: '#0a0e17', plot_bgcolor: '#0a0e17',
+        font: {{ color: '#e2e8f0', family: 'DM Sans' }},
+        margin: {{ t: 10, b: 10, l: 10, r: 10 }},
+        height: document.getElementById('map').offsetHeight,
+    }};
+
+    Plotly.react('map', traces, layout, {{ responsive: true, displayModeBar: false }});
+}}
+
+function exportPNG() {{
+    Plotly.downloadImage('map', {{
+        format: 'png', width: 1600, height: 800, scale: 2,
+        filename: 'plg_choropleth_' + stateFilter + '_' + metric
+    }});
+}}
+
+window.addEventListener('resize', () => Plotly.Plots.resize('map'));
+</script>
+</body>
+</html>'''
+    return html
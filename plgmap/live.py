@@ -0,0 +1,138 @@
+"""
+Incremental county aggregates from an append-only event file (CSV or JSONL).
+
+FileTailer returns the complete rows appended since its last poll (partial
+trailing lines wait for the next poll). LiveAggregator folds rows, with the
+same columns as generate.load_and_aggregate_geocoded (Region, City, State
+FIPS, County FIPS, A. Uniques…, B. Total Events…, optional Geocodio County),
+into per-county increments. It also records which counties each fold changed,
+so a server can push only those deltas.
+"""
+
+import csv
+import io
+import json
+import threading
+
+UNIQUES_COL = 'A. Uniques of First Scribe Created'
+EVENTS_COL = 'B. Total Events of Scribe Created'
+MAX_BATCHES = 256
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_row(row):
+    """(fips, county name, region, city, uniques, events) for one row, or None if it has no usable FIPS."""
+    row = {str(k).strip(): v for k, v in row.items() if k is not None}
+    region = str(row.get('Region') or '').strip()
+    if not region or region in ('undefined', 'Region'):
+        return None
+    try:
+        state = int(float(row['State FIPS']))
+        county = int(float(row['County FIPS']))
+    except (KeyError, TypeError, ValueError):
+        return None
+    fips = f"{state:02d}{str(county)[-3:].zfill(3)}"
+    return (fips, str(row.get('Geocodio County') or ''), region, str(row.get('City') or ''),
+            _to_int(row.get(UNIQUES_COL)), _to_int(row.get(EVENTS_COL)))
+
+
+class FileTailer:
+    """Poll an append-only CSV or JSONL file for new complete rows."""
+
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self.jsonl = path.endswith(('.jsonl', '.ndjson'))
+        self.header = None
+        self.offset = 0
+        self._partial = b''
+        if not self.jsonl:
+            with open(path, 'rb') as f:
+                first = f.readline()
+            self.header = next(csv.reader([first.decode('utf-8-sig')]))
+            self.offset = len(first)
+        if not from_start:
+            with open(path, 'rb') as f:
+                self.offset = max(self.offset, f.seek(0, 2))
+
+    def poll(self):
+        """Rows (dicts) appended since the last poll."""
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size < self.offset:   # truncated / rotated: start over after the header
+                self.offset, self._partial = 0, b''
+                if self.header is not None:
+                    f.seek(0)
+                    self.offset = len(f.readline())
+            f.seek(self.offset)
+            chunk = f.read()
+        self.offset += len(chunk)
+        data = self._partial + chunk
+        lines = data.split(b'\n')
+        self._partial = lines.pop()   # incomplete last line (b'' when data ends with a newline)
+        text = [line.decode('utf-8').rstrip('\r') for line in lines if line.strip()]
+        if self.jsonl:
+            rows = []
+            for line in text:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+            return rows
+        return list(csv.DictReader(io.StringIO('\n'.join(text)), fieldnames=self.header))
+
+
+class LiveAggregator:
+    """
+    Per-county increments since start. Each fold() that changes anything bumps
+    version and records the changed FIPS, so readers can ask what changed since
+    the version they last saw.
+    """
+
+    def __init__(self):
+        self.totals = {}        # fips -> {'du', 'de', 'c', 's', 'cities': set}
+        self.version = 0
+        self._batches = []      # (version, changed fips)
+        self.cond = threading.Condition()
+
+    def fold(self, rows):
+        parsed = [p for p in map(parse_row, rows) if p is not None]
+        changed = set()
+        # Readers (changes_since) iterate totals under the same lock, so they never see a half-applied batch
+        with self.cond:
+            for fips, name, region, city, du, de in parsed:
+                rec = self.totals.setdefault(fips, {'du': 0, 'de': 0, 'c': name, 's': region, 'cities': set()})
+                rec['du'] += du
+                rec['de'] += de
+                rec['cities'].add(city)
+                changed.add(fips)
+            if changed:
+                self.version += 1
+                self._batches.append((self.version, changed))
+                del self._batches[:-MAX_BATCHES]
+                self.cond.notify_all()
+        return changed
+
+    def changes_since(self, version):
+        """(current version, deltas) for counties changed after version (all, if that history is gone)."""
+        with self.cond:
+            if self._batches and version < self._batches[0][0] - 1:
+                fips_set = set(self.totals)
+            else:
+                fips_set = set().union(*(f for v, f in self._batches if v > version))
+            deltas = [
+                {'f': f, 'du': rec['du'], 'de': rec['de'], 'c': rec['c'], 's': rec['s'], 'n': len(rec['cities'])}
+                for f, rec in ((f, self.totals[f]) for f in sorted(fips_set))
+            ]
+            return self.version, deltas
+
+    def wait(self, version, timeout):
+        """Block until a version newer than version exists (or timeout); returns the current version."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.version > version, timeout=timeout)
+            return self.version
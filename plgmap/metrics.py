@@ -0,0 +1,134 @@
+"""
+Derived metrics declared as expressions over aggregated base columns.
+
+Each Metric in REGISTRY is one line of a pandas eval program over short column
+names:
+    uniques, events, cities   the aggregated base columns (any aggregation level)
+    population                from an optional county population table (fips, population)
+    uniques_prev, events_prev the same aggregates for an earlier period
+Metrics may also use metrics declared above them. derive() evaluates every
+metric whose inputs are present in one DataFrame.eval call, so each level
+(county, state) pays one vectorized pass no matter how many ratios are declared.
+Metrics with missing inputs are skipped, so per-capita and growth columns exist
+only when their tables are supplied. Results are cast to the declared dtype, and
+x/0 gives NaN (no data), never inf.
+
+A new ratio is one REGISTRY line. generate.py keeps the derived columns in the
+cached county_df stage, and scripts/build_plg_data.py emits them per county and
+per state with their labels (window.METRICS), which index.html shows.
+"""
+
+import ast
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# name: output column; key: short JSON key in plg_data.js; digits: rounding for display/JSON
+Metric = namedtuple('Metric', ['name', 'expr', 'label', 'key', 'dtype', 'digits'])
+
+REGISTRY = (
+    Metric('events_per_clinician', 'events / uniques', 'Visits per clinician', 'epc', 'float64', 1),
+    Metric('events_per_city', 'events / cities', 'Visits per city', 'epy', 'float64', 1),
+    Metric('clinicians_per_100k', 'uniques / population * 100000', 'Clinicians per 100k residents',
+           'cpk', 'float64', 2),
+    Metric('visits_per_1k', 'events / population * 1000', 'Visits per 1k residents', 'vpk', 'float64', 1),
+    Metric('events_change', 'events - events_prev', 'Visits change', 'ed', 'Int64', 0),
+    Metric('events_growth', 'events_change / events_prev * 100', 'Visits growth (%)', 'eg', 'float64', 1),
+    Metric('uniques_growth', '(uniques - uniques_prev) / uniques_prev * 100', 'Clinicians growth (%)',
+           'ug', 'float64', 1),
+)
+
+# Aggregate column names as they appear in generate.py / build_plg_data.py frames
+BASE_COLUMNS = {
+    'A. Uniques of First Scribe Created': 'uniques',
+    'B. Total Events of Scribe Created': 'events',
+    'num_cities': 'cities',
+}
+POPULATION_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'data', 'county_population.csv')
+
+
+def inputs(metric):
+    """Column names referenced by a metric's expression."""
+    return {n.id for n in ast.walk(ast.parse(metric.expr, mode='eval')) if isinstance(n, ast.Name)}
+
+
+def available(columns, registry=REGISTRY):
+    """Metrics of registry computable from columns (in declaration order, dependencies included)."""
+    have = set(columns)
+    out = []
+    for metric in registry:
+        if inputs(metric) <= have:
+            out.append(metric)
+            have.add(metric.name)
+    return out
+
+
+def derive(frame, tables=None, key='fips', registry=REGISTRY):
+    """
+    frame plus one typed column per computable metric. tables: optional DataFrames
+    indexed by key (e.g. population, previous-period aggregates) whose columns are
+    joined in as inputs; they are not added to the result.
+    """
+    renamed = frame.rename(columns=BASE_COLUMNS)
+    env = renamed[[c for c in BASE_COLUMNS.values() if c in renamed.columns]].astype('float64')
+    for table in tables or ():
+        joined = table.reindex(frame[key].to_numpy())
+        for col in joined.columns:
+            env[col] = joined[col].to_numpy(dtype='float64')
+    metrics = available(env.columns, registry)
+    if not metrics:
+        return frame
+    program = '\n'.join(f'{m.name} = {m.expr}' for m in metrics)
+    result = env.eval(program).replace([np.inf, -np.inf], np.nan)
+    out = frame.copy()
+    for m in metrics:
+        col = result[m.name]
+        out[m.name] = col.round().astype(m.dtype) if m.dtype.lower().startswith('int') else col.astype(m.dtype)
+    return out
+
+
+def derived_columns(frame, registry=REGISTRY):
+    """Registry metrics present as columns of frame."""
+    return [m for m in registry if m.name in frame.columns]
+
+
+def load_population(path=POPULATION_PATH):
+    """County population table indexed by 5-digit FIPS (column population), or None if path is missing."""
+    if not path or not os.path.isfile(path):
+        return None
+    pop = pd.read_csv(path, dtype={'fips': str})
+    pop.columns = pop.columns.str.strip().str.lower()
+    pop['fips'] = pop['fips'].str.zfill(5)
+    pop['population'] = pd.to_numeric(pop['population'], errors='coerce')
+    return pop.dropna(subset=['population']).groupby('fips')[['population']].sum()
+
+
+def state_population(population, county_frame):
+    """Population table rolled up to states (indexed by Region), using county_frame's fips → Region."""
+    regions = county_frame.assign(st=county_frame['fips'].str[:2]).drop_duplicates('st').set_index('st')['Region']
+    by_state = population.groupby(population.index.str[:2])['population'].sum()
+    by_state.index = by_state.index.map(regions)
+    return by_state[by_state.index.notna()].groupby(level=0).sum().to_frame()
+
+
+def value(metric, v):
+    """JSON-ready value of one metric cell (None for no data)."""
+    if pd.isna(v):
+        return None
+    return int(v) if metric.digits == 0 else round(float(v), metric.digits)
+
+
+def format_value(metric, v):
+    return f'{v:,.{metric.digits}f}'
+
+
+def hover_lines(frame, registry=REGISTRY):
+    """Per-row '<br>Label: value' text for the derived columns of frame (empty where no data)."""
+    text = pd.Series('', index=frame.index)
+    for m in derived_columns(frame, registry):
+        col = frame[m.name]
+        text += col.map(lambda v, m=m: '' if pd.isna(v) else f'<br>{m.label}: {format_value(m, v)}')
+    return text
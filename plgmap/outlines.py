@@ -0,0 +1,209 @@
+"""
+Simplified state outlines dissolved from the county geometry store.
+
+Counties are merged topologically, without polygon unions. Vertices are hashed
+onto an integer grid (coordinates rounded to `precision` decimals, as in
+spatial.py), so neighbouring counties share vertex ids. An edge used twice
+within a state (once by the county on each side) is interior. The remaining
+edges are the state's boundary, and chaining them gives its rings.
+
+The boundary edges of all states form one graph. Its vertices of degree other
+than two are junctions: tripoints, and points where a state border meets the
+coast. Each path between junctions (an arc) is simplified once with
+Douglas-Peucker, endpoints fixed, and both neighbours reuse the result. The
+simplified states therefore still meet without gaps or overlaps. Exterior rings
+are wound clockwise and holes counter-clockwise. This is the winding
+index.html uses for its hexagons, and what Plotly's d3-geo renderer expects.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 0.02   # degrees, about 2 km
+DEFAULT_DIGITS = 3
+
+
+def _vertex_ids(coords, precision):
+    """(id of every vertex, coordinates of every id) after snapping to the precision grid."""
+    scale = 10 ** precision
+    lon_q = np.round((coords[:, 0] + 180.0) * scale).astype(np.int64)
+    lat_q = np.round((coords[:, 1] + 90.0) * scale).astype(np.int64)
+    _, first, vertex_id = np.unique((lon_q << 32) | lat_q, return_index=True, return_inverse=True)
+    return vertex_id.ravel(), coords[first]
+
+
+def boundary_edges(store, precision=5):
+    """
+    ({2-digit state FIPS: (E, 2) boundary edges as sorted vertex-id pairs}, (V, 2)
+    vertex coordinates). An edge counts as boundary when it occurs an odd number
+    of times within its state.
+    """
+    coords = np.asarray(store.coords)
+    if not len(coords):
+        return {}, coords
+    vertex_id, points = _vertex_ids(coords, precision)
+    rings = np.asarray(store.ring_offsets)
+    polygon_feature = np.repeat(np.arange(len(store)), np.diff(store.feature_offsets))
+    ring_feature = np.repeat(polygon_feature, np.diff(store.part_offsets))
+    feature_state = np.array([int(i[:2]) for i in store.ids], dtype=np.int64)
+    vertex_state = np.repeat(feature_state[ring_feature], np.diff(rings))
+
+    # Consecutive vertices within a ring, plus each ring's closing edge (degenerate when already closed)
+    step = np.ones(len(coords) - 1, dtype=bool)
+    step[rings[1:-1] - 1] = False
+    starts, stops = rings[:-1], rings[1:]
+    nonempty = stops > starts
+    a = np.concatenate([vertex_id[:-1][step], vertex_id[stops[nonempty] - 1]])
+    b = np.concatenate([vertex_id[1:][step], vertex_id[starts[nonempty]]])
+    state = np.concatenate([vertex_state[:-1][step], vertex_state[starts[nonempty]]])
+    keep = a != b
+    edges = np.stack([state[keep], np.minimum(a, b)[keep], np.maximum(a, b)[keep]], axis=1)
+
+    unique, counts = np.unique(edges, axis=0, return_counts=True)
+    unique = unique[counts % 2 == 1]
+    by_state = {}
+    for s in np.unique(unique[:, 0]):
+        by_state[f'{int(s):02d}'] = unique[unique[:, 0] == s, 1:]
+    return by_state, points
+
+
+def _chain(edges, junction):
+    """Closed rings (lists of vertex ids, first == last) from undirected edges, starting at junctions where possible."""
+    neighbours = defaultdict(list)
+    for a, b in edges.tolist():
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+    used = set()
+
+    def next_vertex(v):
+        for w in neighbours[v]:
+            if (min(v, w), max(v, w)) not in used:
+                used.add((min(v, w), max(v, w)))
+                return w
+        return None
+
+    rings = []
+    for start in sorted(neighbours, key=lambda v: (not junction[v], v)):
+        while True:
+            cur = next_vertex(start)
+            if cur is None:
+                break
+            ring = [start]
+            while cur is not None and cur != start:
+                ring.append(cur)
+                cur = next_vertex(cur)
+            if cur == start and len(ring) >= 3:
+                rings.append(ring + [start])
+    return rings
+
+
+def douglas_peucker(points, tolerance):
+    """Boolean mask of the points of a polyline kept by Douglas-Peucker (endpoints always kept)."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, seg = points[i], points[i + 1:j]
+        d = points[j] - a
+        length = np.hypot(*d)
+        if length == 0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(d[0] * (seg[:, 1] - a[1]) - d[1] * (seg[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = i + 1 + k
+            keep[m] = True
+            stack.extend([(i, m), (m, j)])
+    return keep
+
+
+def _signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def _contains(ring, point):
+    """Even-odd point-in-polygon test of point against a closed ring."""
+    x1, y1, x2, y2 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+    crosses = (y1 > point[1]) != (y2 > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at = x1 + (point[1] - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (point[0] < x_at)) % 2)
+
+
+def _polygons(rings):
+    """MultiPolygon coordinates from unordered closed rings: nesting depth decides exterior vs hole."""
+    rings = sorted(rings, key=lambda r: -abs(_signed_area(r)))
+    boxes = [np.concatenate([r.min(axis=0), r.max(axis=0)]) for r in rings]
+    depth, parent = [], []
+    for i, ring in enumerate(rings):
+        d, p = 0, None
+        for j in range(i):
+            box = boxes[j]
+            if not (box[0] <= boxes[i][0] and boxes[i][2] <= box[2] and box[1] <= boxes[i][1] and boxes[i][3] <= box[3]):
+                continue
+            others = {tuple(v) for v in rings[j].tolist()}
+            probe = next((v for v in ring[:-1] if tuple(v) not in others), None)
+            if probe is not None and _contains(rings[j], probe):
+                d += 1
+                if depth[j] % 2 == 0:
+                    p = j   # rings are visited largest first, so the last hit is the smallest exterior
+        depth.append(d)
+        parent.append(p)
+    polygons, index = [], {}
+    for i, ring in enumerate(rings):
+        exterior = depth[i] % 2 == 0
+        clockwise = _signed_area(ring) < 0
+        coords = ring if clockwise == exterior else ring[::-1]
+        if exterior:
+            index[i] = len(polygons)
+            polygons.append([coords.tolist()])
+        elif parent[i] in index:
+            polygons[index[parent[i]]].append(coords.tolist())
+    return polygons
+
+
+def state_outlines(store, tolerance=DEFAULT_TOLERANCE, digits=DEFAULT_DIGITS, precision=5):
+    """
+    FeatureCollection of simplified state outlines (MultiPolygon, id = 2-digit
+    state FIPS) dissolved from the county store. tolerance is the Douglas-Peucker
+    distance in degrees. Coordinates are rounded to digits decimals, and rings
+    that collapse below a triangle are dropped.
+    """
+    by_state, points = boundary_edges(store, precision)
+    if not by_state:
+        return {'type': 'FeatureCollection', 'features': []}
+    graph = np.unique(np.concatenate(list(by_state.values())), axis=0)
+    junction = np.bincount(graph.ravel(), minlength=len(points)) != 2
+
+    arcs = {}
+
+    def simplified(arc):
+        key = tuple(arc)
+        canonical = min(key, key[::-1])
+        if canonical not in arcs:
+            xy = points[list(canonical)]
+            arcs[canonical] = np.round(xy[douglas_peucker(xy, tolerance)], digits)
+        return arcs[canonical] if canonical == key else arcs[canonical][::-1]
+
+    features = []
+    for state, edges in sorted(by_state.items()):
+        rings = []
+        for ring in _chain(edges, junction):
+            cuts = [i for i, v in enumerate(ring[:-1]) if junction[v]] or [0]
+            cuts.append(len(ring) - 1)
+            pieces = [simplified(ring[i:j + 1]) for i, j in zip(cuts, cuts[1:])]
+            xy = np.concatenate([pieces[0]] + [p[1:] for p in pieces[1:]])
+            xy = xy[np.r_[True, np.any(xy[1:] != xy[:-1], axis=1)]]
+            if len(xy) >= 4:
+                rings.append(xy)
+        polygons = _polygons(rings)
+        if polygons:
+            features.append({'type': 'Feature', 'id': state, 'properties': {},
+                             'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}})
+    return {'type': 'FeatureCollection', 'features': features}
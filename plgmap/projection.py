@@ -0,0 +1,75 @@
+"""
+Albers equal-area conic projection for the contiguous US (vectorized NumPy).
+
+Standard parallels 29.5°N / 45.5°N, origin 37.5°N 96°W: the same parameters as
+the USGS / Census "USA Contiguous Albers Equal Area Conic" and d3's geoAlbers.
+Equal area makes fixed-size planar cells (e.g. hexagons) cover equal ground.
+Coordinates are metres on a sphere of mean Earth radius.
+
+albers_usa() is the composite "Albers USA" layout (as in d3.geoAlbersUsa and
+Plotly's 'albers usa'). The lower 48 use the projection above. Alaska (at 0.35
+scale) and Hawaii get their own conics and are moved into insets south-west of
+the lower 48.
+"""
+
+import numpy as np
+
+EARTH_RADIUS = 6371008.8
+ALBERS_USA = {'lon0': -96.0, 'lat0': 37.5, 'lat1': 29.5, 'lat2': 45.5}
+
+
+def _constants(lon0, lat0, lat1, lat2):
+    phi0, phi1, phi2 = np.radians([lat0, lat1, lat2])
+    n = (np.sin(phi1) + np.sin(phi2)) / 2
+    c = np.cos(phi1) ** 2 + 2 * n * np.sin(phi1)
+    rho0 = EARTH_RADIUS * np.sqrt(c - 2 * n * np.sin(phi0)) / n
+    return n, c, rho0, np.radians(lon0)
+
+
+def albers(lon, lat, params=ALBERS_USA):
+    """(x, y) in metres for arrays of lon/lat in degrees."""
+    n, c, rho0, lam0 = _constants(**params)
+    lon, lat = np.radians(np.asarray(lon, dtype=np.float64)), np.radians(np.asarray(lat, dtype=np.float64))
+    rho = EARTH_RADIUS * np.sqrt(c - 2 * n * np.sin(lat)) / n
+    theta = n * (lon - lam0)
+    return rho * np.sin(theta), rho0 - rho * np.cos(theta)
+
+
+def albers_inverse(x, y, params=ALBERS_USA):
+    """(lon, lat) in degrees for arrays of projected x/y in metres."""
+    n, c, rho0, lam0 = _constants(**params)
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    rho = np.hypot(x, rho0 - y)
+    theta = np.arctan2(x, rho0 - y)
+    lat = np.arcsin(np.clip((c - (rho * n / EARTH_RADIUS) ** 2) / (2 * n), -1, 1))
+    return np.degrees(lam0 + theta / n), np.degrees(lat)
+
+
+# Composite Albers USA: part -> (conic params, centre lon/lat, scale, inset offset in Earth radii, y up).
+# Centres, scales and offsets follow d3.geoAlbersUsa.
+ALBERS_USA_PARTS = {
+    'lower48': (ALBERS_USA, (-96.6, 38.7), 1.0, (0.0, 0.0)),
+    'alaska': ({'lon0': -154.0, 'lat0': 58.5, 'lat1': 55.0, 'lat2': 65.0}, (-156.0, 58.5), 0.35, (-0.307, -0.201)),
+    'hawaii': ({'lon0': -157.0, 'lat0': 19.9, 'lat1': 8.0, 'lat2': 18.0}, (-160.0, 19.9), 1.0, (-0.205, -0.212)),
+}
+# State FIPS drawn in an inset; other states outside the lower 48 (e.g. 72, Puerto Rico) are not drawn
+INSET_STATES = {'02': 'alaska', '15': 'hawaii'}
+
+
+def usa_part(state_fips):
+    """Composite part ('lower48', 'alaska', 'hawaii') for a 2-digit state FIPS, or None if not drawn."""
+    state_fips = str(state_fips).zfill(2)
+    if state_fips in INSET_STATES:
+        return INSET_STATES[state_fips]
+    return 'lower48' if '01' <= state_fips <= '56' else None
+
+
+def albers_usa(lon, lat, part='lower48'):
+    """(x, y) in metres in the composite Albers USA frame for lon/lat arrays that all belong to part."""
+    params, (clon, clat), k, (dx, dy) = ALBERS_USA_PARTS[part]
+    lon = np.asarray(lon, dtype=np.float64)
+    if part == 'alaska':
+        lon = np.where(lon > 0, lon - 360.0, lon)   # western Aleutians lie past 180°
+    x, y = albers(lon, lat, params)
+    cx, cy = albers(clon, clat, params)
+    return (x - cx) * k + dx * EARTH_RADIUS, (y - cy) * k + dy * EARTH_RADIUS
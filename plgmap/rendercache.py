@@ -0,0 +1,109 @@
+"""
+Content-addressed cache for static renders (Kaleido PNG/PDF and SVG maps).
+
+A render is keyed by a SHA-256 over exactly what it draws from:
+    - output format and figure options (metric, state, scale, classing, width)
+    - the county rows in the figure: only the state's rows for a state map, and
+      every row for national maps and hot-spot maps, whose statistics use neighbours
+      across state lines
+    - the geometry store (its meta.json stamp changes whenever it is recompiled)
+    - the render code: contents of the modules that shape the image, plus the
+      plotly and kaleido versions
+Rendered files are kept as {cache_dir}/{key}{ext}. On a hit nothing is rendered.
+When the output file already has the cached bytes it is left alone ('unchanged');
+otherwise the cached file is copied over it ('copied'). A miss renders and then
+stores the result ('rendered').
+"""
+
+import filecmp
+import functools
+import hashlib
+import json
+import os
+import shutil
+from collections import Counter, namedtuple
+from importlib import metadata
+
+import pandas as pd
+
+from plgmap.states import STATE_ABBREVS
+
+PLGMAP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules whose code or styling changes what a static render looks like
+RENDER_SOURCES = ('figures.py', 'cartesian.py', 'classify.py', 'projection.py', 'spatial.py', 'states.py',
+                  'export.py')
+RENDER_PACKAGES = ('plotly', 'kaleido')
+FIGURE_COLUMNS = ['fips', 'county_name', 'Region', 'state_abbr', 'A. Uniques of First Scribe Created',
+                  'B. Total Events of Scribe Created', 'num_cities']
+
+RenderResult = namedtuple('RenderResult', ['fname', 'status'])   # status: 'rendered' | 'copied' | 'unchanged'
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Digest of RENDER_SOURCES plus the installed RENDER_PACKAGES versions."""
+    h = hashlib.sha256()
+    for name in RENDER_SOURCES:
+        with open(os.path.join(PLGMAP_DIR, name), 'rb') as f:
+            h.update(name.encode() + b'\0' + f.read())
+    for package in RENDER_PACKAGES:
+        try:
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            version = None
+        h.update(f'{package}={version}'.encode())
+    return h.hexdigest()
+
+
+def figure_rows(county_df, state_filter=None, metric=None):
+    """The county rows a figure draws from, sorted by FIPS (see module docstring)."""
+    data = county_df
+    if state_filter and not (metric or '').startswith('hotspot_'):
+        abbr = state_filter.upper() if len(state_filter) == 2 else STATE_ABBREVS.get(state_filter, state_filter)
+        data = data[data['state_abbr'] == abbr]
+    return data[[c for c in FIGURE_COLUMNS if c in data.columns]].sort_values('fips', kind='stable')
+
+
+def render_key(county_df, geojson, fname, **options):
+    """Cache key of one render to fname with the given figure options."""
+    rows = figure_rows(county_df, options.get('state_filter'), options.get('metric'))
+    meta = os.stat(os.path.join(geojson.path, 'meta.json'))
+    h = hashlib.sha256()
+    h.update(json.dumps({'ext': os.path.splitext(fname)[1].lower(), 'options': options,
+                         'geometry': [meta.st_size, meta.st_mtime_ns], 'code': code_version()},
+                        sort_keys=True, default=str).encode())
+    h.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _cache_path(cache_dir, key, fname):
+    return os.path.join(cache_dir, key + os.path.splitext(fname)[1].lower())
+
+
+def restore(cache_dir, key, fname):
+    """'unchanged' or 'copied' if key is cached (fname then holds the cached render), else None."""
+    path = _cache_path(cache_dir, key, fname)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(fname) and filecmp.cmp(path, fname, shallow=False):
+        return 'unchanged'
+    shutil.copyfile(path, fname)
+    return 'copied'
+
+
+def save(cache_dir, key, fname):
+    """Store a fresh render of fname under key."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, key, fname)
+    shutil.copyfile(fname, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def summary(results):
+    """One-line hit/miss report over pipeline results (non-RenderResult values are ignored)."""
+    counts = Counter(r.status for r in results if isinstance(r, RenderResult))
+    if not counts:
+        return None
+    hits = counts['unchanged'] + counts['copied']
+    return (f"Render cache: {hits} hit{'s' if hits != 1 else ''} ({counts['unchanged']} unchanged, "
+            f"{counts['copied']} copied), {counts['rendered']} rendered")
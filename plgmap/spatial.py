@@ -0,0 +1,140 @@
+"""
+County adjacency and local spatial statistics (Getis-Ord Gi*, local Moran's I).
+
+Adjacency is detected from shared vertices. Vertices are hashed onto an
+integer grid (coordinates rounded to `precision` decimals), and a sparse
+county × vertex incidence matrix B is built. Grid points closer than
+`tolerance` degrees are linked by L, so neighbouring sides digitized with
+different vertices still meet; B @ (I + L) @ B.T then counts shared vertices
+for every county pair. One shared vertex means queen contiguity; two or more
+means the counties share an edge (rook). The matrix is computed once per
+geometry store and cached as adjacency_snapped.npz inside it.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+
+ADJACENCY_FILE = 'adjacency_snapped.npz'
+SNAP_TOLERANCE = 1e-4  # degrees, about 11 m
+SIGNIFICANCE_Z = 1.96  # two-sided 95%
+
+
+def _vertex_features(store):
+    """Feature index of every vertex in store.coords."""
+    n_features = len(store)
+    ring_counts = np.diff(store.part_offsets)          # rings per polygon
+    polygon_counts = np.diff(store.feature_offsets)    # polygons per feature
+    polygon_feature = np.repeat(np.arange(n_features), polygon_counts)
+    ring_feature = np.repeat(polygon_feature, ring_counts)
+    return np.repeat(ring_feature, np.diff(store.ring_offsets))
+
+
+def _vertex_ids(coords, precision):
+    """(grid id of every vertex, coordinates of every grid id) after snapping to the precision grid."""
+    scale = 10 ** precision
+    lon_q = np.round((coords[:, 0] + 180.0) * scale).astype(np.int64)
+    lat_q = np.round((coords[:, 1] + 90.0) * scale).astype(np.int64)
+    _, first, vertex_id = np.unique((lon_q << 32) | lat_q, return_index=True, return_inverse=True)
+    return vertex_id.ravel(), coords[first]
+
+
+def build_adjacency(store, precision=5, rook=False, tolerance=SNAP_TOLERANCE):
+    """
+    Binary county adjacency (CSR, features in store order) from shared vertices.
+    A vertex is shared with a neighbour when the neighbour has a vertex within
+    tolerance degrees; rook=True requires two shared vertices (a shared edge)
+    on each side instead of one.
+    """
+    coords = np.asarray(store.coords)
+    vertex_id, points = _vertex_ids(coords, precision)
+    n_vertices = len(points)
+    feature = _vertex_features(store)
+    incidence = sp.csr_matrix(
+        (np.ones(len(feature), dtype=np.int32), (feature, vertex_id)), shape=(len(store), n_vertices),
+    )
+    incidence.data[:] = 1  # closing vertex repeats the first one; count each vertex once
+
+    near = incidence
+    if tolerance > 0 and n_vertices > 1:
+        # Vertices within tolerance of each other, without chaining: near[c, v] is set when
+        # county c has a vertex at v or within tolerance of v.
+        pairs = cKDTree(points).query_pairs(tolerance, output_type='ndarray')
+        links = sp.csr_matrix(
+            (np.ones(2 * len(pairs), dtype=np.int32),
+             (np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+            shape=(n_vertices, n_vertices),
+        ) + sp.identity(n_vertices, dtype=np.int32, format='csr')
+        near = (incidence @ links).tocsr()
+        near.data[:] = 1
+
+    # shared[a, b]: vertices of a that b also has (or has one within tolerance of)
+    shared = (incidence @ near.T).tocsr()
+    shared = shared.minimum(shared.T).tocsr()
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+    adjacency = (shared >= (2 if rook else 1)).astype(np.int8)
+    adjacency.eliminate_zeros()
+    return adjacency.tocsr()
+
+
+def load_adjacency(store, rook=False):
+    """Adjacency for store, cached inside the store directory."""
+    name = ADJACENCY_FILE.replace('.npz', '_rook.npz') if rook else ADJACENCY_FILE
+    path = os.path.join(store.path, name)
+    if os.path.exists(path):
+        return sp.load_npz(path).tocsr()
+    adjacency = build_adjacency(store, rook=rook)
+    sp.save_npz(path, adjacency)
+    return adjacency
+
+
+def getis_ord_gi_star(W, x):
+    """Gi* z-scores for every county (W binary adjacency without self; self is added here)."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    W_star = (W + sp.identity(n, format='csr', dtype=W.dtype)).astype(np.float64)
+    w_sum = np.asarray(W_star.sum(axis=1)).ravel()
+    w_sq_sum = np.asarray(W_star.multiply(W_star).sum(axis=1)).ravel()
+    x_bar = x.mean()
+    s = np.sqrt(max((x ** 2).mean() - x_bar ** 2, 0.0))
+    num = W_star @ x - x_bar * w_sum
+    den = s * np.sqrt(np.maximum(n * w_sq_sum - w_sum ** 2, 0.0) / max(n - 1, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gi = np.where(den > 0, num / den, 0.0)
+    return gi
+
+
+def local_morans_i(W, x):
+    """Local Moran's I for every county with a row-standardized W (islands get 0)."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    row_sums = np.asarray(W.sum(axis=1)).ravel().astype(np.float64)
+    inv = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=row_sums > 0)
+    W_row = sp.diags(inv) @ W.astype(np.float64)
+    z = x - x.mean()
+    m2 = (z ** 2).sum() / n if n else 0.0
+    if m2 == 0:
+        return np.zeros(n)
+    return (z / m2) * (W_row @ z)
+
+
+def hotspot_frame(store, values_by_fips):
+    """
+    Gi* and local Moran's I for every county in the store.
+
+    values_by_fips: {metric name: pandas Series indexed by 5-digit FIPS}; counties
+    without a value count as 0. Returns a DataFrame indexed by FIPS with
+    gi_<metric> and moran_<metric> columns.
+    """
+    W = load_adjacency(store)
+    index = pd.Index(store.ids, name='fips')
+    out = pd.DataFrame(index=index)
+    for name, series in values_by_fips.items():
+        x = series.groupby(level=0).sum().reindex(index, fill_value=0).to_numpy(dtype=np.float64)
+        out[f'gi_{name}'] = getis_ord_gi_star(W, x)
+        out[f'moran_{name}'] = local_morans_i(W, x)
+    return out
@@ -0,0 +1,40 @@
+"""
+US state names, abbreviations and map centres shared by the pipeline modules.
+"""
+
+STATE_ABBREVS = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
+    'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
+    'District of Columbia': 'DC', 'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI',
+    'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME',
+    'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+    'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE',
+    'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM',
+    'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI',
+    'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX',
+    'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+
+# State center coordinates for zoom when filtering
+STATE_CENTERS = {
+    'AL': (32.8, -86.8), 'AK': (64.0, -153.0), 'AZ': (34.3, -111.7),
+    'AR': (34.8, -92.2), 'CA': (37.2, -119.5), 'CO': (39.0, -105.5),
+    'CT': (41.6, -72.7), 'DE': (39.0, -75.5), 'DC': (38.9, -77.0),
+    'FL': (28.6, -82.4), 'GA': (32.7, -83.5), 'HI': (20.5, -157.4),
+    'ID': (44.4, -114.6), 'IL': (40.0, -89.2), 'IN': (39.8, -86.3),
+    'IA': (42.0, -93.5), 'KS': (38.5, -98.3), 'KY': (37.8, -85.7),
+    'LA': (31.0, -92.0), 'ME': (45.4, -69.2), 'MD': (39.0, -76.8),
+    'MA': (42.3, -71.8), 'MI': (44.3, -85.4), 'MN': (46.3, -94.3),
+    'MS': (32.7, -89.7), 'MO': (38.4, -92.5), 'MT': (47.0, -109.6),
+    'NE': (41.5, -99.8), 'NV': (39.3, -116.6), 'NH': (43.7, -71.6),
+    'NJ': (40.1, -74.7), 'NM': (34.4, -106.1), 'NY': (42.9, -75.5),
+    'NC': (35.5, -79.8), 'ND': (47.4, -100.4), 'OH': (40.4, -82.8),
+    'OK': (35.6, -97.5), 'OR': (44.0, -120.5), 'PA': (40.9, -77.8),
+    'RI': (41.7, -71.5), 'SC': (33.9, -80.9), 'SD': (44.4, -100.2),
+    'TN': (35.9, -86.4), 'TX': (31.5, -99.4), 'UT': (39.3, -111.7),
+    'VT': (44.1, -72.6), 'VA': (37.5, -78.9), 'WA': (47.4, -120.5),
+    'WV': (38.6, -80.6), 'WI': (44.6, -89.8), 'WY': (43.0, -107.6),
+}
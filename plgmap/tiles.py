@@ -0,0 +1,230 @@
+"""
+Pre-rendered XYZ raster tiles (Web Mercator, 256 px PNG) of the county choropleth.
+
+Each tile is rasterized once, whatever the number of metric/scale layers.
+Pillow draws every county that overlaps the tile into a 2×-supersampled integer
+image whose pixels hold the county's index (0 = no county). Counties go
+largest-first, and each county's holes are cleared before smaller counties
+inside them are drawn. Every layer (metric × scale) is then a palette lookup
+on that index image. County borders are the pixels where the index changes,
+and a box downsample to 256 px anti-aliases edges. Tiles are spread over a
+process pool. Each worker opens the memory-mapped GeometryStore and projects
+its vertices once in its initializer.
+
+Output: {out_dir}/{metric}_{scale}/{z}/{x}/{y}.png plus {out_dir}/tiles.json
+(TileJSON-style: zoom range, bounds, a URL template and a legend per layer).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from plgmap import classify
+from plgmap.geostore import GeometryStore
+
+TILE_SIZE = 256
+SUPERSAMPLE = 2
+DEFAULT_ZOOMS = (3, 7)
+MAX_LAT = 85.0511287798
+METRICS = {'uniques': 'A. Uniques of First Scribe Created', 'events': 'B. Total Events of Scribe Created'}
+SCALES = ('log', 'linear', 'quantile', 'jenks')
+# Same palette and colors as index.html (HEAT, land color, county lines)
+HEAT = [(0, '#db7865'), (0.25, '#f8ae70'), (0.5, '#ffd666'), (0.75, '#abc77e'), (1, '#4ea471')]
+NO_DATA_COLOR = '#f0ece7'
+BORDER_COLOR = '#e8e4df'
+
+_worker = {}
+
+
+def _rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return [int(hex_color[i:i + 2], 16) for i in (0, 2, 4)]
+
+
+def sample_heat(t):
+    """(n, 3) uint8 colors for positions t in [0, 1] along HEAT."""
+    stops = np.array([s for s, _ in HEAT])
+    colors = np.array([_rgb(c) for _, c in HEAT], dtype=np.float64)
+    t = np.clip(np.asarray(t, dtype=np.float64), 0, 1)
+    return np.stack([np.interp(t, stops, colors[:, i]) for i in range(3)], axis=1).round().astype(np.uint8)
+
+
+def mercator(lon, lat):
+    """Normalized Web Mercator (x, y) in [0, 1], y pointing south."""
+    lat = np.radians(np.clip(lat, -MAX_LAT, MAX_LAT))
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2
+    return x, y
+
+
+def mercator_inverse(x, y):
+    """(lon, lat) in degrees for normalized Web Mercator x/y."""
+    return np.asarray(x) * 360.0 - 180.0, np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y)))))
+
+
+def layer_palette(values, scale):
+    """
+    (F + 1, 4) RGBA lookup for one layer: row 0 is transparent (no county), row
+    i + 1 colors feature i. values holds one number per store feature (NaN = no data).
+    Returns (palette, legend) with legend as [[hex color, label], ...].
+    """
+    values = np.asarray(values, dtype=np.float64)
+    has = np.isfinite(values)
+    t = np.zeros(len(values))
+    v = values[has]
+    if scale in classify.BREAKS:
+        edges = classify.BREAKS[scale](v)
+        n = len(edges) - 1
+        t[has] = classify.classify(v, edges) / max(n - 1, 1)
+        stops = np.arange(n) / max(n - 1, 1)
+        labels = classify.class_labels(edges)
+    else:
+        top = v.max() if len(v) else 0
+        if scale == 'log':
+            t[has] = np.log1p(v) / np.log1p(top) if top > 0 else 0
+            stops = np.linspace(0, 1, 5)
+            labels = [f'{int(round(x)):,}' for x in np.expm1(stops * np.log1p(top))]
+        else:
+            t[has] = v / top if top > 0 else 0
+            stops = np.linspace(0, 1, 5)
+            labels = [f'{int(round(x)):,}' for x in stops * top]
+    palette = np.zeros((len(values) + 1, 4), dtype=np.uint8)
+    palette[1:, :3] = sample_heat(t)
+    palette[1:, :3][~has] = _rgb(NO_DATA_COLOR)
+    palette[1:, 3] = 255
+    legend = [['#%02x%02x%02x' % tuple(c), label] for c, label in zip(sample_heat(stops).tolist(), labels)]
+    return palette, legend
+
+
+class TileGeometry:
+    """Store geometry in normalized Web Mercator, with per-feature bounds and a largest-first draw order."""
+
+    def __init__(self, store):
+        self.store = store
+        coords = np.asarray(store.coords)
+        lon = coords[:, 0].copy()
+        rings, parts, features = store.ring_offsets, store.part_offsets, store.feature_offsets
+        self.vertex_start = np.asarray(rings[parts[features[:-1]]])
+        self.vertex_stop = np.asarray(rings[parts[features[1:]]])
+        # A feature spanning the antimeridian (western Aleutians) is kept on the western side
+        for i in range(len(store)):
+            a, b = self.vertex_start[i], self.vertex_stop[i]
+            if b > a and lon[a:b].max() - lon[a:b].min() > 180:
+                seg = lon[a:b]
+                lon[a:b] = np.where(seg > 0, seg - 360, seg)
+        x, y = mercator(lon, coords[:, 1])
+        self.xy = np.stack([x, y], axis=1)
+        self.bounds = np.array([
+            [*self.xy[a:b].min(axis=0), *self.xy[a:b].max(axis=0)] if b > a else [2, 2, -1, -1]
+            for a, b in zip(self.vertex_start, self.vertex_stop)
+        ])
+        area = (self.bounds[:, 2] - self.bounds[:, 0]) * (self.bounds[:, 3] - self.bounds[:, 1])
+        self.order = np.argsort(-area, kind='stable')
+
+    def tiles(self, zoom):
+        """(z, x, y) of every tile at zoom that overlaps at least one feature."""
+        n = 2 ** zoom
+        out = set()
+        valid = self.bounds[:, 0] <= self.bounds[:, 2]
+        spans = np.clip(np.floor(self.bounds[valid] * n), 0, n - 1).astype(int)
+        for x0, y0, x1, y1 in spans.tolist():
+            out.update((zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+        return sorted(out)
+
+    def rasterize(self, z, x, y):
+        """Index image (feature + 1, 0 = empty) of one tile at SUPERSAMPLE resolution, or None if empty."""
+        from PIL import Image, ImageDraw
+
+        size = TILE_SIZE * SUPERSAMPLE
+        n = 2 ** z
+        x0, y0, x1, y1 = x / n, y / n, (x + 1) / n, (y + 1) / n
+        b = self.bounds
+        hit = (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+        if not hit.any():
+            return None
+        img = Image.new('I', (size, size), 0)
+        draw = ImageDraw.Draw(img)
+        k = n * size
+        rings, parts, features = self.store.ring_offsets, self.store.part_offsets, self.store.feature_offsets
+        for f in self.order[hit[self.order]]:
+            for p in range(features[f], features[f + 1]):
+                for r in range(parts[p], parts[p + 1]):
+                    pts = (self.xy[rings[r]:rings[r + 1]] - (x0, y0)) * k
+                    if len(pts) >= 3:
+                        # First ring of a polygon is its exterior; later rings are holes
+                        draw.polygon(pts.ravel().tolist(), fill=int(f) + 1 if r == parts[p] else 0)
+        ids = np.asarray(img)
+        return ids if ids.any() else None
+
+
+def border_mask(ids):
+    """Pixels where the county index changes (county borders, coasts); shared by every layer of a tile."""
+    edge = np.zeros(ids.shape, dtype=bool)
+    edge[:, 1:] |= ids[:, 1:] != ids[:, :-1]
+    edge[1:, :] |= ids[1:, :] != ids[:-1, :]
+    return edge & (ids > 0)
+
+
+def colorize(ids, palette, edge):
+    """256 px RGBA tile from an index image, a layer palette and the tile's border mask."""
+    from PIL import Image
+
+    rgba = palette[ids]
+    rgba[edge, :3] = _rgb(BORDER_COLOR)
+    return Image.fromarray(rgba).resize((TILE_SIZE, TILE_SIZE), Image.BOX)
+
+
+def _init_worker(store_path, palettes, out_dir):
+    _worker.update(geometry=TileGeometry(GeometryStore(store_path)), palettes=palettes, out_dir=out_dir)
+
+
+def _render_tile(tile):
+    """Rasterize one tile and write it for every layer; returns the number of PNGs written."""
+    z, x, y = tile
+    ids = _worker['geometry'].rasterize(z, x, y)
+    if ids is None:
+        return 0
+    edge = border_mask(ids)
+    for name, palette in _worker['palettes'].items():
+        path = os.path.join(_worker['out_dir'], name, str(z), str(x), f'{y}.png')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        colorize(ids, palette, edge).save(path)
+    return len(_worker['palettes'])
+
+
+def build_tiles(county_df, store, out_dir, zooms=DEFAULT_ZOOMS, metrics=tuple(METRICS), scales=SCALES,
+                max_workers=None):
+    """
+    Render the pyramid for every metric × scale into out_dir and write tiles.json.
+    Returns the number of PNGs written.
+    """
+    by_fips = county_df.groupby('fips')[[METRICS[m] for m in metrics]].sum().reindex(store.ids)
+    palettes, legends = {}, {}
+    for metric in metrics:
+        values = by_fips[METRICS[metric]].to_numpy(dtype=np.float64)
+        for scale in scales:
+            name = f'{metric}_{scale}'
+            palettes[name], legends[name] = layer_palette(values, scale)
+
+    geometry = TileGeometry(store)
+    tiles = [t for z in range(zooms[0], zooms[1] + 1) for t in geometry.tiles(z)]
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(store.path, palettes, out_dir)) as pool:
+        written = sum(pool.map(_render_tile, tiles, chunksize=max(1, len(tiles) // 64)))
+
+    valid = geometry.bounds[:, 0] <= geometry.bounds[:, 2]
+    west, north = mercator_inverse(*geometry.bounds[valid, :2].min(axis=0))
+    east, south = mercator_inverse(*geometry.bounds[valid, 2:].max(axis=0))
+    meta = {
+        'tilejson': '2.2.0',
+        'minzoom': zooms[0],
+        'maxzoom': zooms[1],
+        'bounds': [round(float(v), 4) for v in (west, south, east, north)],
+        'layers': {name: {'tiles': [f'{name}/{{z}}/{{x}}/{{y}}.png'], 'legend': legends[name]} for name in palettes},
+    }
+    with open(os.path.join(out_dir, 'tiles.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+    return written
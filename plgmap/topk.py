@@ -0,0 +1,104 @@
+"""
+Bounded-memory heavy hitters (weighted Space-Saving).
+
+A SpaceSaving summary keeps at most `capacity` counters. An unseen item takes
+over the smallest counter, inheriting its count as the item's error. Every
+reported count is therefore an overestimate by at most `err`, and any item
+whose true weight exceeds total / capacity is guaranteed to be tracked.
+Summaries merge (Agarwal et al., "Mergeable Summaries"), so chunks, files and
+periods can be tallied separately and combined. TopKSet keeps one summary per
+key (county FIPS, state).
+"""
+
+DEFAULT_CAPACITY = 32
+
+
+class SpaceSaving:
+    """Weighted Space-Saving summary: {item: [count, err]} with at most capacity items."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counters = {}
+
+    def _min_count(self):
+        """Smallest tracked count once full (the bound on any untracked item), else 0."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(c for c, _ in self.counters.values())
+
+    def update(self, item, weight=1):
+        entry = self.counters.get(item)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0]
+        else:
+            victim = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[item] = [floor + weight, floor]
+
+    def merge(self, other):
+        """Combine with another summary; an item missing on one side is bounded by that side's minimum."""
+        floor_a, floor_b = self._min_count(), other._min_count()
+        merged = {}
+        for item in set(self.counters) | set(other.counters):
+            ca, ea = self.counters.get(item, (floor_a, floor_a))
+            cb, eb = other.counters.get(item, (floor_b, floor_b))
+            merged[item] = [ca + cb, ea + eb]
+        keep = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)[:self.capacity]
+        self.counters = {item: entry for item, entry in keep}
+        return self
+
+    def top(self, n=5):
+        """[(item, count, err)] by descending count; count - err is a guaranteed lower bound."""
+        ranked = sorted(self.counters.items(), key=lambda kv: (-kv[1][0], kv[1][1], kv[0]))
+        return [(item, count, err) for item, (count, err) in ranked[:n]]
+
+    def to_list(self):
+        return [[item, count, err] for item, (count, err) in self.counters.items()]
+
+    @classmethod
+    def from_list(cls, entries, capacity=DEFAULT_CAPACITY):
+        summary = cls(capacity)
+        summary.counters = {item: [count, err] for item, count, err in entries}
+        return summary
+
+
+class TopKSet:
+    """One SpaceSaving summary per key."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.summaries = {}
+
+    def update(self, key, item, weight=1):
+        summary = self.summaries.get(key)
+        if summary is None:
+            summary = self.summaries[key] = SpaceSaving(self.capacity)
+        summary.update(item, weight)
+
+    def update_grouped(self, totals):
+        """Apply pre-aggregated {(key, item): weight} totals (e.g. one chunk's groupby), heaviest first."""
+        for (key, item), weight in sorted(totals.items(), key=lambda kv: -kv[1]):
+            self.update(key, item, weight)
+
+    def merge(self, other):
+        for key, summary in other.summaries.items():
+            if key in self.summaries:
+                self.summaries[key].merge(summary)
+            else:
+                self.summaries[key] = SpaceSaving.from_list(summary.to_list(), self.capacity)
+        return self
+
+    def top(self, key, n=5):
+        summary = self.summaries.get(key)
+        return summary.top(n) if summary else []
+
+    def to_dict(self):
+        return {key: summary.to_list() for key, summary in self.summaries.items()}
+
+    @classmethod
+    def from_dict(cls, data, capacity=DEFAULT_CAPACITY):
+        topk = cls(capacity)
+        topk.summaries = {key: SpaceSaving.from_list(entries, capacity) for key, entries in data.items()}
+        return topk
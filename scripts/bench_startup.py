@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start of generate.py and the plgmap subsystems.
+
+Each target is imported in a fresh interpreter with `python -X importtime`, and
+the target's cumulative import time is read from the last line of the report.
+Every import is repeated and the median is kept. `generate.py --help` is also
+timed end to end (wall clock, interpreter start included); that is the floor
+for every scheduled or watch-loop run.
+
+Usage:
+    python scripts/bench_startup.py [--runs 7] [--record bench/startup.jsonl] [--budget-ms 400]
+
+--record appends one JSON line (time, git revision, medians in ms) so regressions
+show up over time. --budget-ms exits with status 1 when importing generate takes
+longer, for use as a CI gate.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a run pays for each subsystem: generate alone is the CLI entry; the rest load on demand
+TARGETS = ['generate', 'plgmap.ingest', 'plgmap.geocode', 'plgmap.figures', 'plgmap.export', 'pandas']
+
+
+def import_ms(module):
+    """Cumulative import time (ms) of module in a fresh interpreter."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def help_ms():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'generate.py', '--help'], cwd=REPO_ROOT, capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark generate.py / plgmap cold-start import time.')
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters per measurement (median is kept)')
+    parser.add_argument('--record', default=None, help='Append the results as one JSON line to this file')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Exit with status 1 if importing generate takes longer than this')
+    args = parser.parse_args()
+
+    results = {}
+    for target in TARGETS:
+        results[f'import {target}'] = statistics.median(import_ms(target) for _ in range(args.runs))
+    results['generate.py --help'] = statistics.median(help_ms() for _ in range(args.runs))
+
+    width = max(len(k) for k in results)
+    print(f"Cold start, median of {args.runs} fresh interpreters:")
+    for name, ms in results.items():
+        print(f"  {name.ljust(width)}  {ms:8.1f} ms")
+
+    if args.record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+        with open(args.record, 'a') as f:
+            f.write(json.dumps({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'rev': git_revision(),
+                                'python': sys.version.split()[0], 'runs': args.runs,
+                                'ms': {k: round(v, 1) for k, v in results.items()}}) + '\n')
+        print(f"Recorded to {args.record}")
+
+    if args.budget_ms is not None and results['import generate'] > args.budget_ms:
+        print(f"  ⚠ import generate took {results['import generate']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Fingerprint the data scripts index.html loads and generate an offline service worker.
+
+For each asset in ASSETS and FETCHED_ASSETS this writes a content-hashed copy
+next to it (e.g. data/plg_data.3f2a9c01be.js), removes stale hashed copies and
+records the mapping in data/manifest.json. It then rewrites the <script src>
+references in index.html, fills in its ASSET_MANIFEST (the page builds the
+FETCHED_ASSETS URLs at runtime) and writes sw.js. The service worker precaches
+the page and its scripts, then the Plotly bundle and the county GeoJSON one by
+one, so an unreachable CDN cannot fail the install. Fetched data files are
+cached the first time they load. Return visits load from the local cache, and
+the map works offline.
+
+Run it after build_plg_data.py / build_facility_data.py, before publishing:
+    python scripts/build_assets.py
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+
+ASSETS = ['data/plg_data.js', 'data/facility_by_state.js']
+# Data files index.html fetches on demand (generate.py --hex-bins / --zip-tiles, build_facility_data.py); glob patterns
+FETCHED_ASSETS = ['data/hexbins.json', 'data/zip_tiles/*.json', 'data/facility_by_county.json']
+# Cross-origin resources the page fetches on every load; cached on first visit
+EXTERNAL_URLS = [
+    'https://cdn.plot.ly/plotly-2.27.0.min.js',
+    'https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json',
+]
+HASH_LEN = 10
+
+SW_TEMPLATE = """// Generated by scripts/build_assets.py — do not edit by hand.
+const CACHE = 'plg-map-%(version)s';
+const PRECACHE = %(precache)s;
+const EXTERNAL = %(external)s;
+const IMMUTABLE = new Set(%(immutable)s);
+
+self.addEventListener('install', event => {
+    // Same-origin files must all succeed; cross-origin ones are added one by one and may fail
+    // (they are then cached the first time the page fetches them)
+    event.waitUntil(caches.open(CACHE)
+        .then(c => c.addAll(PRECACHE).then(() => Promise.all(EXTERNAL.map(u => c.add(u).catch(() => {})))))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(k => k.startsWith('plg-map-') && k !== CACHE).map(k => caches.delete(k))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const req = event.request;
+    // Live updates (scripts/live_server.py) are an endless stream: never cache them
+    if (req.method !== 'GET' || req.headers.get('accept') === 'text/event-stream') return;
+    const url = new URL(req.url);
+    const isImmutable = IMMUTABLE.has(req.url) || IMMUTABLE.has(url.pathname.split('/').slice(-2).join('/'))
+        || IMMUTABLE.has(url.pathname.split('/').slice(-3).join('/'));
+    if (isImmutable) {
+        // Hashed files and pinned CDN URLs never change: cache first
+        event.respondWith(caches.match(req).then(hit => hit || fetch(req).then(res => {
+            if (res.ok) { const copy = res.clone(); caches.open(CACHE).then(c => c.put(req, copy)); }
+            return res;
+        })));
+    } else if (url.origin === location.origin) {
+        // The page itself: serve from cache immediately, refresh in the background
+        event.respondWith(caches.open(CACHE).then(c => c.match(req, { ignoreSearch: true }).then(hit => {
+            const fresh = fetch(req).then(res => { if (res.ok) c.put(req, res.clone()); return res; }).catch(() => hit);
+            return hit || fresh;
+        })));
+    }
+});
+"""
+
+
+def content_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+
+def hashed_name(asset, digest):
+    stem, ext = os.path.splitext(asset)
+    return f'{stem}.{digest}{ext}'
+
+
+def asset_pattern(asset):
+    """Regex matching the asset's plain or hashed filename (as used in src attributes)."""
+    stem, ext = os.path.splitext(asset)
+    return re.compile(re.escape(stem) + r'(?:\.[0-9a-f]{%d})?' % HASH_LEN + re.escape(ext))
+
+
+def fetched_assets(repo_root):
+    """FETCHED_ASSETS present on disk, as repo-relative paths (hashed copies excluded)."""
+    found = []
+    for pattern in FETCHED_ASSETS:
+        for path in sorted(glob.glob(os.path.join(repo_root, pattern))):
+            asset = os.path.relpath(path, repo_root).replace(os.sep, '/')
+            if not re.search(r'\.[0-9a-f]{%d}\.[^.]+$' % HASH_LEN, asset):
+                found.append(asset)
+    return found
+
+
+def fingerprint_assets(repo_root, assets):
+    """Write hashed copies of assets, drop stale ones, return {asset: hashed path}."""
+    manifest = {}
+    for asset in assets:
+        src = os.path.join(repo_root, asset)
+        if not os.path.isfile(src):
+            print(f"  ⚠ Skipping missing asset: {asset}")
+            continue
+        target = hashed_name(asset, content_hash(src))
+        shutil.copyfile(src, os.path.join(repo_root, target))
+        directory = os.path.dirname(src)
+        pattern = asset_pattern(os.path.basename(asset))
+        for name in os.listdir(directory):
+            if name != os.path.basename(asset) and name != os.path.basename(target) and pattern.fullmatch(name):
+                os.remove(os.path.join(directory, name))
+        manifest[asset] = target
+    return manifest
+
+
+def rewrite_html(html_path, manifest, fetched):
+    """Point the <script src> tags at the hashed ASSETS and fill in ASSET_MANIFEST with the fetched ones."""
+    with open(html_path) as f:
+        html = f.read()
+    for asset in ASSETS:
+        if asset in manifest:
+            html = asset_pattern(asset).sub(manifest[asset], html)
+    entries = json.dumps({a: manifest[a] for a in fetched if a in manifest}, separators=(',', ':'))
+    html = re.sub(r'const ASSET_MANIFEST = \{.*?\};', lambda m: f'const ASSET_MANIFEST = {entries};', html, count=1)
+    with open(html_path, 'w') as f:
+        f.write(html)
+
+
+def write_service_worker(sw_path, manifest):
+    scripts = sorted(manifest[a] for a in ASSETS if a in manifest)
+    hashed = sorted(manifest.values())
+    version = hashlib.sha256(json.dumps([hashed, EXTERNAL_URLS]).encode()).hexdigest()[:HASH_LEN]
+    with open(sw_path, 'w') as f:
+        f.write(SW_TEMPLATE % {
+            'version': version,
+            'precache': json.dumps(['./', 'index.html'] + scripts),
+            'external': json.dumps(EXTERNAL_URLS),
+            'immutable': json.dumps(hashed + EXTERNAL_URLS),
+        })
+    return version
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_root = os.path.dirname(script_dir)
+
+    fetched = fetched_assets(repo_root)
+    manifest = fingerprint_assets(repo_root, ASSETS + fetched)
+    with open(os.path.join(repo_root, 'data', 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    rewrite_html(os.path.join(repo_root, 'index.html'), manifest, fetched)
+    version = write_service_worker(os.path.join(repo_root, 'sw.js'), manifest)
+
+    for asset in ASSETS:
+        if asset in manifest:
+            print(f"  {asset} → {manifest[asset]}")
+    if fetched:
+        print(f"  {len(fetched)} fetched data files (hexbins, ZIP tiles, county facilities) fingerprinted")
+    print(f"Wrote data/manifest.json, index.html references and sw.js (cache plg-map-{version})")
+
+
+if __name__ == '__main__':
+    main()
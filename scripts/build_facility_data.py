@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
 """
 Build FACILITY_BY_STATE from large_facilities and small_facilities CSVs.
-Outputs JavaScript for embedding in index.html.
+Writes data/facility_by_state.js, which index.html loads on startup.
+
+Both CSVs are streamed row by row and de-duplicated with per-state sets.
+When the small-facilities CSV has a ZIP column (or addresses ending in a ZIP),
+a per-county index (5-digit FIPS -> up to --max-county names) is written to
+data/facility_by_county.json. It is kept out of the startup script so the page
+only downloads it when it asks for it. That needs the zipcodes and addfips
+packages; without them the county index is skipped.
 
 Usage:
   python scripts/build_facility_data.py \\
     --large "/path/plg_data - large_facilities.csv" \\
     --small "/path/plg_data - small_facilities.csv"
-  Then paste the printed object into index.html as FACILITY_BY_STATE.
+  Pass --out - to print the JavaScript to stdout instead; --county-out sets the county index path.
 """
 
 import csv
 import json
 import argparse
 import os
+import re
+import sys
 
 STATE_ABBREV_TO_FULL = {
     'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
@@ -31,43 +40,117 @@ STATE_ABBREV_TO_FULL = {
     'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
 }
 
+# Column names accepted for the small-facility ZIP / address (first match wins)
+ZIP_COLUMNS = ('ZIP', 'Zip', 'Zip Code', 'ZIP Code', 'Zipcode', 'Postal Code', 'zip')
+ADDRESS_COLUMNS = ('Address', 'Full Address', 'Street Address', 'address')
+ZIP_IN_ADDRESS = re.compile(r'\b(\d{5})(?:-\d{4})?\s*$')
+# A ZIP cell: ZIP or ZIP+4, possibly missing leading zeros after a spreadsheet round trip ("2134", "2134-1234")
+ZIP_FIELD = re.compile(r'^(\d{1,5})(?:-\d{4})?$')
+COUNTY_SUFFIXES = (' County', ' Parish', ' Borough', ' Census Area', ' Municipality', ' Municipio', ' city')
+
 
 def load_large_facilities(path):
     """Return dict: state_name -> list of health system names (with facilities in that state)."""
     by_state = {}
     with open(path, newline='', encoding='utf-8') as f:
         reader = csv.reader(f)
-        rows = list(reader)
-    if len(rows) < 4:
-        return by_state
-    # Row 2 (index 1): "State Name", "", "", then org names
-    org_names = []
-    for i, cell in enumerate(rows[1]):
-        if i >= 3 and cell and cell != 'State Name':
-            org_names.append(cell.strip())
-    # Rows 4+: state name col 0, counts col 3+
-    for row in rows[3:]:
-        if len(row) < 4:
-            continue
-        state_name = row[0].strip()
-        if not state_name or state_name == 'total':
-            continue
-        large = []
-        for i in range(3, min(len(row), 3 + len(org_names))):
-            try:
-                count = int(row[i].strip() or 0)
-            except ValueError:
-                count = 0
-            if count > 0 and (i - 3) < len(org_names):
-                large.append(org_names[i - 3])
-        by_state[state_name] = {'large': large, 'small': []}
+        # Row 2 (index 1): "State Name", "", "", then org names; rows 4+: state name col 0, counts col 3+
+        org_names = []
+        for line_no, row in enumerate(reader):
+            if line_no == 1:
+                org_names = [cell.strip() for i, cell in enumerate(row)
+                             if i >= 3 and cell and cell != 'State Name']
+                continue
+            if line_no < 3 or len(row) < 4:
+                continue
+            state_name = row[0].strip()
+            if not state_name or state_name == 'total':
+                continue
+            entry = by_state.setdefault(state_name, {'large': [], 'small': []})
+            seen = set(entry['large'])
+            for i in range(3, min(len(row), 3 + len(org_names))):
+                try:
+                    count = int(row[i].strip() or 0)
+                except ValueError:
+                    count = 0
+                name = org_names[i - 3]
+                if count > 0 and name not in seen:
+                    seen.add(name)
+                    entry['large'].append(name)
     return by_state
 
 
-def load_small_facilities(path, by_state):
-    """Add small facility names per state. Modifies by_state in place."""
+def build_zip_to_fips():
+    """
+    Return a callable zip5 -> 5-digit county FIPS (or None), built once from the
+    zipcodes table. Returns None when zipcodes/addfips are not installed.
+    """
+    try:
+        import zipcodes
+        import addfips
+    except ImportError:
+        print("  ⚠ zipcodes/addfips not installed; skipping per-county facility index", file=sys.stderr)
+        return None
+
+    af = addfips.AddFIPS()
+    zip_county = {z['zip_code']: (z.get('county'), z.get('state')) for z in zipcodes.list_all()}
+    fips_cache = {}
+
+    def lookup(zip5):
+        county_state = zip_county.get(zip5)
+        if not county_state or not county_state[0]:
+            return None
+        if county_state not in fips_cache:
+            county, state = county_state
+            # Full name first ("Baltimore County" vs "Baltimore city"), the bare name as a fallback
+            names = [county.strip()] + [county.strip()[:-len(sfx)].strip() for sfx in COUNTY_SUFFIXES
+                                        if county.strip().endswith(sfx)][:1]
+            fips_cache[county_state] = None
+            for name in names:
+                try:
+                    fips_cache[county_state] = af.get_county_fips(name, state=state)
+                except Exception:
+                    continue
+                if fips_cache[county_state]:
+                    break
+        return fips_cache[county_state]
+
+    return lookup
+
+
+def _row_zip(row, zip_col, address_col):
+    """Extract a 5-digit ZIP from the ZIP column, falling back to the end of the address."""
+    if zip_col:
+        raw = (row.get(zip_col) or '').strip()
+        m = ZIP_FIELD.match(raw)
+        if m:
+            return m.group(1).zfill(5)  # spreadsheets drop leading zeros (e.g. 2134 -> 02134)
+        digits = re.sub(r'\D', '', raw)
+        if 5 < len(digits) <= 9:
+            return digits.zfill(9)[:5]  # ZIP+4 without its dash
+    if address_col:
+        m = ZIP_IN_ADDRESS.search((row.get(address_col) or '').strip())
+        if m:
+            return m.group(1)
+    return None
+
+
+def load_small_facilities(path, by_state, by_county=None, max_small=None, max_county=None):
+    """
+    Add small facility names per state (and per county when by_county is given
+    and the CSV has ZIPs/addresses). Modifies by_state/by_county in place.
+    """
+    seen_state = {state: set(entry['small']) for state, entry in by_state.items()}
+    seen_county = {}
+    zip_to_fips = None
     with open(path, newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        zip_col = next((c for c in ZIP_COLUMNS if c in fields), None)
+        address_col = next((c for c in ADDRESS_COLUMNS if c in fields), None)
+        if by_county is not None and (zip_col or address_col):
+            zip_to_fips = build_zip_to_fips()
+
         for row in reader:
             name = (row.get('Name') or '').strip()
             abbr = (row.get('State') or '').strip().upper()
@@ -76,22 +159,61 @@ def load_small_facilities(path, by_state):
             state_name = STATE_ABBREV_TO_FULL[abbr]
             if state_name not in by_state:
                 by_state[state_name] = {'large': [], 'small': []}
-            if name and name not in by_state[state_name]['small']:
+                seen_state[state_name] = set()
+            seen = seen_state[state_name]
+            if name not in seen and (max_small is None or len(seen) < max_small):
+                seen.add(name)
                 by_state[state_name]['small'].append(name)
+
+            if zip_to_fips is None:
+                continue
+            zip5 = _row_zip(row, zip_col, address_col)
+            fips = zip_to_fips(zip5) if zip5 else None
+            if not fips:
+                continue
+            names = seen_county.setdefault(fips, set())
+            if name not in names and (max_county is None or len(names) < max_county):
+                names.add(name)
+                by_county.setdefault(fips, []).append(name)
     return by_state
 
 
 def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_root = os.path.dirname(script_dir)
+    default_out = os.path.join(repo_root, 'data', 'facility_by_state.js')
+    default_county_out = os.path.join(repo_root, 'data', 'facility_by_county.json')
+
     ap = argparse.ArgumentParser()
     ap.add_argument('--large', required=True, help='Path to large_facilities.csv')
     ap.add_argument('--small', required=True, help='Path to small_facilities.csv')
     ap.add_argument('--max-small', type=int, default=6, help='Max small facility names per state')
+    ap.add_argument('--max-county', type=int, default=6, help='Max small facility names per county')
+    ap.add_argument('--out', default=default_out, help='Output JS path ("-" for stdout)')
+    ap.add_argument('--county-out', default=default_county_out, help='Output JSON path for the county index')
     args = ap.parse_args()
+
     by_state = load_large_facilities(args.large)
-    load_small_facilities(args.small, by_state)
-    for state in by_state:
-        by_state[state]['small'] = by_state[state]['small'][: args.max_small]
-    print('const FACILITY_BY_STATE = ' + json.dumps(by_state, indent=2) + ';')
+    by_county = {}
+    load_small_facilities(args.small, by_state, by_county, max_small=args.max_small, max_county=args.max_county)
+
+    js_content = (
+        "// Generated by scripts/build_facility_data.py — do not edit by hand.\n"
+        "const FACILITY_BY_STATE = " + json.dumps(by_state) + ";\n"
+    )
+    if by_county:
+        os.makedirs(os.path.dirname(os.path.abspath(args.county_out)), exist_ok=True)
+        with open(args.county_out, 'w', encoding='utf-8') as f:
+            json.dump(by_county, f, sort_keys=True, separators=(',', ':'))
+
+    if args.out == '-':
+        sys.stdout.write(js_content)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        f.write(js_content)
+    print(f"Built {len(by_state)} states, {len(by_county)} counties")
+    print(f"Wrote {args.out}" + (f" and {args.county_out}" if by_county else ""))
 
 
 if __name__ == '__main__':
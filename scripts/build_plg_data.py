@@ -5,18 +5,59 @@ Use this CSV as the source of truth; index.html loads plg_data.js for ALL_DATA a
 
 Usage:
     python scripts/build_plg_data.py [path/to/raw_data.csv]
+    python scripts/build_plg_data.py --events path/to/events.csv [--sketch-dir data/sketches] [--reset]
     Default CSV path: ../data/PLG_User_Count_Insights.csv (or same CSV with EHR + State/County FIPS)
 
 Output: data/plg_data.js (ALL_DATA, SUMMARIES with optional EHR and top EHRs per state).
+When the county GeoJSON is cached (generate.py downloads it) and scipy is installed,
+each county record also carries Getis-Ord Gi* z-scores (gu, ge) and local Moran's I
+(mu, me) for clinicians / visits. BREAKS holds quantile and Jenks class breaks per
+metric for the nation and every state, so classed maps need no client-side computation.
+
+With --events the CSV holds one row per event with a user id column ("User ID",
+"user_id", "Clinician ID", ...). The rows are streamed into HyperLogLog sketches
+per county and city (plgmap/events.py), so a clinician active in several cities
+or counties is counted once at every level. State and national totals are sketch
+unions, and NATIONAL carries the national count. Top EHRs per county and state
+are tracked with bounded Space-Saving summaries (plgmap/topk.py). SUMMARIES then
+also carries topEhrStats ([{ehr, events, err}]), where events - err is a
+guaranteed lower bound. Sketches and summaries are saved to --sketch-dir and
+merged with each new file.
+
+Derived metrics (plgmap/metrics.py) are computed per county and per state in
+one vectorized pass each: visits per clinician and per city always, per-capita
+rates when a county population table is given (--population, default
+data/county_population.csv when present), and period-over-period change when
+--previous names the same kind of CSV for an earlier period. Records carry
+them under their short keys (epc, cpk, eg, ...), SUMMARIES[state].metrics per
+state, and METRICS lists the ones present with labels and rounding.
+
+INITIAL_FIGURE is the Plotly figure of the page's default view (all states,
+clinicians and visits side by side, log scale), traces and layout exactly as
+index.html's render() would build them, minus the GeoJSON, the map height and
+the per-county locations and hover text, which the page derives from ALL_DATA.
+The page draws it as soon as the county GeoJSON arrives and builds its own
+per-county structures (sidebar, EHR list) afterwards.
+
+STATE_OUTLINES holds simplified state polygons dissolved from the cached county
+GeoJSON (plgmap/outlines.py), keyed by state name like SUMMARIES. Until the
+county GeoJSON has downloaded, the page shows the SUMMARIES totals on them.
 """
 
+import argparse
+import hashlib
 import json
+import math
 import os
 import sys
-from collections import Counter
 
 import pandas as pd
 
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from plgmap import metrics, outlines  # noqa: E402
+
 # Reuse state mapping
 STATE_ABBREVS = {
     'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
@@ -44,8 +85,65 @@ def normalize_ehr(s):
     return t
 
 
-def load_and_build(csv_path):
-    df = pd.read_csv(csv_path)
+def add_hotspots(county_agg, geojson_path):
+    """
+    Join Getis-Ord Gi* z-scores and local Moran's I (uniques and events) onto
+    county_agg when the cached county GeoJSON and scipy are available.
+    """
+    try:
+        from plgmap import geostore, spatial
+    except ImportError as e:
+        print(f"  ⚠ Skipping hot-spot statistics ({e})")
+        return county_agg
+    store = geostore.open_or_compile(geojson_path)
+    if store is None:
+        print(f"  ⚠ Skipping hot-spot statistics: {geojson_path} not found (run generate.py once to cache it)")
+        return county_agg
+    by_fips = county_agg.set_index('fips')
+    stats = spatial.hotspot_frame(store, {'uniques': by_fips['uniques'], 'events': by_fips['events']})
+    return county_agg.join(stats, on='fips')
+
+
+def build_state_outlines(geojson_path, records, tolerance):
+    """STATE_OUTLINES for the states in records (ids are state names), or None without the county GeoJSON."""
+    from plgmap import geostore
+
+    store = geostore.open_or_compile(geojson_path) if geojson_path else None
+    if store is None:
+        print(f"  ⚠ Skipping state outlines: {geojson_path} not found (run generate.py once to cache it)")
+        return None
+    names = {r['f'][:2]: r['s'] for r in records}
+    fc = outlines.state_outlines(store, tolerance=tolerance)
+    fc['features'] = [{**f, 'id': names[f['id']]} for f in fc['features'] if f['id'] in names]
+    return fc
+
+
+def build_breaks(county_agg):
+    """
+    Quantile and Jenks class breaks per metric for the nation ('_nation') and each state:
+    {scope: {'u' | 'e': {'quantile': edges, 'jenks': edges}}}.
+    """
+    from plgmap import classify
+
+    def compact(breaks):
+        return {m: [int(v) if float(v).is_integer() else v for v in edges] for m, edges in breaks.items()}
+
+    scopes = [('_nation', county_agg)] + list(county_agg.groupby('Region'))
+    return {
+        scope: {
+            'u': compact(classify.compute_breaks(grp['uniques'])),
+            'e': compact(classify.compute_breaks(grp['events'])),
+        }
+        for scope, grp in scopes
+    }
+
+
+def prepare_rows(df):
+    """
+    Clean a raw geocoded frame: drop unknown regions, build 5-digit FIPS, parse
+    uniques/events (events default to 1 per row when the column is absent, as in
+    event-level input) and normalize EHR and county name.
+    """
     df.columns = df.columns.str.strip()
     df = df[~df['Region'].isin(['undefined', 'Region'])].copy()
     df['state_abbr'] = df['Region'].map(STATE_ABBREVS)
@@ -59,8 +157,12 @@ def load_and_build(csv_path):
     county_str = df['County FIPS'].astype(int).astype(str).str[-3:].str.zfill(3)
     df['fips'] = state_str + county_str
 
-    df['uniques'] = pd.to_numeric(df['A. Uniques of First Scribe Created'], errors='coerce').fillna(0).astype(int)
-    df['events'] = pd.to_numeric(df['B. Total Events of Scribe Created'], errors='coerce').fillna(0).astype(int)
+    for col, src, default in (('uniques', 'A. Uniques of First Scribe Created', 0),
+                              ('events', 'B. Total Events of Scribe Created', 1)):
+        if src in df.columns:
+            df[col] = pd.to_numeric(df[src], errors='coerce').fillna(0).astype(int)
+        else:
+            df[col] = default
 
     # EHR column: accept "c. EHR" or any column containing "EHR"
     ehr_col = None
@@ -75,14 +177,23 @@ def load_and_build(csv_path):
 
     county_name_col = 'Geocodio County' if 'Geocodio County' in df.columns else None
     df['county_name'] = df[county_name_col].fillna('').astype(str) if county_name_col else ''
+    return df
 
-    # County-level aggregation: sum uniques/events, count cities, collect EHR (top by events)
-    def top_ehrs(grp, top_n=5):
-        if grp['ehr_raw'].isna().all() or grp['ehr_raw'].eq('').all():
-            return []
-        by_ehr = grp.groupby(grp['ehr_raw'].fillna('')).agg(events=('events', 'sum')).sort_values('events', ascending=False)
-        return by_ehr.index[by_ehr.index != ''].tolist()[:top_n]
 
+def top_ehrs(grp, top_n=5):
+    """EHR names in grp ranked by total events (blank EHRs ignored)."""
+    if grp['ehr_raw'].isna().all() or grp['ehr_raw'].eq('').all():
+        return []
+    by_ehr = grp.groupby(grp['ehr_raw'].fillna('')).agg(events=('events', 'sum')).sort_values('events', ascending=False)
+    return by_ehr.index[by_ehr.index != ''].tolist()[:top_n]
+
+
+def aggregate_rows(df):
+    """
+    Aggregate prepared city rows (uniques summed city → county → state).
+    Returns county_agg, city_agg and {state: top EHRs}.
+    """
+    # County-level aggregation: sum uniques/events, count cities, collect EHR (top by events)
     county_agg = df.groupby(['fips', 'county_name', 'Region', 'state_abbr']).agg(
         uniques=('uniques', 'sum'),
         events=('events', 'sum'),
@@ -99,6 +210,72 @@ def load_and_build(csv_path):
     ehr_dict = ehr_by_county.to_dict()
     county_agg['ehr_list'] = county_agg['fips'].map(lambda f: ehr_dict.get(f, []))
 
+    # City-level totals for SUMMARIES
+    city_agg = (
+        df.groupby(['Region', 'City'])
+        .agg(
+            clinicians=('uniques', 'sum'),
+            visits=('events', 'sum'),
+        )
+        .reset_index()
+    )
+    state_ehrs = {}
+    for state, state_df in df.groupby('Region'):
+        if state_df['ehr_raw'].notna().any():
+            state_ehrs[state] = top_ehrs(state_df, top_n=5)
+    return county_agg, city_agg, state_ehrs
+
+
+def state_frame(city_agg, state_clinicians=None):
+    """State-level base aggregates (Region, uniques, events, num_cities) from city totals."""
+    states = city_agg.groupby('Region').agg(
+        uniques=('clinicians', 'sum'),
+        events=('visits', 'sum'),
+        num_cities=('City', 'count'),
+    ).reset_index()
+    if state_clinicians:
+        states['uniques'] = states['Region'].map(state_clinicians).fillna(states['uniques'])
+    return states
+
+
+def metric_tables(county_agg, population=None, previous=None):
+    """Input tables for metrics.derive at county (by fips) and state (by Region) level."""
+    county_tables, state_tables = [], []
+    if population is not None:
+        county_tables.append(population)
+        state_tables.append(metrics.state_population(population, county_agg))
+    if previous is not None:
+        cols = ['uniques', 'events']
+        county_tables.append(previous.groupby('fips')[cols].sum().add_suffix('_prev'))
+        state_tables.append(previous.groupby('Region')[cols].sum().add_suffix('_prev'))
+    return county_tables, state_tables
+
+
+def metric_values(row, derived):
+    """{short key: value} of the derived metrics in row that have data."""
+    values = {m.key: metrics.value(m, row[m.name]) for m in derived}
+    return {k: v for k, v in values.items() if v is not None}
+
+
+def build_outputs(county_agg, city_agg, state_ehrs, geojson_path=None, state_clinicians=None,
+                  population=None, previous=None):
+    """
+    ALL_DATA records, SUMMARIES and BREAKS from aggregated frames. state_clinicians
+    ({state: distinct clinicians}) overrides the sum of city clinicians when the
+    input carries user-level events. state_ehrs maps state -> EHR names, or (event
+    input) -> [{'ehr', 'events', 'err'}] Space-Saving stats, which also go to topEhrStats.
+    population (county population table) and previous (county aggregates of an
+    earlier period) feed the derived metrics.
+    """
+    if geojson_path:
+        county_agg = add_hotspots(county_agg, geojson_path)
+    has_hotspots = 'gi_uniques' in county_agg.columns
+    county_tables, state_tables = metric_tables(county_agg, population, previous)
+    county_agg = metrics.derive(county_agg, county_tables)
+    states = metrics.derive(state_frame(city_agg, state_clinicians), state_tables, key='Region')
+    derived = metrics.derived_columns(county_agg)
+    state_metrics = {r['Region']: metric_values(r, derived) for _, r in states.iterrows()}
+
     # ALL_DATA records
     records = []
     for _, r in county_agg.iterrows():
@@ -121,21 +298,25 @@ def load_and_build(csv_path):
         }
         if ehr_str:
             rec['ehr'] = ehr_str
+            if r.get('ehr_err', 0) > 0:
+                # Listed EHR ranking is approximate: counts may be overestimated by up to ehrErr visits
+                rec['ehrErr'] = int(r['ehr_err'])
+        if has_hotspots and pd.notna(r['gi_uniques']):
+            # Gi* z-scores (gu/ge) and local Moran's I (mu/me) for uniques/events
+            rec['gu'] = round(float(r['gi_uniques']), 2)
+            rec['ge'] = round(float(r['gi_events']), 2)
+            rec['mu'] = round(float(r['moran_uniques']), 2)
+            rec['me'] = round(float(r['moran_events']), 2)
+        rec.update(metric_values(r, derived))
         records.append(rec)
 
-    # SUMMARIES: state-level from city-level (use raw df for cities)
-    city_agg = (
-        df.groupby(['Region', 'City'])
-        .agg(
-            clinicians=('uniques', 'sum'),
-            visits=('events', 'sum'),
-        )
-        .reset_index()
-    )
+    # SUMMARIES: state-level from city-level
     summaries = {}
     for state in city_agg['Region'].unique():
         st = city_agg[city_agg['Region'] == state]
         clinicians = int(st['clinicians'].sum())
+        if state_clinicians and state in state_clinicians:
+            clinicians = int(state_clinicians[state])
         visits = int(st['visits'].sum())
         total_cities = len(st)
         active_cities = int((st['clinicians'] > 0).sum())
@@ -148,16 +329,6 @@ def load_and_build(csv_path):
             row['visits'] = int(row['visits'])
             row['clinicians'] = int(row['clinicians'])
 
-        state_df = df[df['Region'] == state]
-        top_ehrs_state = []
-        if 'ehr_raw' in state_df.columns and state_df['ehr_raw'].notna().any():
-            by_ehr = (
-                state_df.groupby(state_df['ehr_raw'].fillna(''))
-                .agg(events=('events', 'sum'))
-                .sort_values('events', ascending=False)
-            )
-            top_ehrs_state = [x for x in by_ehr.index if x and str(x).strip()][:5]
-
         summaries[state] = {
             'clinicians': clinicians,
             'visits': visits,
@@ -165,36 +336,212 @@ def load_and_build(csv_path):
             'activeCities': active_cities,
             'topCities': top_cities,
         }
+        if state_metrics.get(state):
+            summaries[state]['metrics'] = state_metrics[state]
+        top_ehrs_state = state_ehrs.get(state) or []
+        if top_ehrs_state and isinstance(top_ehrs_state[0], dict):
+            summaries[state]['topEhrStats'] = top_ehrs_state
+            top_ehrs_state = [s['ehr'] for s in top_ehrs_state]
         if top_ehrs_state:
             summaries[state]['topEhrs'] = top_ehrs_state
 
-    return records, summaries
+    return records, summaries, build_breaks(county_agg)
+
+
+# index.html render() constants for the default view (metric 'both', scale 'log', colorScheme 'greenHigh')
+INITIAL_VIEW = {'metric': 'both', 'scale': 'log', 'colorScheme': 'greenHigh'}
+HEAT = [[0, '#db7865'], [0.25, '#f8ae70'], [0.5, '#ffd666'], [0.75, '#abc77e'], [1, '#4ea471']]
+LOG_TICKS = [0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000]
+FONT = 'Outfit'
+Z_DIGITS = 5
+
+
+def log_colorbar(label, values, x):
+    """index.html colorbar() for the log scale: ticks at round counts up to 1.2 × the maximum."""
+    top = max(values + [1])
+    ticks = [v for v in LOG_TICKS if v <= top * 1.2]
+    return {
+        'title': {'text': label, 'font': {'size': 11, 'family': FONT, 'color': '#6b6560'}},
+        'len': 0.5, 'thickness': 12, 'x': x, 'outlinewidth': 0, 'borderwidth': 0,
+        'tickfont': {'size': 10, 'family': FONT, 'color': '#9b9590'},
+        'tickvals': [math.log1p(v) for v in ticks],
+        'ticktext': [f'{v // 1000}k' if v >= 1000 else f'{v:,}' for v in ticks],
+    }
+
+
+def initial_figure(records):
+    """
+    INITIAL_FIGURE: the default national view as {view, data, layout}. Traces hold
+    the z arrays in ALL_DATA order; the page attaches locations and hover text
+    (both derived from ALL_DATA), the GeoJSON and the map height before Plotly.newPlot.
+    """
+    hl = {'bgcolor': '#ffffff', 'bordercolor': '#e8e4df', 'font': {'size': 12, 'family': FONT, 'color': '#2c2825'}}
+    traces = []
+    for geo, key, label, x in (('geo', 'u', 'Clinicians', 0.44), ('geo2', 'e', 'Patient Visits', 1.01)):
+        values = [r[key] for r in records]
+        traces.append({
+            'type': 'choropleth', 'z': [round(math.log1p(v), Z_DIGITS) for v in values], 'hoverinfo': 'text',
+            'colorscale': HEAT, 'colorbar': log_colorbar(label, values, x),
+            'marker': {'line': {'width': 0.25, 'color': '#e8e4df'}}, 'hoverlabel': hl, 'geo': geo,
+        })
+    geo_base = {
+        'bgcolor': 'rgba(0,0,0,0)', 'lakecolor': '#e8edf2', 'landcolor': '#f0ece7',
+        'showlakes': True, 'showland': True, 'showcoastlines': True, 'showcountries': True,
+        'showocean': True, 'showrivers': True, 'subunitcolor': '#d8d4cf', 'subunitwidth': 0.5,
+        'showsubunits': True, 'countrycolor': '#d8d4cf', 'showframe': False, 'coastlinecolor': '#d8d4cf',
+        'scope': 'usa', 'projection': {'type': 'albers usa'},
+    }
+    title_font = {'size': 13, 'family': FONT, 'color': '#6b6560'}
+    layout = {
+        'geo': {**geo_base, 'domain': {'x': [0.02, 0.47], 'y': [0.02, 0.98]}},
+        'geo2': {**geo_base, 'domain': {'x': [0.53, 0.98], 'y': [0.02, 0.98]}},
+        'annotations': [
+            {'text': f'<b>{text}</b>', 'x': x, 'y': 1.02, 'xref': 'paper', 'yref': 'paper', 'showarrow': False,
+             'font': title_font}
+            for text, x in (('Clinicians', 0.24), ('Patient Visits', 0.76))
+        ],
+        'paper_bgcolor': '#faf9f7', 'plot_bgcolor': '#faf9f7',
+        'font': {'color': '#2c2825', 'family': FONT},
+        'margin': {'t': 28, 'b': 72, 'l': 72, 'r': 8},
+    }
+    return {
+        'view': INITIAL_VIEW,
+        'data': traces,
+        'layout': layout,
+    }
+
+
+def load_previous(csv_path):
+    """County aggregates (fips, Region, uniques, events) of an earlier period's CSV, or None."""
+    if not csv_path:
+        return None
+    county_agg, _, _ = aggregate_rows(prepare_rows(pd.read_csv(csv_path)))
+    print(f"  Previous period: {len(county_agg)} counties from {csv_path}")
+    return county_agg
+
+
+def load_and_build(csv_path, geojson_path=None, population=None, previous=None):
+    df = prepare_rows(pd.read_csv(csv_path))
+    county_agg, city_agg, state_ehrs = aggregate_rows(df)
+    return build_outputs(county_agg, city_agg, state_ehrs, geojson_path, population=population, previous=previous)
+
+
+def load_and_build_events(csv_path, sketch_dir, geojson_path=None, user_col=None,
+                          chunksize=200_000, reset=False, population=None, previous=None):
+    """
+    Stream user-level event rows (one row per event, with a user id column) in
+    chunks into HyperLogLog sketches per county and city. Sketches and tallies
+    persisted in sketch_dir are loaded first and saved back, so each run folds
+    csv_path into the running totals. A file whose contents were already folded
+    is skipped. Returns records, summaries, breaks and the national
+    distinct-clinician count.
+    """
+    from plgmap.events import EventAggregator, file_digest
+
+    agg = EventAggregator() if reset else EventAggregator.load(sketch_dir)
+    digest = file_digest(csv_path)
+    if digest in agg.sources:
+        print(f"  ⚠ {csv_path} was already folded into {sketch_dir} (as {agg.sources[digest]['path']}); "
+              f"skipping it (pass --reset to rebuild from scratch)")
+    else:
+        fold_events(agg, csv_path, digest, sketch_dir, user_col, chunksize)
+
+    records, summaries, breaks = build_outputs(
+        agg.county_frame(), agg.city_frame(), agg.state_ehrs(),
+        geojson_path, state_clinicians=agg.state_clinicians(), population=population, previous=previous,
+    )
+    return records, summaries, breaks, agg.national_clinicians()
+
+
+def fold_events(agg, csv_path, digest, sketch_dir, user_col=None, chunksize=200_000):
+    """Stream csv_path into agg, record it under digest and save the state to sketch_dir."""
+    from plgmap.events import find_user_column
+
+    if agg.county_info:
+        print(f"  Merging into {len(agg.county_info)} counties already sketched in {sketch_dir}")
+    n_rows = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        chunk.columns = chunk.columns.str.strip()
+        col = user_col or find_user_column(chunk.columns)
+        if col is None or col not in chunk.columns:
+            raise ValueError(f"No user id column in {csv_path} (pass --user-col)")
+        rows = prepare_rows(chunk)
+        rows = rows[rows[col].notna()]
+        agg.add_chunk(rows, col)
+        n_rows += len(rows)
+    agg.sources[digest] = {'path': os.path.abspath(csv_path), 'size': os.path.getsize(csv_path)}
+    agg.save(sketch_dir)
+    print(f"  Sketched {n_rows:,} events; state saved to {sketch_dir}")
 
 
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     repo_root = os.path.dirname(script_dir)
     default_csv = os.path.join(repo_root, 'data', 'PLG_User_Count_Insights.csv')
-    csv_path = sys.argv[1] if len(sys.argv) > 1 else default_csv
+    parser = argparse.ArgumentParser(description='Build data/plg_data.js from a geocoded PLG CSV.')
+    parser.add_argument('csv', nargs='?', default=default_csv, help='Geocoded CSV (default: data/PLG_User_Count_Insights.csv)')
+    parser.add_argument('--events', action='store_true',
+                        help='CSV holds user-level event rows; count distinct clinicians with HyperLogLog sketches')
+    parser.add_argument('--user-col', default=None, help='User id column for --events (default: auto-detect, e.g. "User ID")')
+    parser.add_argument('--sketch-dir', default=os.path.join(repo_root, 'data', 'sketches'),
+                        help='Where --events persists its sketches (default: data/sketches)')
+    parser.add_argument('--reset', action='store_true', help='With --events, ignore previously saved sketches')
+    parser.add_argument('--population', default=metrics.POPULATION_PATH,
+                        help='County population CSV (fips, population) for per-capita metrics '
+                             '(default: data/county_population.csv, if present)')
+    parser.add_argument('--previous', default=None,
+                        help='Geocoded CSV of an earlier period, for period-over-period change metrics')
+    parser.add_argument('--outline-tolerance', type=float, default=outlines.DEFAULT_TOLERANCE,
+                        help=f'Simplification tolerance of STATE_OUTLINES in degrees '
+                             f'(default: {outlines.DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+    csv_path = args.csv
     if not os.path.isfile(csv_path):
         print(f"Error: CSV not found: {csv_path}")
         sys.exit(1)
 
     out_path = os.path.join(repo_root, 'data', 'plg_data.js')
-    records, summaries = load_and_build(csv_path)
+    geojson_path = os.path.join(repo_root, 'geojson-counties-fips.json')
+    national = None
+    population = metrics.load_population(args.population)
+    previous = load_previous(args.previous)
+    if args.events:
+        records, summaries, breaks, national_clinicians = load_and_build_events(
+            csv_path, args.sketch_dir, geojson_path, user_col=args.user_col, reset=args.reset,
+            population=population, previous=previous,
+        )
+        national = {'clinicians': national_clinicians}
+    else:
+        records, summaries, breaks = load_and_build(csv_path, geojson_path, population, previous)
     print(f"Built {len(records)} counties, {len(summaries)} states from {csv_path}")
+    # Derived metrics present in this build, in registry order
+    metric_meta = [{'k': m.key, 'label': m.label, 'digits': m.digits}
+                   for m in metrics.REGISTRY if any(m.key in r for r in records)]
 
     states_list = sorted(summaries.keys())
-    js_content = (
-        "// Generated by scripts/build_plg_data.py — do not edit by hand.\n"
+    payload = (
         "window.ALL_DATA = " + json.dumps(records) + ";\n"
         "window.STATES = " + json.dumps(states_list) + ";\n"
         "window.SUMMARIES = " + json.dumps(summaries) + ";\n"
+        "window.BREAKS = " + json.dumps(breaks) + ";\n"
+        "window.METRICS = " + json.dumps(metric_meta) + ";\n"
+        "window.INITIAL_FIGURE = " + json.dumps(initial_figure(records)) + ";\n"
+    )
+    if national:
+        payload += "window.NATIONAL = " + json.dumps(national) + ";\n"
+    state_outlines = build_state_outlines(geojson_path, records, args.outline_tolerance)
+    if state_outlines:
+        payload += "window.STATE_OUTLINES = " + json.dumps(state_outlines, separators=(',', ':')) + ";\n"
+    # Content hash of the payload: telemetry reports group load/render timings by it
+    version = hashlib.sha256(payload.encode()).hexdigest()[:10]
+    js_content = (
+        "// Generated by scripts/build_plg_data.py — do not edit by hand.\n"
+        "window.PLG_DATA_VERSION = " + json.dumps(version) + ";\n" + payload
     )
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, 'w') as f:
         f.write(js_content)
-    print(f"Wrote {out_path}")
+    print(f"Wrote {out_path} (version {version})")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Serve the map with live updates from an append-only event file.
+
+Tails a CSV or JSONL file of geocoded rows (same columns as a geocoded PLG CSV:
+Region, City, State FIPS, County FIPS, A. Uniques…, B. Total Events…) and folds
+new rows into per-county increments. Only the counties that changed are pushed
+to open pages over Server-Sent Events. The page and its data files (STATIC_FILES)
+are served from the repo directory; everything else, raw CSVs included, is 404.
+Open the printed URL (index.html?live). The page adds each county's increments
+to its ALL_DATA values and patches the map's z-values in place. The server
+listens on 127.0.0.1 unless --host says otherwise.
+
+Usage:
+    python scripts/live_server.py path/to/events.csv [--host 127.0.0.1] [--port 8000] [--interval 1.0]
+                                                     [--from-start]
+
+Event stream (GET /live/events):
+    event: delta
+    data: {"version": 7, "counties": [{"f": "48201", "du": 3, "de": 41, "c": "Harris County", "s": "Texas", "n": 2}]}
+du/de are totals since the server started (not per message), so messages are
+idempotent and a reconnecting page converges.
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import sys
+import threading
+import time
+from functools import partial
+from fnmatch import fnmatchcase
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from plgmap.live import FileTailer, LiveAggregator  # noqa: E402
+
+HEARTBEAT_SECONDS = 15
+# What index.html loads (plain or content-hashed data files, tiles, service worker); nothing else is served
+STATIC_FILES = (
+    '/', '/index.html', '/sw.js',
+    '/data/plg_data*.js', '/data/facility_by_state*.js', '/data/facility_by_county*.json', '/data/manifest.json',
+    '/data/hexbins*.json', '/data/zip_tiles/*.json', '/data/tiles/*.json', '/data/tiles/*.png',
+)
+
+
+def is_static(path):
+    """True if the URL path (query dropped, normalized) is one of the page's assets."""
+    path = posixpath.normpath(unquote(urlsplit(path).path))
+    return any(fnmatchcase(path, pattern) for pattern in STATIC_FILES)
+
+
+class LiveHandler(SimpleHTTPRequestHandler):
+    aggregator = None
+
+    def log_message(self, fmt, *args):
+        if not self.path.startswith('/live/'):
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/live/events':
+            return self.stream_events()
+        if not is_static(self.path):
+            return self.send_error(404)
+        return super().do_GET()
+
+    def do_HEAD(self):
+        if not is_static(self.path):
+            return self.send_error(404)
+        return super().do_HEAD()
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        seen = -1   # first message: every county changed so far
+        try:
+            while True:
+                version, deltas = self.aggregator.changes_since(seen)
+                if deltas:
+                    payload = json.dumps({'version': version, 'counties': deltas}, separators=(',', ':'))
+                    self.wfile.write(f"event: delta\ndata: {payload}\n\n".encode())
+                else:
+                    self.wfile.write(b": heartbeat\n\n")
+                self.wfile.flush()
+                seen = version
+                self.aggregator.wait(seen, HEARTBEAT_SECONDS)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def tail_forever(tailer, aggregator, interval):
+    while True:
+        try:
+            changed = aggregator.fold(tailer.poll())
+            if changed:
+                print(f"  +{len(changed)} counties changed (version {aggregator.version})")
+        except OSError as e:
+            print(f"  ⚠ Could not read {tailer.path}: {e}")
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve index.html with live county updates over Server-Sent Events.')
+    parser.add_argument('events', help='Append-only CSV (with header) or JSONL file of geocoded rows')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Interface to listen on (default: 127.0.0.1; 0.0.0.0 for every interface)')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls of the event file')
+    parser.add_argument('--from-start', action='store_true',
+                        help='Fold rows already in the file (default: only rows appended after startup)')
+    args = parser.parse_args()
+    if not os.path.isfile(args.events):
+        print(f"Error: event file not found: {args.events}")
+        sys.exit(1)
+
+    aggregator = LiveAggregator()
+    tailer = FileTailer(args.events, from_start=args.from_start)
+    threading.Thread(target=tail_forever, args=(tailer, aggregator, args.interval), daemon=True).start()
+
+    LiveHandler.aggregator = aggregator
+    server = ThreadingHTTPServer((args.host, args.port), partial(LiveHandler, directory=REPO_ROOT))
+    server.daemon_threads = True
+    print(f"Tailing {args.events}; open http://{args.host}:{args.port}/index.html?live")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
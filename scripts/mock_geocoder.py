@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the batch geocoding API used by plgmap/geoclient.py.
+
+Answers POST /v1.7/geocode (a JSON list of "City, ST" queries) in the
+Geocodio response shape. City → county comes from the zipcodes package (the
+county with most ZIPs for that city name) and county → FIPS from addfips.
+Coordinates are the mean of the city's ZIP centroids. Nothing leaves the
+machine, so generate.py --geocode can run end to end in CI. Failure modes can
+be injected to exercise the client's retries and backoff.
+
+Usage:
+    python scripts/mock_geocoder.py [--port 8765] [--latency 0.2] [--fail-rate 0.1]
+                                    [--max-inflight 2] [--api-key KEY]
+    python generate.py --geocode http://localhost:8765/v1.7
+
+--fail-rate answers that fraction of requests with 503. --max-inflight answers
+429 (Retry-After: 1) while more requests than that are in progress. --api-key
+rejects requests without that api_key with 403.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from plgmap.fuzzy import normalize  # noqa: E402
+
+CENSUS_YEAR = '2024'
+MAX_BATCH = 10_000
+
+
+def build_index():
+    """{(normalized city, state abbr): {'county', 'fips', 'lat', 'lng'}} from the zipcodes package."""
+    import addfips
+    import zipcodes
+
+    counties = defaultdict(Counter)
+    points = defaultdict(list)
+    for z in zipcodes.list_all():
+        if not z.get('county'):
+            continue
+        for name in [z['city']] + list(z.get('acceptable_cities') or []):
+            key = (normalize(name), z['state'])
+            counties[key][z['county']] += 1
+            points[key].append((float(z['lat']), float(z['long'])))
+    af = addfips.AddFIPS()
+    index = {}
+    for key, counter in counties.items():
+        county = counter.most_common(1)[0][0]
+        fips = af.get_county_fips(county, state=key[1])
+        if fips:
+            lats, lngs = zip(*points[key])
+            index[key] = {'county': county, 'fips': fips,
+                          'lat': round(sum(lats) / len(lats), 6), 'lng': round(sum(lngs) / len(lngs), 6)}
+    return index
+
+
+def answer(index, query):
+    """One batch result item for a "City, ST" query."""
+    city, _, state = str(query).rpartition(',')
+    hit = index.get((normalize(city), state.strip().upper()))
+    if not hit:
+        return {'query': query, 'response': {'input': {}, 'results': []}}
+    return {'query': query, 'response': {'results': [{
+        'formatted_address': f"{city.strip()}, {state.strip()}",
+        'location': {'lat': hit['lat'], 'lng': hit['lng']},
+        'accuracy': 1, 'accuracy_type': 'place',
+        'address_components': {'city': city.strip(), 'county': hit['county'], 'state': state.strip()},
+        'fields': {'census': {CENSUS_YEAR: {'census_year': int(CENSUS_YEAR), 'state_fips': hit['fips'][:2],
+                                            'county_fips': hit['fips']}}},
+    }]}}
+
+
+class GeocodeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, as the client pools connections
+    index = {}
+    options = None
+    inflight = 0
+    lock = threading.Lock()
+    counts = Counter()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.counts[status] += 1
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        if not url.path.endswith('/geocode'):
+            return self.reply(404, {'error': 'Not found'})
+        opts = self.options
+        if opts.api_key and parse_qs(url.query).get('api_key', [None])[0] != opts.api_key:
+            return self.reply(403, {'error': 'Invalid API key'})
+        with self.lock:
+            GeocodeHandler.inflight += 1
+            busy = GeocodeHandler.inflight > opts.max_inflight if opts.max_inflight else False
+        try:
+            if busy:
+                return self.reply(429, {'error': 'Too many concurrent requests'}, {'Retry-After': '1'})
+            if random.random() < opts.fail_rate:
+                return self.reply(503, {'error': 'Injected failure'})
+            try:
+                queries = json.loads(raw)
+            except ValueError:
+                return self.reply(422, {'error': 'Body must be a JSON list of addresses'})
+            if not isinstance(queries, list) or len(queries) > MAX_BATCH:
+                return self.reply(422, {'error': f'Body must be a JSON list of at most {MAX_BATCH} addresses'})
+            time.sleep(opts.latency)
+            self.reply(200, {'results': [answer(self.index, q) for q in queries]})
+        finally:
+            with self.lock:
+                GeocodeHandler.inflight -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the batch geocoding API.')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (0: any free port)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every successful batch')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--max-inflight', type=int, default=0,
+                        help='Answer 429 while more requests than this are in progress (0: no limit)')
+    parser.add_argument('--api-key', default=None, help='Require this api_key query parameter')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for injected failures')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print("Indexing ZIP table cities...", flush=True)
+    GeocodeHandler.index = build_index()
+    GeocodeHandler.options = args
+    server = ThreadingHTTPServer(('', args.port), GeocodeHandler)
+    server.daemon_threads = True
+    port = server.server_address[1]   # the bound port when --port 0 picks one
+    print(f"Mock geocoder: {len(GeocodeHandler.index):,} places; "
+          f"python generate.py --geocode http://localhost:{port}/v1.7", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Responses by status: {dict(GeocodeHandler.counts)}")
+
+
+if __name__ == '__main__':
+    main()
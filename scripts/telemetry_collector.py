@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Collect index.html load/render timings and summarize them as percentiles.
+
+index.html measures its load phases with performance marks: the plg_data.js
+eval, the GeoJSON fetch, and filteredGeojson, Plotly.react and updateSidebar
+in each render. When TELEMETRY_URL is set (or the page is opened with
+?telemetry=<url>), it sends one beacon per page view and one per later batch.
+A beacon looks like:
+    {"v": "<PLG_DATA_VERSION>", "sid": "...", "phases": [{"p": "react", "ms": 412.3, "s": "all"}, ...]}
+This server appends every phase to a JSONL log and reports p50/p90/p99 per
+phase, state and payload version. Comparing versions shows whether a payload
+or geometry change actually helped. Standard library only.
+
+Usage:
+    python scripts/telemetry_collector.py [--host 127.0.0.1] [--port 8090] [--log telemetry/phases.jsonl]
+    python scripts/telemetry_collector.py --report [--log telemetry/phases.jsonl] [--by-state]
+
+Endpoints:
+    POST /collect   beacon body (text/plain JSON, so browsers send it without a CORS preflight)
+    GET  /summary   the report as JSON
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOG = os.path.join(REPO_ROOT, 'telemetry', 'phases.jsonl')
+PERCENTILES = (50, 90, 99)
+MAX_BODY = 64 * 1024
+ALL_STATES = '*'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-pct * len(sorted_values) // 100))   # ceil(pct/100 · n)
+    return sorted_values[int(rank) - 1]
+
+
+def parse_beacon(body, received=None):
+    """Flatten one beacon into phase rows; malformed phases are dropped."""
+    msg = json.loads(body)
+    version = str(msg.get('v') or 'unknown')
+    session = str(msg.get('sid') or '')
+    received = received if received is not None else time.time()
+    rows = []
+    for ph in msg.get('phases') or []:
+        try:
+            ms = float(ph['ms'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not 0 <= ms < 600_000:
+            continue
+        rows.append({'t': round(received, 3), 'v': version, 'sid': session,
+                     'p': str(ph.get('p') or ''), 's': str(ph.get('s') or 'all'), 'ms': round(ms, 2)})
+    return rows
+
+
+def read_log(path):
+    rows = []
+    if not os.path.isfile(path):
+        return rows
+    with open(path) as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    return rows
+
+
+def summarize(rows, by_state=False):
+    """
+    [{'phase', 'version', 'state', 'n', 'p50', 'p90', 'p99', 'max'}] sorted by phase,
+    version, state. Every phase/version gets a state '*' row across all states; with
+    by_state, each state also gets its own row.
+    """
+    groups = defaultdict(list)
+    for r in rows:
+        groups[(r['p'], r['v'], ALL_STATES)].append(r['ms'])
+        if by_state:
+            groups[(r['p'], r['v'], r['s'])].append(r['ms'])
+    out = []
+    for (phase, version, state), values in sorted(groups.items()):
+        values.sort()
+        rec = {'phase': phase, 'version': version, 'state': state, 'n': len(values)}
+        rec.update({f'p{p}': percentile(values, p) for p in PERCENTILES})
+        rec['max'] = values[-1]
+        out.append(rec)
+    return out
+
+
+def format_report(summary):
+    if not summary:
+        return "No telemetry recorded yet."
+    header = ['phase', 'version', 'state', 'n'] + [f'p{p}' for p in PERCENTILES] + ['max']
+    lines = [header] + [
+        [r['phase'], r['version'], r['state'], str(r['n'])] + [f"{r[h]:.0f}" for h in header[4:]]
+        for r in summary
+    ]
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    text = ['  '.join(cell.ljust(w) if i < 3 else cell.rjust(w) for i, (cell, w) in enumerate(zip(line, widths)))
+            for line in lines]
+    return '\n'.join([text[0], '-' * len(text[0])] + text[1:] + ['(milliseconds)'])
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    log_path = DEFAULT_LOG
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def send_cors(self, status, body=b'', content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if body:
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, GET')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path.split('?')[0] != '/collect':
+            return self.send_cors(404)
+        length = int(self.headers.get('Content-Length') or 0)
+        if not 0 < length <= MAX_BODY:
+            return self.send_cors(413 if length else 400)
+        try:
+            rows = parse_beacon(self.rfile.read(length))
+        except (ValueError, AttributeError):
+            return self.send_cors(400)
+        with self.lock, open(self.log_path, 'a') as f:
+            f.writelines(json.dumps(r, separators=(',', ':')) + '\n' for r in rows)
+        self.send_cors(204)
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/summary':
+            return self.send_cors(404)
+        with self.lock:
+            rows = read_log(self.log_path)
+        by_state = 'by_state' in self.path
+        self.send_cors(200, json.dumps(summarize(rows, by_state=by_state), indent=1).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collect index.html phase timings and report percentiles.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Interface to listen on (default: 127.0.0.1; 0.0.0.0 for every interface)')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--log', default=DEFAULT_LOG, help='JSONL file of phase timings (default: telemetry/phases.jsonl)')
+    parser.add_argument('--report', action='store_true', help='Print the percentile report for --log and exit')
+    parser.add_argument('--by-state', action='store_true', help='With --report, add one row per state')
+    args = parser.parse_args()
+
+    if args.report:
+        print(format_report(summarize(read_log(args.log), by_state=args.by_state)))
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.log)), exist_ok=True)
+    CollectorHandler.log_path = args.log
+    server = ThreadingHTTPServer((args.host, args.port), CollectorHandler)
+    print(f"Collecting into {args.log}; set TELEMETRY_URL (or ?telemetry=) to http://{args.host}:{args.port}/collect")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(format_report(summarize(read_log(args.log))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+plgmap.geoclient against scripts/mock_geocoder.py on an ephemeral port.
+
+Run with:  python -m pytest tests/
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from plgmap import geoclient  # noqa: E402
+
+pytest.importorskip('zipcodes')
+pytest.importorskip('addfips')
+
+LATENCY = 0.3
+FIPS_DTYPES = {'State FIPS': str, 'County FIPS': str}
+
+
+def start_mock(*args):
+    """(process, base URL) of a mock geocoder listening on a free port."""
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, 'scripts', 'mock_geocoder.py'),
+                             '--port', '0', *args], stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        match = re.search(r'http://localhost:(\d+)/v1\.7', line)
+        if match:
+            return proc, f"http://127.0.0.1:{match.group(1)}/v1.7"
+    proc.kill()
+    raise RuntimeError("mock geocoder exited before listening")
+
+
+@pytest.fixture(scope='module')
+def mock_url():
+    # --max-inflight 2 answers 429 if the client ever has more than two requests in flight
+    proc, url = start_mock('--latency', str(LATENCY), '--max-inflight', '2')
+    yield url
+    proc.terminate()
+    proc.wait(timeout=10)
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=['Region', 'City', 'A. Uniques of First Scribe Created',
+                                'B. Total Events of Scribe Created']).to_csv(path, index=False)
+
+
+def test_geocode_csv_rows_and_cache(tmp_path, mock_url, capsys):
+    csv_path, out_path, cache_path = tmp_path / 'in.csv', tmp_path / 'out.csv', tmp_path / 'cache.json'
+    write_csv(csv_path, [
+        ('Ohio', 'Cleveland', 2, 10),
+        ('Ohio', 'Cleveland', 1, 4),          # duplicate place: one query
+        ('New York', 'Holtsville', 1, 3),
+        ('Texas', 'Nowhereville', 1, 1),      # unknown to the geocoder
+        ('Alabama', 'Akron', 0, 36),          # answered from the cache, never sent
+    ])
+    with open(cache_path, 'w') as f:
+        json.dump({'Akron, AL': {'fips': '01065', 'county': 'Cached County', 'lat': 1.0, 'lon': 2.0}}, f)
+
+    geoclient.geocode_csv(str(csv_path), str(out_path), mock_url, cache_path=str(cache_path), batch_size=2)
+    assert 'Geocoding 3 new places' in capsys.readouterr().out
+
+    out = pd.read_csv(out_path, dtype=FIPS_DTYPES)
+    assert out['County FIPS'].tolist()[:3] == ['035', '035', '103']
+    assert out['State FIPS'].tolist()[:3] == ['39', '39', '36']
+    assert out['Geocodio County'].tolist()[:3] == ['Cuyahoga County', 'Cuyahoga County', 'Suffolk County']
+    assert out.loc[3, ['State FIPS', 'County FIPS', 'Geocodio County']].isna().all()
+    assert out.loc[4, 'Geocodio County'] == 'Cached County'   # the mock would have said Hale County
+    assert out.loc[4, 'State FIPS'] + out.loc[4, 'County FIPS'] == '01065'
+
+    with open(cache_path) as f:
+        cache = json.load(f)
+    assert cache['Nowhereville, TX'] is None   # unresolved places are cached too
+    assert cache['Cleveland, OH']['fips'] == '39035'
+
+    # Second run: everything is cached, nothing is sent
+    geoclient.geocode_csv(str(csv_path), str(out_path), mock_url, cache_path=str(cache_path))
+    assert 'Geocoding 0 new places' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(pd.read_csv(out_path, dtype=FIPS_DTYPES), out)
+
+
+def test_batches_run_concurrently_within_pool_size(mock_url):
+    queries = [f"{city}, OH" for city in ('Cleveland', 'Akron', 'Toledo', 'Dayton',
+                                          'Columbus', 'Cincinnati', 'Canton', 'Youngstown')]
+    geocoder = geoclient.BatchGeocoder(mock_url, batch_size=2, concurrency=2, backoff=0.05)
+    start = time.perf_counter()
+    results = geocoder.geocode(queries)
+    elapsed = time.perf_counter() - start
+
+    assert set(results) == set(queries)
+    assert all(r and r['fips'].startswith('39') for r in results.values())
+    # 4 batches of 2 over 2 connections: two rounds of latency, not four; never a 429 from a third request
+    assert geocoder.stats == {'batches': 4, 'requests': 4, 'retries': 0, 'failed_batches': 0}
+    assert 2 * LATENCY <= elapsed < 4 * LATENCY
+
+
+def test_failed_connection_is_not_returned_to_pool():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]   # closed again: nothing listens here
+
+    async def run():
+        pool = geoclient.ConnectionPool(f"http://127.0.0.1:{port}", size=2, timeout=1)
+        for _ in range(3):
+            with pytest.raises((OSError, http.client.HTTPException)):
+                await pool.request('POST', '/geocode', b'[]')
+        slots = [pool.idle.get_nowait() for _ in range(pool.idle.qsize())]
+        return slots
+
+    assert asyncio.run(run()) == [None, None]